@@ -8,6 +8,9 @@ setuptools.setup(
         "": "src"
     },
     packages=setuptools.find_packages(where="src"),
+    package_data={
+        "lqc.generate.css": ["style_catalog.json"],
+    },
     # packages=[
     #     "lqc", 
     #     "lqc_runner",
@@ -16,9 +19,11 @@ setuptools.setup(
     version='1.2.0',
     install_requires=[
         'lorem',
+        'numpy',
         'grizzly-framework',
     ],
     entry_points={
-       "grizzly_adapters": ["lqc = lqc_grizzly.lqc_adapter:LayoutQuickCheckAdapter"]
+       "grizzly_adapters": ["lqc = lqc_grizzly.lqc_adapter:LayoutQuickCheckAdapter"],
+       "console_scripts": ["lqc = lqc.cli:main"],
     },
 )
@@ -0,0 +1,21 @@
+""" Entry point for the `lqc` command
+
+    lqc generate -c ./config/preset-default.config.json -n 10000 -o corpus.tar.gz
+"""
+
+import argparse
+import sys
+
+from lqc.generate.export import add_generate_command
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="lqc", description="layout quickcheck tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_generate_command(subparsers)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
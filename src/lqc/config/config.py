@@ -1,7 +1,13 @@
+import hashlib
 import json
+import os
+from lqc.generate.budget import GenerationBudget
+from lqc.model.constants import BugReportFormat, HarnessMode, RelayoutStrategy
+from lqc.util.batch_size_tuner import DEFAULT_BATCH_SIZE, DEFAULT_MAX_BATCH_SIZE
 
 DEFAULT_STYLE_WEIGHT = 10
 DEFAULT_STYLE_VALUE_WEIGHT = 10
+DEFAULT_HARNESS_RELOAD_INTERVAL = 500
 
 def parse_config(config_path):
     with open(config_path, 'r') as f:
@@ -13,6 +19,18 @@ def _weightToProbability(weight):
 def _bound(low, high, value):
     return max(low, min(high, value))
 
+# Test pages are written to RAM when possible, see getTmpFilesDirectory()
+RAM_TMP_FILES_DIR = "/dev/shm"
+DEFAULT_TMP_FILES_DIR = "./tmp_generated_files"
+
+def _default_tmp_files_dir():
+    if os.path.isdir(RAM_TMP_FILES_DIR) and os.access(RAM_TMP_FILES_DIR, os.W_OK):
+        return os.path.join(RAM_TMP_FILES_DIR, "lqc")
+    return DEFAULT_TMP_FILES_DIR
+
+def _config_hash(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
 class Config:
     """ Singleton Class """
     __instance = None
@@ -25,12 +43,35 @@ class Config:
         if config != None:
             cls.__instance = super(Config, cls).__new__(cls)
             # Class Initialization Code
+            cls.__instance.config_dict = config
+            cls.__instance.config_hash = _config_hash(config)
             cls.__instance.style_weights = config.get("style-weights", {})
             cls.__instance.variants = config.get("variants", [])
             cls.__instance.rules = config.get("rules", [])
+            generation = config.get("generation", {})
+            cls.__instance.generation_budget = GenerationBudget(generation)
+            cls.__instance.dependency_aware = generation.get("dependency-aware", False)
+            cls.__instance.static_filter = generation.get("static-filter", True)
+            mutation = config.get("mutation", {})
+            cls.__instance.mutation_seed_dir = mutation.get("seed-directory", None)
+            cls.__instance.mutation_rate = mutation.get("rate", 0)
+            cls.__instance.max_mutations = mutation.get("max-mutations", 3)
+            harness = config.get("harness", {})
+            cls.__instance.harness_mode = HarnessMode(harness.get("mode", HarnessMode.FILE.value))
+            cls.__instance.harness_reload_interval = harness.get("reload-interval", DEFAULT_HARNESS_RELOAD_INTERVAL)
+            cls.__instance.batch_size = harness.get("batch-size", DEFAULT_BATCH_SIZE)
+            cls.__instance.max_batch_size = harness.get("max-batch-size", DEFAULT_MAX_BATCH_SIZE)
+            cls.__instance.batch_auto_tune = harness.get("auto-tune-batch-size", True)
+            detection = config.get("detection", {})
+            cls.__instance.dimension_tolerance = detection.get("tolerance", 0)
+            cls.__instance.relayout_strategy = RelayoutStrategy(detection.get("relayout", RelayoutStrategy.INNERHTML.value))
             paths = config.get("paths", {})
             cls.__instance.path_bug_reports_dir = paths.get("bug-reports-directory", "./bug_reports")
-            cls.__instance.path_tmp_files_dir = paths.get("tmp-files-directory", "./tmp_generated_files")
+            cls.__instance.path_tmp_files_dir = paths.get("tmp-files-directory", None)
+            cls.__instance.path_coverage_file = paths.get("coverage-file", None)
+            cls.__instance.bug_report_format = BugReportFormat(paths.get("bug-report-format", BugReportFormat.DIRECTORY.value))
+            cls.__instance.style_sampler = None
+            cls.__instance.coverage_map = None
 
         elif cls.__instance == None:
             raise RuntimeError("Config must be initialized before use")
@@ -48,6 +89,93 @@ class Config:
         weight = self.style_weights.get(style_and_type, DEFAULT_STYLE_VALUE_WEIGHT)
         return _bound(0, 100000, weight)
     
+    def getStyleWeights(self):
+        return self.style_weights
+
+    def setStyleWeights(self, style_weights):
+        """ Replace the "style-weights" (eg. with learned weights). The style sampler is rebuilt on next use """
+        self.style_weights = style_weights
+        self.config_dict = {**self.config_dict, "style-weights": style_weights}
+        self._update_config_hash()
+        self.style_sampler = None
+
+    def getStyleSampler(self):
+        """ Compiled style sampler for this config, built on first use """
+        if self.style_sampler is None:
+            from lqc.generate.css.style_sampler import StyleSampler
+            self.style_sampler = StyleSampler(self, coverage_map=self.coverage_map)
+        return self.style_sampler
+
+    def setCoverageMap(self, coverage_map):
+        """
+        Bias generation with a snapshot of a CoverageMap. The style sampler is rebuilt on next use.
+        Call again to pick up what was recorded since
+        """
+        self.coverage_map = coverage_map.snapshot() if coverage_map is not None else None
+        self._update_config_hash()
+        self.style_sampler = None
+
+    def _update_config_hash(self):
+        config_hash = _config_hash(self.config_dict)
+        if self.coverage_map is not None:
+            # The coverage biases generation, so a seed only reproduces a subject under the same coverage
+            config_hash += "-" + self.coverage_map.digest()
+        self.config_hash = config_hash
+
+    def getConfigDict(self):
+        """ The config as it was loaded, eg. to initialize Config in another process """
+        return self.config_dict
+
+    def getConfigHash(self):
+        """ Stable hash of the config contents (and coverage snapshot, if any), used to identify seeded tests """
+        return self.config_hash
+
+    def getGenerationBudget(self):
+        return self.generation_budget
+
+    def isDependencyAware(self):
+        """ Whether generated styles are made coherent with their parent/element (see css/dependencies.py) """
+        return self.dependency_aware
+
+    def isStaticFilterEnabled(self):
+        """ Whether tests whose modified styles cannot affect layout are skipped (see rules/static_filter.py) """
+        return self.static_filter
+
+    def getMutationSeedDirectory(self):
+        return self.mutation_seed_dir
+
+    def getMutationRate(self):
+        return _bound(0, 1, self.mutation_rate)
+
+    def getMaxMutations(self):
+        return max(1, self.max_mutations)
+
+    def getHarnessMode(self) -> HarnessMode:
+        """ How the selenium runner loads tests in the browser """
+        return self.harness_mode
+
+    def getHarnessReloadInterval(self):
+        """ Number of tests run in the persistent harness page before it is reloaded """
+        return max(1, self.harness_reload_interval)
+
+    def getBatchSize(self):
+        """ Number of tests run per page load in the batch harness mode (the starting point if it is auto tuned) """
+        return max(1, self.batch_size)
+
+    def getMaxBatchSize(self):
+        return max(1, self.max_batch_size)
+
+    def isBatchSizeAutoTuned(self):
+        return self.batch_auto_tune
+
+    def getDimensionTolerance(self):
+        """ Differences in dimensions (px) up to this are not reported as bugs by checkForBug() """
+        return max(0, self.dimension_tolerance)
+
+    def getRelayoutStrategy(self) -> RelayoutStrategy:
+        """ How checkForBug() lays out the page from scratch """
+        return self.relayout_strategy
+
     def getRules(self):
         return self.rules
     
@@ -58,5 +186,18 @@ class Config:
         return self.path_bug_reports_dir
 
     def getTmpFilesDirectory(self):
+        """ The configured directory, or by default a RAM backed one (/dev/shm/lqc) if available """
+        if self.path_tmp_files_dir is None:
+            return _default_tmp_files_dir()
         return self.path_tmp_files_dir
+
+    def getCoverageFile(self):
+        return self.path_coverage_file
+
+    def getBugReportFormat(self) -> BugReportFormat:
+        return self.bug_report_format
+
+    def getBugStoreDirectory(self):
+        """ Where bug reports are stored with the STORE format """
+        return os.path.join(self.path_bug_reports_dir, "store")
     
@@ -22,14 +22,12 @@ class FileConfig:
             os.makedirs(self.layout_file_dir)
         if not os.path.exists(self.bug_report_file_dir):
             os.makedirs(self.bug_report_file_dir)
-            
-        def getCustomTimestampPath(self, custom_folder: str):
-            timestamp = datetime.now()
-            formatted_timestamp = timestamp.strftime(timestamp_format)
-            custom_dir = os.path.join(self.bug_report_file_dir, custom_folder)
-            if not os.path.exists(custom_dir):
-                os.makedirs(custom_dir)        
-                dirpath = os.path.join(custom_dir, f"{custom_folder}-{formatted_timestamp}")
-            if not os.path.exists(dirpath):
-                os.makedirs(dirpath)
-            return dirpath
+
+    def getCustomTimestampPath(self, custom_folder: str):
+        """ Create and return a new timestamped directory, under custom_folder in the bug report directory """
+        timestamp = datetime.now()
+        formatted_timestamp = timestamp.strftime(timestamp_format)
+        custom_dir = os.path.join(self.bug_report_file_dir, custom_folder)
+        dirpath = os.path.join(custom_dir, f"{custom_folder}-{formatted_timestamp}")
+        os.makedirs(dirpath, exist_ok=True)
+        return dirpath
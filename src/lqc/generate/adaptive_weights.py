@@ -0,0 +1,109 @@
+""" Style weights learned from bug yield
+
+Every style (eg. "width") and keyword value (eg. "display:grid") is treated
+as an arm of a multi-armed bandit. A test is a trial for every style it
+uses, and a success for the styles that remain in the minimized subject of a
+bug it found. Each arm keeps a Beta posterior of its success rate, and
+Thompson sampling turns the posteriors into factors for the configured
+"style-weights": arms that appear in bugs are drawn more often, and arms
+that never do are drawn less.
+
+The learned weights, and the posteriors, are written out as a config file,
+so a campaign can be resumed from it, or the weights reviewed and kept.
+"""
+
+import json
+import os
+from random import betavariate
+
+from lqc.config.config import DEFAULT_STYLE_VALUE_WEIGHT, DEFAULT_STYLE_WEIGHT
+from lqc.generate.css.style_catalog import get_style_catalog
+from lqc.model.run_subject import RunSubject
+
+# Number of tests between re-sampling the weights
+ADAPT_INTERVAL = 100
+
+PRIOR_ALPHA = 1
+PRIOR_BETA = 1
+
+# Bounds for the factor applied to a configured weight
+MIN_FACTOR = 0.25
+MAX_FACTOR = 4.0
+
+# Key used to store the posteriors in the written config
+POSTERIORS_KEY = "adaptive-weights"
+
+
+def style_arms(run_subject: RunSubject):
+    """ The arms used by a subject: style names, and "name:keyword" for keyword values """
+    catalog = get_style_catalog()
+    arms = set()
+    for style_map in (run_subject.base_styles.map, run_subject.modified_styles.map):
+        for styles in style_map.values():
+            for name, value in styles.items():
+                arms.add(name)
+                entry = catalog.get(name)
+                if entry and value in entry.get("keywords", []):
+                    arms.add(f"{name}:{value}")
+    return arms
+
+
+class AdaptiveWeights():
+
+    def __init__(self, base_weights, posteriors=None):
+        """
+        base_weights - the "style-weights" the learned weights are relative to
+        posteriors - {arm: [alpha, beta]}, eg. as saved by write_config()
+        """
+        self.base_weights = dict(base_weights)
+        self.posteriors = {arm: list(ab) for arm, ab in (posteriors or {}).items()}
+
+    def record(self, run_subject: RunSubject, bug_subject: RunSubject = None):
+        """ Record a test, and the minimized subject if it found a bug """
+        bug_arms = style_arms(bug_subject) if bug_subject is not None else set()
+        for arm in style_arms(run_subject) | bug_arms:
+            posterior = self.posteriors.setdefault(arm, [PRIOR_ALPHA, PRIOR_BETA])
+            if arm in bug_arms:
+                posterior[0] += 1
+            else:
+                posterior[1] += 1
+
+    def sample_weights(self):
+        """ Draw a set of style weights by Thompson sampling the posteriors """
+        if not self.posteriors:
+            return dict(self.base_weights)
+        samples = {arm: betavariate(a, b) for arm, (a, b) in self.posteriors.items()}
+        mean = sum(samples.values()) / len(samples)
+
+        weights = dict(self.base_weights)
+        for arm, sample in samples.items():
+            is_value_arm = ":" in arm
+            base_weight = self.base_weights.get(arm, DEFAULT_STYLE_VALUE_WEIGHT if is_value_arm else DEFAULT_STYLE_WEIGHT)
+            if base_weight <= 0:
+                # Styles disabled in the config stay disabled
+                continue
+            factor = max(MIN_FACTOR, min(MAX_FACTOR, sample / mean)) if mean > 0 else 1.0
+            weight = base_weight * factor
+            weights[arm] = round(weight if is_value_arm else min(100, weight), 2)
+        return weights
+
+    def update(self, config):
+        """ Re-sample the weights and use them for generation """
+        config.setStyleWeights(self.sample_weights())
+
+    def write_config(self, config, path):
+        """ Write the config with the current learned weights and the posteriors """
+        config_dict = dict(config.getConfigDict())
+        config_dict[POSTERIORS_KEY] = {"base-weights": self.base_weights, "posteriors": self.posteriors}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(config_dict, f, indent=4)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def from_config(cls, config):
+        """ Start learning from a config, resuming from its posteriors if it was written by write_config() """
+        saved = config.getConfigDict().get(POSTERIORS_KEY)
+        if saved:
+            return cls(saved["base-weights"], saved["posteriors"])
+        return cls(config.getStyleWeights())
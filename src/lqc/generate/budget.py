@@ -0,0 +1,194 @@
+""" Limits on the size and cost of generated tests
+
+Configured in the "generation" section of the config file. A limit of 0
+(the default) means unlimited.
+
+- max-elements: elements per test
+- max-depth: nesting depth of elements
+- max-text-length: characters of text per test
+- max-length-extent: largest length value, in approximate px
+- max-cost: largest estimate_cost() of a test; more expensive tests are
+  regenerated, and trimmed to fit if they still don't after MAX_GENERATE_ATTEMPTS
+
+Generated trees respect the element, depth and text limits by construction.
+Tests built otherwise (eg. mutated) are made to fit with trim_to_budget().
+"""
+
+import re
+
+from lqc.model.run_subject import RunSubject
+
+# Approximate size of one unit in px (16px font, 1000px viewport)
+UNIT_PX = {
+    "px": 1,
+    "cm": 96 / 2.54,
+    "mm": 96 / 25.4,
+    "mozmm": 96 / 25.4,
+    "Q": 96 / 101.6,
+    "in": 96,
+    "pc": 16,
+    "pt": 96 / 72,
+    "em": 16,
+    "rem": 16,
+    "lh": 16,
+    "rlh": 16,
+    "cap": 16,
+    "ic": 16,
+    "ex": 8,
+    "ch": 8,
+    "vh": 10,
+    "vw": 10,
+    "vi": 10,
+    "vb": 10,
+    "vmin": 10,
+    "vmax": 10,
+}
+
+_units = "|".join(sorted(UNIT_PX.keys(), key=len, reverse=True))
+LENGTH_TOKEN_RE = re.compile(r"(?<![\w.#])([+-]?)([0-9]+)(" + _units + r")\b")
+
+# Weights for estimate_cost(), relative to the cost of one element
+DECLARATION_COST = 0.1
+TEXT_CHARS_PER_COST = 500
+EXTENT_PX_PER_COST = 5000
+
+MAX_GENERATE_ATTEMPTS = 10
+
+
+class GenerationBudget():
+
+    def __init__(self, generation_config=None):
+        generation_config = generation_config or {}
+        self.max_elements = generation_config.get("max-elements", 0)
+        self.max_depth = generation_config.get("max-depth", 0)
+        self.max_text_length = generation_config.get("max-text-length", 0)
+        self.max_length_extent = generation_config.get("max-length-extent", 0)
+        self.max_cost = generation_config.get("max-cost", 0)
+
+
+def length_extent(style_value):
+    """ Largest length in a style value, in approximate px. Eg. "10in 5px" -> 960 """
+    extent = 0
+    for _sign, number, unit in LENGTH_TOKEN_RE.findall(style_value):
+        extent = max(extent, int(number) * UNIT_PX[unit])
+    return extent
+
+
+def clamp_lengths(style_value, max_extent):
+    """ Shrink every length in a style value that is larger than max_extent px """
+
+    def clamp(match):
+        sign, number, unit = match.groups()
+        max_number = int(max_extent / UNIT_PX[unit])
+        if int(number) <= max_number:
+            return match.group(0)
+        return f"{sign}{max_number}{unit}"
+
+    return LENGTH_TOKEN_RE.sub(clamp, style_value)
+
+
+def _text_length(tree):
+    length = 0
+    for element in tree:
+        if element["tag"] == "<text>":
+            length += len(element["value"])
+        else:
+            length += _text_length(element["children"])
+    return length
+
+
+def _num_elements(tree):
+    return sum(1 + _num_elements(element["children"]) for element in tree if element["tag"] != "<text>")
+
+
+def _depth(tree):
+    """ Nesting depth of the elements of a tree (children of body are at depth 1) """
+    return max((1 + _depth(element["children"]) for element in tree if element["tag"] != "<text>"), default=0)
+
+
+def estimate_cost(run_subject: RunSubject):
+    """
+    Estimate how expensive a subject is to lay out, in units of one element.
+
+    Every element costs 1, every style declaration DECLARATION_COST, and
+    text and large lengths add a cost proportional to their size.
+    """
+    cost = len(run_subject.html_tree.getElementIds())
+    cost += _text_length(run_subject.html_tree.tree) / TEXT_CHARS_PER_COST
+    for style_map in (run_subject.base_styles.map, run_subject.modified_styles.map):
+        for styles in style_map.values():
+            cost += len(styles) * DECLARATION_COST
+            extent = max((length_extent(v) for v in styles.values()), default=0)
+            cost += extent / EXTENT_PX_PER_COST
+    return cost
+
+
+def apply_length_budget(run_subject: RunSubject, budget: GenerationBudget):
+    """ Clamp the lengths of a subject's styles to the budget, in place """
+    if not budget.max_length_extent:
+        return run_subject
+    for style_map in (run_subject.base_styles.map, run_subject.modified_styles.map):
+        for styles in style_map.values():
+            for name, value in styles.items():
+                styles[name] = clamp_lengths(value, budget.max_length_extent)
+    return run_subject
+
+
+def within_budget(run_subject: RunSubject, budget: GenerationBudget):
+    tree = run_subject.html_tree.tree
+    if budget.max_elements and _num_elements(tree) > budget.max_elements:
+        return False
+    if budget.max_depth and _depth(tree) > budget.max_depth:
+        return False
+    if budget.max_text_length and _text_length(tree) > budget.max_text_length:
+        return False
+    return not budget.max_cost or estimate_cost(run_subject) <= budget.max_cost
+
+
+def _last_element(tree):
+    """ The last element of a tree in document order (it has no element children), or None """
+    for element in reversed(tree):
+        if element["tag"] != "<text>":
+            return _last_element(element["children"]) or element
+    return None
+
+
+def _elements_deeper_than(tree, max_depth, depth=1):
+    for element in tree:
+        if element["tag"] == "<text>":
+            continue
+        if depth > max_depth:
+            yield element
+        else:
+            yield from _elements_deeper_than(element["children"], max_depth, depth + 1)
+
+
+def _truncate_text(tree, max_length):
+    """ Shorten the text of a tree to max_length characters, in document order. Returns the characters left """
+    for node in tree:
+        if node["tag"] == "<text>":
+            node["value"] = node["value"][:max_length]
+            max_length -= len(node["value"])
+        else:
+            max_length = _truncate_text(node["children"], max_length)
+    return max_length
+
+
+def trim_to_budget(run_subject: RunSubject, budget: GenerationBudget):
+    """
+    Make a subject fit the budget, in place: remove the elements that are too
+    deep, cut the text short, then remove the last elements until it is within
+    max-elements and max-cost
+    """
+    tree = run_subject.html_tree.tree
+    if budget.max_depth:
+        for element in list(_elements_deeper_than(tree, budget.max_depth)):
+            run_subject.removeElementById(element["id"])
+    if budget.max_text_length:
+        _truncate_text(tree, budget.max_text_length)
+    while not within_budget(run_subject, budget):
+        element = _last_element(run_subject.html_tree.tree)
+        if element is None:
+            break
+        run_subject.removeElementById(element["id"])
+    return run_subject
@@ -0,0 +1,168 @@
+import base64
+import hashlib
+import json
+import os
+import zlib
+
+from lqc.generate.css.style_catalog import get_style_catalog
+from lqc.model.run_subject import RunSubject
+from lqc.model.style_map import INCLUDE_VALUE_IN_NAME
+
+COVERAGE_VERSION = 2
+COVERAGE_MAP_SIZE = 1 << 16
+
+# Number of tests between saving the map and rebuilding the biased sampler
+COVERAGE_UPDATE_INTERVAL = 100
+
+# Bounds for the factor applied to a style's probability/weight
+MIN_BIAS = 0.25
+MAX_BIAS = 2.0
+
+
+def _style_name(style_name, style_value):
+    """ Same naming as StyleMap.all_style_names(), eg. "width" or "display:grid" """
+    if style_name in INCLUDE_VALUE_IN_NAME:
+        return f"{style_name}:{style_value}"
+    return style_name
+
+
+def coverage_tuples(run_subject: RunSubject):
+    """
+    Yield the (base property, modified property, display value) tuples covered by a subject.
+
+    Tuples are collected per element: every style modified on an element is
+    paired with every base style of that element (and with "" for no base
+    style), under the element's base display value.
+    """
+    for _name, _value, tuples in _tuples_per_modified_style(run_subject):
+        yield from tuples
+
+
+def _tuples_per_modified_style(run_subject: RunSubject):
+    """ Yield (name, value, coverage tuples) for every modified style of a subject, see coverage_tuples() """
+    base_map = run_subject.base_styles.map
+    for element_id, modified_styles in run_subject.modified_styles.map.items():
+        base_styles = base_map.get(element_id, {})
+        display = base_styles.get("display", "")
+        base_names = [""] + [_style_name(n, v) for n, v in base_styles.items()]
+        for name, value in modified_styles.items():
+            modified_name = _style_name(name, value)
+            yield name, value, [(base_name, modified_name, display) for base_name in base_names]
+
+
+def _style_keys(catalog, name, value):
+    """ The keys biased for a modified style: its name, and "name:keyword" for keyword values """
+    entry = catalog.get(name)
+    if entry and value in entry.get("keywords", []):
+        return (name, f"{name}:{value}")
+    return (name,)
+
+
+class CoverageMap():
+    """
+    Tracks which style combinations have already been tested.
+
+    As in a fuzzer's edge coverage map, the (base property, modified
+    property, display value) tuples are hashed into a fixed size table of
+    saturating counters, which keeps the map small enough to save after
+    every few tests. Generation is biased with the tuple counts: for each
+    modified style (and keyword), the mean count of the tuples it was tested
+    in is kept, and styles whose combinations have been tested less are
+    generated more often.
+    """
+
+    def __init__(self):
+        self.num_tests = 0
+        self.tuple_hits = bytearray(COVERAGE_MAP_SIZE)
+        # eg. {"width": [12, 30], "position:absolute": [2, 2]}: [tuples recorded, sum of their counts]
+        self.tuple_counts = {}
+        self._mean_count = None
+
+    def record(self, run_subject: RunSubject):
+        """ Record a tested subject. Returns the number of newly covered tuples """
+        new_tuples = 0
+        hits = self.tuple_hits
+        catalog = get_style_catalog()
+        for name, value, tuples in _tuples_per_modified_style(run_subject):
+            counts = [self.tuple_counts.setdefault(key, [0, 0]) for key in _style_keys(catalog, name, value)]
+            for coverage_tuple in tuples:
+                index = zlib.crc32("|".join(coverage_tuple).encode("utf-8")) % COVERAGE_MAP_SIZE
+                if hits[index] == 0:
+                    new_tuples += 1
+                if hits[index] < 255:
+                    hits[index] += 1
+                for count in counts:
+                    count[0] += 1
+                    count[1] += hits[index]
+
+        self.num_tests += 1
+        self._mean_count = None
+        return new_tuples
+
+    def num_covered(self):
+        """ Number of distinct coverage tuples seen (up to hash collisions) """
+        return COVERAGE_MAP_SIZE - self.tuple_hits.count(0)
+
+    def _count(self, key):
+        """ Mean count of the tuples a style was tested in, 0 if it wasn't tested """
+        num_tuples, sum_counts = self.tuple_counts.get(key, (0, 0))
+        return sum_counts / num_tuples if num_tuples else 0
+
+    def _bias(self, key):
+        if self._mean_count is None:
+            counts = [self._count(key) for key in self.tuple_counts]
+            self._mean_count = sum(counts) / len(counts) if counts else 0
+        if self._mean_count == 0:
+            return 1.0
+        bias = 2 * self._mean_count / (self._mean_count + self._count(key))
+        return max(MIN_BIAS, min(MAX_BIAS, bias))
+
+    def style_bias(self, style_name):
+        """ Factor for a style's inclusion probability: > 1 when under-explored """
+        return self._bias(style_name)
+
+    def keyword_bias(self, style_name, keyword):
+        """ Factor for a keyword value's weight: > 1 when under-explored """
+        return self._bias(f"{style_name}:{keyword}")
+
+    def snapshot(self):
+        """ A copy, that later records don't change """
+        coverage_map = CoverageMap()
+        coverage_map.num_tests = self.num_tests
+        coverage_map.tuple_hits = bytearray(self.tuple_hits)
+        coverage_map.tuple_counts = {key: list(count) for key, count in self.tuple_counts.items()}
+        return coverage_map
+
+    def digest(self):
+        """ Short hash of the state that biases generation """
+        h = hashlib.sha256(bytes(self.tuple_hits))
+        h.update(json.dumps(self.tuple_counts, sort_keys=True).encode("utf-8"))
+        return h.hexdigest()[:16]
+
+    def save(self, path):
+        coverage_json = {
+            "version": COVERAGE_VERSION,
+            "num_tests": self.num_tests,
+            "tuple_hits": base64.b64encode(zlib.compress(bytes(self.tuple_hits))).decode("ascii"),
+            "tuple_counts": self.tuple_counts,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(coverage_json, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """ Load a saved coverage map, or start a new one if there is none """
+        coverage_map = cls()
+        if not os.path.exists(path):
+            return coverage_map
+        with open(path, "r") as f:
+            coverage_json = json.load(f)
+        if coverage_json.get("version") != COVERAGE_VERSION:
+            print(f"Warning: Ignoring coverage file {path} with unsupported version")
+            return coverage_map
+        coverage_map.num_tests = coverage_json["num_tests"]
+        coverage_map.tuple_hits = bytearray(zlib.decompress(base64.b64decode(coverage_json["tuple_hits"])))
+        coverage_map.tuple_counts = coverage_json["tuple_counts"]
+        return coverage_map
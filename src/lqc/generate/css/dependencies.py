@@ -0,0 +1,134 @@
+""" Contexts that a style needs in order to affect layout
+
+Many styles are inert unless the element or its parent has a particular
+style. Eg. grid-row-start only applies to children of a grid container, and
+top only applies to positioned elements. A test that modifies an inert style
+cannot trigger an invalidation bug, so when dependency-aware generation is
+enabled, generated style logs are made coherent with resolve_dependencies().
+
+Dependencies are declared below with requires(), and registered in the same
+way as custom_generators.
+"""
+
+import random
+
+GRID_DISPLAYS = ["grid", "inline-grid"]
+FLEX_DISPLAYS = ["flex", "inline-flex"]
+POSITIONED = ["relative", "absolute", "fixed", "sticky"]
+
+# Probability of giving the parent/element the style it needs, instead of dropping the dependent style
+COERCE_PROB = 0.75
+
+dependencies = {}
+
+
+class Requirement():
+    """ The style `on` ("self" or "parent") must have style_name set to one of values """
+
+    def __init__(self, on, style_name, values):
+        self.on = on
+        self.style_name = style_name
+        self.values = values
+
+    def satisfied_by(self, styles):
+        return styles.get(self.style_name) in self.values
+
+
+def requires(on, style_name, values):
+
+    def decorator_requires(names):
+        for name in names:
+            dependencies.setdefault(name, []).append(Requirement(on, style_name, values))
+        return names
+
+    return decorator_requires
+
+
+def requirements_for(style_name):
+    return dependencies.get(style_name, [])
+
+
+# =============================
+# Dependencies
+# =============================
+
+requires("parent", "display", GRID_DISPLAYS)([
+    "grid-row-start", "grid-row-end", "grid-column-start", "grid-column-end",
+    "grid-row", "grid-column", "grid-area",
+])
+
+requires("parent", "display", FLEX_DISPLAYS)([
+    "flex-grow", "flex-shrink", "flex-basis", "flex",
+])
+
+requires("self", "display", GRID_DISPLAYS)([
+    "grid-template-columns", "grid-template-rows", "grid-template-areas", "grid-template",
+    "grid-auto-columns", "grid-auto-rows", "grid-auto-flow",
+])
+
+requires("self", "display", FLEX_DISPLAYS)([
+    "flex-direction", "flex-wrap", "flex-flow",
+])
+
+requires("self", "position", POSITIONED)([
+    "top", "right", "bottom", "left", "inset",
+    "inset-block-start", "inset-block-end", "inset-inline-start", "inset-inline-end",
+])
+
+
+# =============================
+# Resolution
+# =============================
+
+def _parent_ids(tree, parent_id=None, parents=None):
+    """ Map each element id to the id of its parent element (None for children of body) """
+    parents = {} if parents is None else parents
+    for element in tree:
+        if element["tag"] != "<text>":
+            parents[element["id"]] = parent_id
+            _parent_ids(element["children"], element["id"], parents)
+    return parents
+
+
+def _satisfied(requirement, base_styles, modified_styles):
+    # A modified style matters if its context holds either before or after the modification
+    if requirement.satisfied_by(base_styles):
+        return True
+    return modified_styles is not None and requirement.satisfied_by(modified_styles)
+
+
+def _coerce(target_id, requirement, base_style_log):
+    """ Maybe give the target the base style it needs. Returns True if it was given """
+    if target_id is not None:
+        target_base = base_style_log.get(target_id, {})
+        if requirement.style_name not in target_base and random.random() < COERCE_PROB:
+            # Minimized subjects may have no base styles for the target
+            base_style_log.setdefault(target_id, target_base)[requirement.style_name] = random.choice(requirement.values)
+            return True
+    return False
+
+
+def resolve_dependencies(tree, base_style_log, modified_style_log):
+    """
+    Make the styles of a subject coherent, in place.
+
+    For every style whose context is missing, either the base style it
+    depends on is added to the parent (or element), or the style is dropped.
+    Styles the context was explicitly generated for are never overwritten.
+    """
+    parents = _parent_ids(tree)
+    for style_log, is_modified in ((base_style_log, False), (modified_style_log, True)):
+        # _coerce() may add entries to base_style_log
+        for element_id, styles in list(style_log.items()):
+            for style_name in list(styles.keys()):
+                for requirement in requirements_for(style_name):
+                    target_id = element_id if requirement.on == "self" else parents.get(element_id)
+                    target_base = base_style_log.get(target_id, {})
+                    target_modified = modified_style_log.get(target_id) if is_modified else None
+
+                    if _satisfied(requirement, target_base, target_modified):
+                        continue
+                    if not _coerce(target_id, requirement, base_style_log):
+                        del styles[style_name]
+                        break
+    return base_style_log, modified_style_log
@@ -0,0 +1,147 @@
+""" Compact, indexed view of the style data used for generation
+
+style_data.py holds the full Blink property metadata, which is slow to import
+and mostly unused. The fields that generation reads are compiled into
+style_catalog.json, which is loaded instead. The cache is rebuilt from
+style_data.py whenever the source changes.
+
+Besides the fields copied from style_data.py, each entry is marked
+"layout_inert" if changing the style can never move or resize a box (paint
+only styles, such as colors, backgrounds and shadows).
+
+Regenerate the cache with:
+
+    python -m lqc.generate.css.style_catalog
+"""
+
+import hashlib
+import json
+import os
+
+CATALOG_VERSION = 2
+CATALOG_FIELDS = ["name", "typedom_types", "keywords"]
+
+# Paint only styles that style_data.py has no metadata for. Styles that can
+# create a containing block (eg. filter, will-change) are not inert.
+PAINT_ONLY_STYLES = {
+    "opacity",
+    "outline-style",
+    "outline-width",
+    "outline-offset",
+    "cursor",
+    "pointer-events",
+    "user-select",
+    "isolation",
+    "mix-blend-mode",
+    "image-rendering",
+    "shape-rendering",
+    "text-decoration-line",
+    "text-decoration-style",
+    "text-decoration-thickness",
+    "text-underline-offset",
+    "text-underline-position",
+}
+
+STYLE_DATA_PATH = os.path.join(os.path.dirname(__file__), "style_data.py")
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), "style_catalog.json")
+
+cached_catalog = None
+
+
+class StyleCatalog():
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.by_name = {}
+        self.by_type = {}
+        for entry in entries:
+            self.by_name[entry["name"]] = entry
+            for typedom_type in entry.get("typedom_types", []):
+                self.by_type.setdefault(typedom_type, []).append(entry)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, style_name):
+        """ Get the entry for a style, or None if it isn't in the catalog """
+        return self.by_name.get(style_name)
+
+    def is_layout_inert(self, style_name):
+        """ Whether changing a style can never affect layout. Unknown styles are assumed to affect it """
+        entry = self.by_name.get(style_name)
+        return entry is not None and entry.get("layout_inert", False)
+
+    def entries_of_type(self, typedom_type):
+        """ Get all entries that accept a typedom type, eg. "Length" """
+        return self.by_type.get(typedom_type, [])
+
+
+def _source_hash():
+    with open(STYLE_DATA_PATH, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _is_paint_only(entry):
+    """ Whether a style_data entry is for a paint only style """
+    name = entry["name"]
+    return (
+        entry.get("affected_by_forced_colors", False)
+        or entry.get("is_background", False)
+        or name == "color"
+        or name.endswith("-color")
+        or name in PAINT_ONLY_STYLES
+    )
+
+
+def compile_entries():
+    """ Build the catalog entries from the full style data """
+    from lqc.generate.css.style_data import style_data
+    entries = []
+    for entry in style_data["data"]:
+        catalog_entry = {field: entry[field] for field in CATALOG_FIELDS if field in entry}
+        if _is_paint_only(entry):
+            catalog_entry["layout_inert"] = True
+        entries.append(catalog_entry)
+    return entries
+
+
+def write_style_catalog(path=CATALOG_PATH):
+    catalog_json = {
+        "version": CATALOG_VERSION,
+        "source_hash": _source_hash(),
+        "entries": compile_entries(),
+    }
+    with open(path, "w") as f:
+        json.dump(catalog_json, f, separators=(",", ":"))
+
+
+def load_style_catalog(path=CATALOG_PATH):
+    """ Load the compiled catalog, rebuilding it if it is missing or stale """
+    try:
+        with open(path, "r") as f:
+            catalog_json = json.load(f)
+        if catalog_json.get("version") == CATALOG_VERSION and catalog_json.get("source_hash") == _source_hash():
+            return StyleCatalog(catalog_json["entries"])
+    except (OSError, ValueError):
+        pass
+
+    try:
+        write_style_catalog(path)
+    except OSError:
+        print(f"Warning: Could not write style catalog cache {path}")
+    return StyleCatalog(compile_entries())
+
+
+def get_style_catalog():
+    global cached_catalog
+    if cached_catalog is None:
+        cached_catalog = load_style_catalog()
+    return cached_catalog
+
+
+if __name__ == "__main__":
+    write_style_catalog()
+    print(f"Wrote {CATALOG_PATH}")
@@ -5,8 +5,9 @@ from lqc.generate.css.util.length import generate as generate_length
 
 class StyleGenerator():
 
-    def __init__(self):
-        self.config = Config()
+    def __init__(self, config=None, coverage_map=None):
+        self.config = config if config is not None else Config()
+        self.coverage_map = coverage_map
 
     def _lengthGenerator(self, style_name):
         generator = generate_length
@@ -18,8 +19,14 @@ class StyleGenerator():
         weight = self.config.getStyleValueWeights(style_name, value_type="percentage")
         return generator, weight
 
+    def _keywordWeight(self, style_name, keyword):
+        weight = self.config.getStyleValueWeights(style_name, keyword=keyword)
+        if self.coverage_map is not None:
+            weight *= self.coverage_map.keyword_bias(style_name, keyword)
+        return weight
+
     def _keywordGenerators(self, style_name, keywords):
-        return [(lambda x=k: x, self.config.getStyleValueWeights(style_name, keyword=k)) for k in keywords]
+        return [(lambda x=k: x, self._keywordWeight(style_name, k)) for k in keywords]
 
     def _customGenerators(self, style_name):
         generators = custom_generators.generators_for(style_name)
@@ -0,0 +1,104 @@
+from bisect import bisect
+from random import random
+import numpy as np
+from lqc.generate.css.style_catalog import get_style_catalog
+from lqc.generate.css.style_generator import StyleGenerator
+
+
+class CompiledStyle():
+    """ A style that can be generated, with its weights resolved ahead of time """
+
+    __slots__ = ("name", "probability", "generators", "cum_weights", "total_weight")
+
+    def __init__(self, name, probability, weighted_generators):
+        self.name = name
+        self.probability = probability
+        self.generators = [g for g, _ in weighted_generators]
+        self.cum_weights = []
+        total = 0
+        for _, weight in weighted_generators:
+            total += weight
+            self.cum_weights.append(total)
+        self.total_weight = total
+
+    def pickGenerator(self):
+        """ Pick a value generator at random, honoring weights """
+        return self.generators[bisect(self.cum_weights, random() * self.total_weight)]
+
+
+class StyleSampler():
+    """
+    Generates style maps for a Config.
+
+    All config lookups (inclusion probabilities and value weights) are done
+    once, when the sampler is built. Styles that can never be generated
+    (probability 0, or no generator with a non-zero weight) are dropped.
+
+    If a CoverageMap is given, the probabilities and keyword weights are
+    biased towards styles that have been tested less.
+    """
+
+    def __init__(self, config, style_entries=None, coverage_map=None):
+        if style_entries is None:
+            style_entries = get_style_catalog().entries
+
+        style_value_generator = StyleGenerator(config, coverage_map)
+        self.styles = []
+        for current_style in style_entries:
+            probability = config.getStyleProbability(current_style["name"])
+            if probability <= 0:
+                continue
+            if coverage_map is not None:
+                probability = min(1.0, probability * coverage_map.style_bias(current_style["name"]))
+            weighted_generators = [
+                (g, w) for g, w in style_value_generator.getWeightedGenerators(current_style) if w > 0
+            ]
+            if len(weighted_generators) == 0:
+                continue
+            self.styles.append(CompiledStyle(current_style["name"], probability, weighted_generators))
+
+        # Tables for batch sampling. The cumulative weights of every style are
+        # normalized and shifted by the style's index, so style j occupies the
+        # range (j, j + 1] of one flat array that np.searchsorted can use for
+        # all styles at once.
+        self.probabilities = np.array([s.probability for s in self.styles], dtype=float)
+        self.offsets = np.zeros(len(self.styles), dtype=np.int64)
+        self.generator_counts = np.array([len(s.generators) for s in self.styles], dtype=np.int64)
+        flat_cum_weights = []
+        for j, style in enumerate(self.styles):
+            self.offsets[j] = len(flat_cum_weights)
+            flat_cum_weights.extend(j + w / style.total_weight for w in style.cum_weights)
+        self.flat_cum_weights = np.array(flat_cum_weights, dtype=float)
+
+    def sample_styles(self):
+        """ Generate a {style_name: style_value} map for one element """
+        styles = {}
+        for style in self.styles:
+            if random() < style.probability:
+                styles[style.name] = style.generators[bisect(style.cum_weights, random() * style.total_weight)]()
+        return styles
+
+    def sample_style_maps(self, count, rng=None):
+        """
+        Generate `count` style maps at once.
+
+        The inclusion decisions for every (map, style) pair are drawn as one
+        random matrix, and the value generator choices are drawn in bulk.
+        Each map has the same distribution as one from sample_styles().
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        style_maps = [{} for _ in range(count)]
+        if count == 0 or len(self.styles) == 0:
+            return style_maps
+
+        included = rng.random((count, len(self.styles))) < self.probabilities
+        rows, cols = np.nonzero(included)
+        picks = np.searchsorted(self.flat_cum_weights, cols + rng.random(len(cols)), side="right") - self.offsets[cols]
+        picks = np.minimum(picks, self.generator_counts[cols] - 1)
+
+        # np.nonzero is row-major, so styles keep the catalog order within each map
+        for row, col, pick in zip(rows.tolist(), cols.tolist(), picks.tolist()):
+            style = self.styles[col]
+            style_maps[row][style.name] = style.generators[pick]()
+        return style_maps
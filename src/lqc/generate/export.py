@@ -0,0 +1,207 @@
+""" Bulk export of generated test pages
+
+Generates lean test pages ahead of time (eg. on machines without a browser)
+and writes them to a directory, or to a single tar/zip file or stream, along
+with the harness JS files they load (--extra-js) and a manifest.json:
+
+    {
+        "config_hash": "...",
+        "config": {...},
+        "tests": [{"file": "test-000000.html", "seed": 123, "config_hash": "...", "signature": "..."}, ...]
+    }
+
+Every test can be re-created from its seed under the same config (see
+style_log_generator.regenerate_run_subject), eg. to minify a test that found
+a bug on a browser node.
+"""
+
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tarfile
+import time
+import zipfile
+
+from lqc.config.config import Config, parse_config
+from lqc.generate.seed import new_seed
+from lqc.generate.style_log_generator import generate_run_subject
+from lqc.generate.web_page.assets import registry
+from lqc.generate.web_page.create import html_bytes
+from lqc.rules.static_filter import is_layout_inert
+
+MANIFEST_FILE_NAME = "manifest.json"
+TEST_FILE_NAME = "test-{index:06d}.html"
+# Seeds tried per test before giving up, when most generated tests are layout inert
+MAX_SEEDS_PER_TEST = 100
+
+
+# =============================
+# Output Writers
+# =============================
+
+class DirectoryWriter():
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def add(self, name, data: bytes):
+        with open(os.path.join(self.path, name), "wb") as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+
+class TarWriter():
+    """ Writes a tar file, or a tar stream to stdout if the path is "-" """
+
+    def __init__(self, path):
+        compressed = path.endswith(".gz") or path.endswith(".tgz")
+        if path == "-":
+            self.tar = tarfile.open(fileobj=sys.stdout.buffer, mode="w|")
+        else:
+            self.tar = tarfile.open(path, mode="w:gz" if compressed else "w")
+
+    def add(self, name, data: bytes):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self.tar.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.tar.close()
+
+
+class ZipWriter():
+
+    def __init__(self, path):
+        self.zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, name, data: bytes):
+        self.zip.writestr(name, data)
+
+    def close(self):
+        self.zip.close()
+
+
+def open_writer(output):
+    """ Pick a writer from the output path: "-", *.tar, *.tar.gz or *.tgz, *.zip, or a directory """
+    if output == "-" or output.endswith((".tar", ".tar.gz", ".tgz")):
+        return TarWriter(output)
+    elif output.endswith(".zip"):
+        return ZipWriter(output)
+    else:
+        return DirectoryWriter(output)
+
+
+# =============================
+# Generation
+# =============================
+
+def _init_worker(config_dict):
+    Config(config_dict)
+
+
+def _render(seed_and_js):
+    """ Generate and render the test for a seed. Returns None if the test is layout inert """
+    seed, extra_js_file_names = seed_and_js
+    run_subject = generate_run_subject(seed=seed)
+    if Config().isStaticFilterEnabled() and is_layout_inert(run_subject):
+        return None
+    page = html_bytes(run_subject, extra_js_file_names=extra_js_file_names)
+    return {
+        "seed": seed,
+        "config_hash": run_subject.config_hash,
+        "signature": run_subject.styles_signature(),
+        "page": page,
+    }
+
+
+def _rendered_tests(num_tests, base_seed, processes, extra_js_file_names, log=print):
+    """
+    Yield num_tests rendered tests, for seeds base_seed, base_seed + 1, ... (skipping layout inert ones).
+    Stops early if MAX_SEEDS_PER_TEST * num_tests seeds were tried, eg. if the config only generates inert tests
+    """
+    next_seed = base_seed
+    remaining = num_tests
+    max_seed = base_seed + MAX_SEEDS_PER_TEST * num_tests
+    pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(Config().getConfigDict(),)) if processes > 0 else None
+    try:
+        while remaining > 0:
+            if next_seed >= max_seed:
+                if log:
+                    log(f"Warning: stopped after trying {max_seed - base_seed} seeds, {remaining} of {num_tests} tests were not generated as the others were layout inert")
+                return
+            seeds = [(seed, extra_js_file_names) for seed in range(next_seed, min(next_seed + remaining, max_seed))]
+            next_seed += len(seeds)
+            results = pool.imap(_render, seeds, chunksize=16) if pool else map(_render, seeds)
+            for result in results:
+                if result is not None:
+                    remaining -= 1
+                    yield result
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+
+def export_tests(output, num_tests, base_seed=None, processes=0, extra_js_file_names=(), log=print):
+    """
+    Generate num_tests test pages for the current Config and write them to output,
+    with the harness files (see assets.py) among extra_js_file_names. Returns the manifest.
+    """
+    if base_seed is None:
+        base_seed = new_seed()
+    extra_js_file_names = list(extra_js_file_names)
+
+    writer = open_writer(output)
+    try:
+        tests = []
+        for index, result in enumerate(_rendered_tests(num_tests, base_seed, processes, extra_js_file_names, log)):
+            file_name = TEST_FILE_NAME.format(index=index)
+            writer.add(file_name, result.pop("page"))
+            tests.append({"file": file_name, **result})
+            if log and (index + 1) % 1000 == 0:
+                log(f"Generated {index + 1}/{num_tests} tests")
+
+        # The extra JS files that are lqc assets go along with the pages, others (eg. grizzly's helpers.js) are up to the test runner
+        for name in extra_js_file_names:
+            if name in registry.paths:
+                writer.add(name, registry.bytes(name))
+            elif log:
+                log(f"Not writing {name}, it isn't a harness file: it must be provided where the pages are run")
+
+        manifest = {
+            "config_hash": Config().getConfigHash(),
+            "config": Config().getConfigDict(),
+            "tests": tests,
+        }
+        writer.add(MANIFEST_FILE_NAME, json.dumps(manifest, indent=2).encode("utf-8"))
+    finally:
+        writer.close()
+    return manifest
+
+
+def add_generate_command(subparsers):
+    parser = subparsers.add_parser("generate", help="generate test pages ahead of time")
+    parser.add_argument("-n", "--num-tests", help="number of test pages to generate", type=int, required=True)
+    parser.add_argument("-o", "--output", help="output directory, .tar/.tar.gz/.zip file, or - for a tar stream on stdout", type=str, required=True)
+    parser.add_argument("-c", "--config-file", help="path to config file to use", type=str, required=True)
+    parser.add_argument("-j", "--processes", help="number of generator processes (0 generates in this process)", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("-s", "--seed", help="seed of the first test; test i uses seed + i (default: random)", type=int, default=None)
+    parser.add_argument("--extra-js", help="extra JS file name for the pages to load, eg. for grizzly (repeatable)", action="append", default=[])
+    parser.set_defaults(func=generate_command)
+
+
+def generate_command(args):
+    Config(parse_config(args.config_file))
+
+    # Keep stdout clean when it is the output stream
+    log = (lambda message: print(message, file=sys.stderr)) if args.output == "-" else print
+    start = time.time()
+    manifest = export_tests(args.output, args.num_tests, base_seed=args.seed, processes=args.processes, extra_js_file_names=args.extra_js, log=log)
+    log(f"Wrote {len(manifest['tests'])} tests to {args.output} in {time.time() - start:.1f}s")
+    return 0
@@ -0,0 +1,187 @@
+""" Mutation-based generation
+
+Instead of generating every test from scratch, a Mutator takes run subjects
+from a corpus and applies a few small mutations: adding, removing or changing
+a style, or cloning or moving a subtree. The corpus is seeded with saved bug
+reports (see SEED_FILE_NAMES), and grows with bugs found and with subjects
+that covered new style combinations during the run.
+
+Configured in the "mutation" section of the config file:
+
+- seed-directory: directory searched (recursively) for saved subjects
+- rate: share of tests that are mutated rather than generated (default 0, disabled)
+- max-mutations: most mutations applied to one test (default 3)
+
+Mutated tests are trimmed to the generation budget (see budget.py).
+"""
+
+import os
+import pickle
+from copy import deepcopy
+from random import choice, randint, random
+
+from lqc.config.config import Config
+from lqc.generate.budget import trim_to_budget
+from lqc.generate.style_log_generator import elements, make_run_subject
+from lqc.model.run_subject import RunSubject
+from lqc.util.short_ids import ShortIdAllocator
+
+SEED_FILE_NAMES = ("minified_run_subject.pkl", "run_subject_prerun.pkl")
+MAX_CORPUS_SIZE = 1000
+
+
+def load_seed_subjects(directory, file_names=SEED_FILE_NAMES):
+    """ Load every saved run subject under a directory """
+    run_subjects = []
+    for root, _dirs, files in os.walk(directory):
+        for name in sorted(files):
+            if name not in file_names:
+                continue
+            try:
+                with open(os.path.join(root, name), "rb") as f:
+                    run_subject = pickle.load(f)
+            except Exception as e:
+                print(f"Warning: Could not load seed subject {os.path.join(root, name)}: {e}")
+                continue
+            if isinstance(run_subject, RunSubject):
+                run_subjects.append(run_subject)
+    return run_subjects
+
+
+def _element_lists(tree):
+    """ Yield (sibling list, index) for every element in a tree """
+    for index, node in enumerate(tree):
+        if node["tag"] != "<text>":
+            yield tree, index
+            yield from _element_lists(node["children"])
+
+
+# =============================
+# Mutations
+# =============================
+# Each mutation changes a run subject in place and returns True if it could be applied
+
+def add_style(run_subject: RunSubject, sampler):
+    element_ids = [e["id"] for e in elements(run_subject.html_tree.tree)]
+    if not element_ids or not sampler.styles:
+        return False
+    style_map = choice([run_subject.base_styles.map, run_subject.modified_styles.map])
+    style = choice(sampler.styles)
+    style_map.setdefault(choice(element_ids), {})[style.name] = style.pickGenerator()()
+    return True
+
+
+def _existing_styles(run_subject: RunSubject):
+    return [
+        (style_map, element_id, style_name)
+        for style_map in (run_subject.base_styles.map, run_subject.modified_styles.map)
+        for element_id, styles in style_map.items()
+        for style_name in styles
+    ]
+
+
+def remove_style(run_subject: RunSubject, sampler):
+    existing = _existing_styles(run_subject)
+    if not existing:
+        return False
+    style_map, element_id, style_name = choice(existing)
+    del style_map[element_id][style_name]
+    return True
+
+
+def change_value(run_subject: RunSubject, sampler):
+    by_name = {style.name: style for style in sampler.styles}
+    existing = [s for s in _existing_styles(run_subject) if s[2] in by_name]
+    if not existing:
+        return False
+    style_map, element_id, style_name = choice(existing)
+    style_map[element_id][style_name] = by_name[style_name].pickGenerator()()
+    return True
+
+
+def clone_subtree(run_subject: RunSubject, sampler):
+    """ Insert a copy of a subtree (with its styles, under new ids) next to it """
+    locations = list(_element_lists(run_subject.html_tree.tree))
+    if not locations:
+        return False
+    siblings, index = choice(locations)
+    clone = deepcopy(siblings[index])
+
+    ids = ShortIdAllocator(run_subject.getElementIds())
+    for element in elements([clone]):
+        old_id = element["id"]
+        element["id"] = ids.next()
+        for style_map in (run_subject.base_styles.map, run_subject.modified_styles.map):
+            if old_id in style_map:
+                style_map[element["id"]] = dict(style_map[old_id])
+
+    siblings.insert(index + 1, clone)
+    return True
+
+
+def move_subtree(run_subject: RunSubject, sampler):
+    """ Move a subtree to another position, possibly under another parent """
+    tree = run_subject.html_tree.tree
+    locations = list(_element_lists(tree))
+    if not locations:
+        return False
+    siblings, index = choice(locations)
+    subtree = siblings.pop(index)
+
+    # Any child list outside of the moved subtree can receive it
+    targets = [tree] + [nodes[i]["children"] for nodes, i in _element_lists(tree)]
+    target = choice(targets)
+    target.insert(randint(0, len(target)), subtree)
+    return True
+
+
+MUTATIONS = [add_style, remove_style, change_value, clone_subtree, move_subtree]
+
+
+class Mutator():
+    """ Generates tests by mutating run subjects from a corpus """
+
+    def __init__(self, corpus=None, rate=0.5, max_mutations=3):
+        self.corpus = list(corpus or [])
+        self.rate = rate
+        self.max_mutations = max_mutations
+
+    def add(self, run_subject: RunSubject):
+        """ Add an interesting subject to the corpus """
+        if len(self.corpus) >= MAX_CORPUS_SIZE:
+            self.corpus[randint(0, len(self.corpus) - 1)] = run_subject.deepcopy()
+        else:
+            self.corpus.append(run_subject.deepcopy())
+
+    def should_mutate(self):
+        return len(self.corpus) > 0 and random() < self.rate
+
+    def mutate(self, run_subject: RunSubject = None):
+        """ Return a mutated copy of a subject (by default, a random subject from the corpus) """
+        if run_subject is None:
+            run_subject = choice(self.corpus)
+        mutant = run_subject.deepcopy()
+        sampler = Config().getStyleSampler()
+
+        num_mutations = randint(1, self.max_mutations)
+        applied = 0
+        for _ in range(num_mutations * 4):
+            if choice(MUTATIONS)(mutant, sampler):
+                applied += 1
+                if applied == num_mutations:
+                    break
+
+        mutant = make_run_subject(mutant.html_tree.tree, mutant.base_styles.map, mutant.modified_styles.map)
+        # Eg. cloned subtrees would otherwise grow the subjects of the corpus without limit
+        return trim_to_budget(mutant, Config().getGenerationBudget())
+
+
+def load_mutator():
+    """ Build a Mutator from the config, or return None if mutation is disabled """
+    conf = Config()
+    if conf.getMutationRate() <= 0:
+        return None
+    corpus = []
+    if conf.getMutationSeedDirectory():
+        corpus = load_seed_subjects(conf.getMutationSeedDirectory())
+    return Mutator(corpus, rate=conf.getMutationRate(), max_mutations=conf.getMaxMutations())
@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+import queue
+
+from lqc.config.config import Config, parse_config
+from lqc.generate.adaptive_weights import ADAPT_INTERVAL
+from lqc.generate.coverage import COVERAGE_UPDATE_INTERVAL, CoverageMap
+from lqc.generate.style_log_generator import generate_run_subjects
+from lqc.generate.web_page.create import html_string
+from lqc.generate.web_page.html_body.create import create as html_body
+from lqc.model.constants import HarnessMode, PageProfile
+
+PUT_TIMEOUT = 0.1
+GET_TIMEOUT = 1.0
+# Tests generated at once by a worker, see generate_run_subjects()
+GENERATE_BATCH_SIZE = 16
+
+
+def render(run_subject):
+    """ What the runner needs rendered for a test: the page, or only its body for the persistent harness """
+    harness_mode = Config().getHarnessMode()
+    if harness_mode == HarnessMode.PERSISTENT:
+        return html_body(run_subject)
+    if harness_mode == HarnessMode.HTTP:
+        return html_string(run_subject, profile=PageProfile.SERVED)
+    return html_string(run_subject)
+
+
+def _produce(config_dict, page_queue, stop_event, weights_file=None):
+    """ Worker process: keep the queue filled with (run_subject, page) pairs, generated in batches """
+    config = Config(config_dict)
+    coverage_file = config.getCoverageFile()
+    num_generated = 0
+    next_coverage_update = next_weights_update = 0
+    while not stop_event.is_set():
+        # Pick up the coverage map and learned weights saved by the consumer
+        if coverage_file and num_generated >= next_coverage_update:
+            next_coverage_update = num_generated + COVERAGE_UPDATE_INTERVAL
+            if os.path.exists(coverage_file):
+                config.setCoverageMap(CoverageMap.load(coverage_file))
+        if weights_file and num_generated >= next_weights_update:
+            next_weights_update = num_generated + ADAPT_INTERVAL
+            if os.path.exists(weights_file):
+                config.setStyleWeights(parse_config(weights_file).get("style-weights", {}))
+
+        for run_subject in generate_run_subjects(GENERATE_BATCH_SIZE):
+            num_generated += 1
+            page = render(run_subject)
+            while not stop_event.is_set():
+                try:
+                    page_queue.put((run_subject, page), timeout=PUT_TIMEOUT)
+                    break
+                except queue.Full:
+                    continue
+            if stop_event.is_set():
+                break
+
+
+class PreGenerator():
+    """
+    Generates and renders tests ahead of time in worker processes.
+
+    Ready-to-run tests are kept in a bounded queue, so the consumer (the
+    browser loop) only ever pops a test and runs it. Workers generate
+    GENERATE_BATCH_SIZE tests at a time, so the tests aren't seeded.
+    """
+
+    def __init__(self, num_workers=1, queue_size=16, weights_file=None):
+        self.num_workers = num_workers
+        self.queue_size = queue_size
+        self.weights_file = weights_file
+        self.page_queue = None
+        self.stop_event = None
+        self.workers = []
+
+    def start(self):
+        self.page_queue = multiprocessing.Queue(self.queue_size)
+        self.stop_event = multiprocessing.Event()
+        config_dict = Config().getConfigDict()
+        self.workers = [
+            multiprocessing.Process(target=_produce, args=(config_dict, self.page_queue, self.stop_event, self.weights_file), daemon=True)
+            for _ in range(self.num_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+        return self
+
+    def get(self):
+        """
+        Get the next (run_subject, page) pair, waiting for one if the queue is empty.
+        Raises RuntimeError if every worker has exited (eg. crashed, or was killed)
+        """
+        while True:
+            try:
+                return self.page_queue.get(timeout=GET_TIMEOUT)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in self.workers):
+                    exit_codes = [worker.exitcode for worker in self.workers]
+                    raise RuntimeError(f"Every test generator process has exited (exit codes {exit_codes})")
+
+    def close(self):
+        if self.stop_event is None:
+            return
+        self.stop_event.set()
+        # Drain the queue so that no worker is blocked writing to it
+        try:
+            while True:
+                self.page_queue.get_nowait()
+        except queue.Empty:
+            pass
+        for worker in self.workers:
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.terminate()
+        self.page_queue.close()
+        self.workers = []
+        self.stop_event = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.close()
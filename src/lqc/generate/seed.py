@@ -0,0 +1,26 @@
+import random
+from contextlib import contextmanager
+
+_system_random = random.SystemRandom()
+
+
+def new_seed():
+    """ A fresh 64 bit seed, independent of the state of the `random` module """
+    return _system_random.getrandbits(64)
+
+
+@contextmanager
+def seeded_random(seed_material):
+    """
+    Seed the `random` module for the duration of the block.
+
+    The value generators, lorem and the tree generator all draw from the
+    module level generator, so seeding it makes generation reproducible.
+    The caller's random state is restored afterwards.
+    """
+    state = random.getstate()
+    random.seed(seed_material)
+    try:
+        yield
+    finally:
+        random.setstate(state)
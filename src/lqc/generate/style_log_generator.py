@@ -1,13 +1,14 @@
-import uuid
 import lorem
-from random import random, choice
+from random import random
 from lqc.config.config import Config
-from lqc.generate.css.style_data import style_data
-from lqc.generate.css.style_generator import StyleGenerator
+from lqc.generate.budget import MAX_GENERATE_ATTEMPTS, apply_length_budget, trim_to_budget, within_budget
+from lqc.generate.seed import seeded_random
+from lqc.generate.css.dependencies import resolve_dependencies
 from lqc.generate.css.util import length, keyword
 from lqc.model.run_subject import RunSubject
 from lqc.model.element_tree import ElementTree
 from lqc.model.style_map import StyleMap
+from lqc.util.short_ids import ShortIdAllocator
 
 SUPPORTED_STYLE_TYPES = ["Length", "Keyword"]
 
@@ -34,28 +35,41 @@ def is_supported_type(typedom_type, current_style):
         return False
 
 
+class TreeState():
+    """ Element ids and the remaining budget while generating one layout tree """
+
+    def __init__(self, budget):
+        self.ids = ShortIdAllocator()
+        self.budget = budget
+        self.num_elements = 0
+        self.text_length = 0
+
+    def can_add_element(self, depth):
+        if self.budget.max_elements and self.num_elements >= self.budget.max_elements:
+            return False
+        if self.budget.max_depth and depth > self.budget.max_depth:
+            return False
+        return True
+
+    def text_remaining(self):
+        if not self.budget.max_text_length:
+            return None
+        return self.budget.max_text_length - self.text_length
+
+
 def generate_styles():
-    styles = {}
-    style_config = Config()
-    style_value_generator = StyleGenerator()
-    for current_style in style_data["data"]:
-        style_probability = style_config.getStyleProbability(current_style["name"])
-        if random() < style_probability:
-            gen = style_value_generator.pickGenerator(current_style)
-            if gen:
-                style_name = current_style["name"]
-                style_value = gen()
-                styles[style_name] = style_value
-    return styles
-
-
-def generate_child():
+    return Config().getStyleSampler().sample_styles()
+
+
+def generate_child(tree_state, depth):
+    if not tree_state.can_add_element(depth):
+        return None
+
     child_tag = "div"
-    child_id = uuid.uuid4().hex
-    for n in range(10): # Replace the numbers with letters, for ease of use in JS
-        child_id = child_id.replace(str(n), choice("abcdefghijklmnopqrstuvwxyz"))
+    child_id = tree_state.ids.next()
+    tree_state.num_elements += 1
 
-    grandchildren = generate_children(child_tag)
+    grandchildren = generate_children(child_tag, tree_state, depth)
 
     return {
         "tag": child_tag,
@@ -64,29 +78,43 @@ def generate_child():
     }
 
 
-def generate_text():
+def generate_text(tree_state):
+    text_remaining = tree_state.text_remaining()
+    if text_remaining is not None and text_remaining <= 0:
+        return None
+
     text = lorem.sentence()
     while random() < mult_sentence_prob:
         if random() < newline_prob:
             text += "\n"
         text += " " + lorem.sentence()
+
+    if text_remaining is not None:
+        text = text[:text_remaining]
+    tree_state.text_length += len(text)
     return {"tag": "<text>", "value": text, "children": []}
 
 
-def generate_random_child_type():
+def generate_random_child_type(tree_state, depth):
     if random() < text_prob:
-        return generate_text()
+        return generate_text(tree_state)
     else:
-        return generate_child()
+        return generate_child(tree_state, depth)
 
 
-def generate_children(parent_tag):
+def generate_children(parent_tag, tree_state, depth=0):
+    """ Generate the children of an element at `depth` (body is at depth 0) """
     children = []
 
+    def add_child():
+        child = generate_random_child_type(tree_state, depth + 1)
+        if child:
+            children.append(child)
+
     if random() < has_children[parent_tag]:
-        children.append(generate_random_child_type())
+        add_child()
         while random() <= has_multiple_children[parent_tag]:
-            children.append(generate_random_child_type())
+            add_child()
 
     return children
 
@@ -102,13 +130,96 @@ def generate_style_log(tree):
     return {e["id"]: generate_styles() for e in elements(tree)}
 
 
-def generate_layout_tree():
-    return generate_children("body")
-
+def make_run_subject(body, base_style_log, modified_style_log):
+    """ Build a run subject from generated style logs, applying the dependency model and length budget """
+    config = Config()
+    if config.isDependencyAware():
+        resolve_dependencies(body, base_style_log, modified_style_log)
+    run_subject = RunSubject(ElementTree(body), StyleMap(base_style_log), StyleMap(modified_style_log))
+    return apply_length_budget(run_subject, config.getGenerationBudget())
 
-def generate_run_subject():
-    body = generate_layout_tree()
-    base_style_log = generate_style_log(body)
-    modified_style_log = generate_style_log(body)
 
-    return RunSubject(ElementTree(body), StyleMap(base_style_log), StyleMap(modified_style_log))
+def generate_layout_tree():
+    return generate_children("body", TreeState(Config().getGenerationBudget()))
+
+
+def _generate_run_subject():
+    budget = Config().getGenerationBudget()
+    for _ in range(MAX_GENERATE_ATTEMPTS):
+        body = generate_layout_tree()
+        base_style_log = generate_style_log(body)
+        modified_style_log = generate_style_log(body)
+
+        run_subject = make_run_subject(body, base_style_log, modified_style_log)
+        if within_budget(run_subject, budget):
+            return run_subject
+    # Still over budget, shrink the last attempt to fit
+    return trim_to_budget(run_subject, budget)
+
+
+def generate_run_subject(seed=None):
+    """
+    Generate a random run subject.
+
+    If a seed is given, generation is deterministic: the same seed and the
+    same config (see Config.getConfigHash()) always produce the same subject.
+    """
+    if seed is None:
+        return _generate_run_subject()
+
+    config_hash = Config().getConfigHash()
+    with seeded_random(f"{config_hash}:{seed}"):
+        run_subject = _generate_run_subject()
+    run_subject.seed = seed
+    run_subject.config_hash = config_hash
+    return run_subject
+
+
+def regenerate_run_subject(seed, config_hash):
+    """ Re-create a subject from its seed, under the config it was generated with """
+    if config_hash != Config().getConfigHash():
+        message = f"Run subject was generated with config {config_hash}, but config {Config().getConfigHash()} is loaded"
+        if "-" in config_hash:
+            message += ". It was generated under a coverage snapshot (coverage-file), it can't be regenerated from its seed"
+        raise ValueError(message)
+    return generate_run_subject(seed)
+
+
+def _generate_batch(n):
+    bodies = [generate_layout_tree() for _ in range(n)]
+    element_ids = [[e["id"] for e in elements(body)] for body in bodies]
+    num_elements = sum(len(ids) for ids in element_ids)
+
+    style_maps = iter(Config().getStyleSampler().sample_style_maps(2 * num_elements))
+    base_style_logs = [{element_id: next(style_maps) for element_id in ids} for ids in element_ids]
+    modified_style_logs = [{element_id: next(style_maps) for element_id in ids} for ids in element_ids]
+
+    return [
+        make_run_subject(body, base_style_log, modified_style_log)
+        for body, base_style_log, modified_style_log in zip(bodies, base_style_logs, modified_style_logs)
+    ]
+
+
+def generate_run_subjects(n):
+    """
+    Generate n run subjects, drawing the styles for all of them in one batch.
+
+    As with generate_run_subject(), subjects over the budget are regenerated
+    (in another batch), and trimmed if they are still over it after
+    MAX_GENERATE_ATTEMPTS. The subjects are not seeded.
+    """
+    budget = Config().getGenerationBudget()
+    run_subjects = [None] * n
+    pending = list(range(n))
+    for _ in range(MAX_GENERATE_ATTEMPTS):
+        over_budget = []
+        for index, run_subject in zip(pending, _generate_batch(len(pending))):
+            run_subjects[index] = run_subject
+            if not within_budget(run_subject, budget):
+                over_budget.append(index)
+        pending = over_budget
+        if not pending:
+            break
+    for index in pending:
+        trim_to_budget(run_subjects[index], budget)
+    return run_subjects
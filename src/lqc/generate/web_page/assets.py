@@ -0,0 +1,80 @@
+""" Harness files (JS) used by the test pages
+
+Every harness file is read once, and kept as text, as UTF-8 bytes and with
+its sha256, for writing next to test pages, serving, or adding to a grizzly
+testcase.
+
+For development, set LQC_RELOAD_ASSETS=1 to re-read a file whenever its
+modification time changes.
+"""
+
+import hashlib
+import os
+
+JS_DIR = os.path.join(os.path.dirname(__file__), "javascript")
+
+
+class Asset():
+
+    __slots__ = ("name", "path", "text", "data", "sha256", "mtime")
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.load()
+
+    def load(self):
+        with open(self.path, "rb") as f:
+            self.data = f.read()
+        self.mtime = os.path.getmtime(self.path)
+        self.text = self.data.decode("utf-8")
+        self.sha256 = hashlib.sha256(self.data).hexdigest()
+
+
+class AssetRegistry():
+
+    def __init__(self, reload=False):
+        self.reload = reload
+        self.paths = {}
+        self.assets = {}
+        self.written = {}  # {file path: sha256} of files written by write_files()
+
+    def register(self, name, path):
+        """ Register a file under a name. It is loaded on first use """
+        if self.paths.get(name) != path:
+            self.paths[name] = path
+            self.assets.pop(name, None)
+
+    def get(self, name) -> Asset:
+        asset = self.assets.get(name)
+        if asset is None:
+            asset = self.assets[name] = Asset(name, self.paths[name])
+        elif self.reload and os.path.getmtime(asset.path) != asset.mtime:
+            asset.load()
+        return asset
+
+    def text(self, name):
+        return self.get(name).text
+
+    def bytes(self, name):
+        return self.get(name).data
+
+    def write_files(self, folder, names):
+        """ Write assets into a folder, skipping files this registry already wrote with the same contents """
+        for name in names:
+            asset = self.get(name)
+            file_path = os.path.join(folder, name)
+            if self.written.get(file_path) == asset.sha256 and os.path.exists(file_path):
+                continue
+            with open(file_path, "wb") as f:
+                f.write(asset.data)
+            self.written[file_path] = asset.sha256
+
+
+registry = AssetRegistry(reload=os.environ.get("LQC_RELOAD_ASSETS", "") == "1")
+registry.register("style_changes.js", os.path.join(JS_DIR, "style_changes.js"))
+registry.register("minimal.js", os.path.join(JS_DIR, "minimal.js"))
+registry.register("detection.js", os.path.join(JS_DIR, "detection.js"))
+registry.register("debugging_tools.js", os.path.join(JS_DIR, "debugging_tools.js"))
+registry.register("harness.js", os.path.join(JS_DIR, "harness.js"))
+registry.register("batch.js", os.path.join(JS_DIR, "batch.js"))
@@ -1,9 +1,10 @@
 from enum import Enum, unique
-from lqc.generate.web_page.util import formatWithIndent
+from lqc.generate.web_page.util import IndentTemplate
+from lqc.model.constants import PageProfile, StyleChangeFormat
 from lqc.model.run_result import RunResult
 from lqc.model.run_subject import RunSubject
-from lqc.generate.web_page.html_body.create import create as html_body
-from lqc.generate.web_page.javascript.create import create as js_minimal
+from lqc.generate.web_page.html_body.create import write as write_html_body
+from lqc.generate.web_page.javascript.create import create as js_minimal, create_batch as js_batch, create_harness as js_harness, create_lean as js_lean
 
 html_template = """<!DOCTYPE html>
 <html>
@@ -16,6 +17,7 @@ html_template = """<!DOCTYPE html>
 
     <!-- For a minimal version of this bug, remove all optional JS Files -->
     <!-- Start: Optional JS Files -->
+    <script src="detection.js"></script>
     <script src="debugging_tools.js"></script>
     {extra_js_files_string}
     <!-- End: Optional JS Files -->
@@ -27,6 +29,30 @@ html_template = """<!DOCTYPE html>
 
 </html>
 """
+compiled_html_template = IndentTemplate(html_template)
+
+# Lean pages have no debugging helpers, and load no files other than extra_js_file_names
+lean_html_template = """<!DOCTYPE html>
+<html>
+
+  <head>
+    <title>Layout QuickCheck</title>
+    <script>
+      {js_string}
+    </script>
+    {extra_js_files_string}
+  </head>
+
+  <body>
+    {body_string}
+  </body>
+
+</html>
+"""
+compiled_lean_html_template = IndentTemplate(lean_html_template)
+
+# Where served pages load detection.js from, see selenium_harness/page_server.py
+SERVED_DETECTION_URL = "/detection.js"
 
 def generate_extra_js_files_string(js_file_names):
 
@@ -37,16 +63,48 @@ def generate_extra_js_files_string(js_file_names):
     return  "\n".join([f'<script src="{js_file_name}"></script>' for js_file_name in js_file_names])
 
 
-def html_string(run_subject: RunSubject, run_result:RunResult=None, extra_js_file_names=[]):
+def write_html(out, run_subject: RunSubject, run_result:RunResult=None, extra_js_file_names=[], style_change_format=StyleChangeFormat.JSON, profile=PageProfile.LEAN):
+    """ Append the web page for a run subject to the list `out`. The body is streamed in, in one pass """
+
+    if profile == PageProfile.LEAN:
+        template = compiled_lean_html_template
+        js_string = js_lean(run_subject, style_change_format)
+    elif profile == PageProfile.SERVED:
+        template = compiled_lean_html_template
+        js_string = js_lean(run_subject, style_change_format, inline_detection=False)
+        extra_js_file_names = [SERVED_DETECTION_URL] + list(extra_js_file_names)
+    else:
+        template = compiled_html_template
+        js_string = js_minimal(run_subject, run_result, style_change_format)
 
-    body_string = html_body(run_subject)
     extra_js_files_string = generate_extra_js_files_string(extra_js_file_names)
-    js_string = js_minimal(run_subject, run_result)
 
-    return formatWithIndent(html_template, js_string=js_string, body_string=body_string, extra_js_files_string=extra_js_files_string)
+    def body_string(out, indent):
+        write_html_body(run_subject, out, indent)
 
+    return template.write(out, js_string=js_string, body_string=body_string, extra_js_files_string=extra_js_files_string)
+
+
+def html_string(run_subject: RunSubject, run_result:RunResult=None, extra_js_file_names=[], style_change_format=StyleChangeFormat.JSON, profile=PageProfile.LEAN):
+    return "".join(write_html([], run_subject, run_result, extra_js_file_names, style_change_format, profile))
 
-def save_as_web_page(run_subject: RunSubject, file_path, run_result=None):
-    with open(file_path, 'w') as file:
-        file.write(html_string(run_subject, run_result))
 
+def html_bytes(run_subject: RunSubject, run_result:RunResult=None, extra_js_file_names=[], style_change_format=StyleChangeFormat.JSON, profile=PageProfile.LEAN):
+    """ The page as UTF-8, eg. for grizzly's testcase.add_from_bytes() """
+    return html_string(run_subject, run_result, extra_js_file_names, style_change_format, profile).encode("utf-8")
+
+
+def harness_html_string():
+    """ The persistent harness page: a lean page with an empty body, that tests are run in (see harness.js) """
+    return "".join(compiled_lean_html_template.write([], js_string=js_harness(), body_string="", extra_js_files_string=""))
+
+
+def batch_html_string():
+    """ The batch harness page: a lean page with an empty body, that runs test pages in iframes (see batch.js) """
+    return "".join(compiled_lean_html_template.write([], js_string=js_batch(), body_string="", extra_js_files_string=""))
+
+
+def save_as_web_page(run_subject: RunSubject, file_path, run_result=None, style_change_format=StyleChangeFormat.STATEMENTS, profile=PageProfile.FULL):
+    """ Save a page for a run subject. By default it is a full page with readable style changes, as in bug reports """
+    with open(file_path, 'w') as file:
+        file.writelines(write_html([], run_subject, run_result, style_change_format=style_change_format, profile=profile))
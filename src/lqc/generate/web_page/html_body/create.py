@@ -1,48 +1,203 @@
-from functools import reduce
+import threading
+from contextlib import contextmanager
 from lqc.model.run_subject import RunSubject
-from lqc.generate.web_page.util import formatWithIndent
 
-current_template = """
-<{tag} style="{style}" {attributes_string} id="{element_id}">
-  {children_string}
-</{tag}>
-"""
+# Each element is rendered as:
+#
+#   <{tag} style="{style}" {attributes_string} id="{element_id}">
+#     {children_string}
+#   </{tag}>
+#
+# on its own lines, with the children indented by two more spaces.
+
+ALLOWED_ATTRIBUTES = ["onclick"]
+
+DEFAULT_FRAGMENT_CACHE_SIZE = 10000
+
+
+class FragmentCache():
+    """
+    Cache of rendered element subtrees.
+
+    A fragment is keyed by the element's tag, id, attributes and base styles,
+    its indent, and the numbers of its children's fragments: every distinct
+    fragment is numbered, so a lookup hashes a few small values per element,
+    never the rendered text.
+
+    Subtrees are also looked up by identity: a subtree (element dict) that was
+    rendered before, with the same base styles dict, is not walked again.
+    Minimization candidates share every subtree they don't change with the
+    subject they come from (see RunSubject.copy_path()), so rendering one only
+    walks the changed path from the body down, and the children of the
+    elements on it: O(depth), not O(page). This relies on rendered subtrees
+    never being changed in place, which holds for subjects from
+    MinifyStepFactory; other subjects are new objects, and fall back to the
+    keyed lookup.
+
+    The cache is cleared when it holds more than max_entries fragments.
+    """
+
+    def __init__(self, max_entries=DEFAULT_FRAGMENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.fragments = {}  # {key: (number, fragment)}
+        self.subtrees = {}  # {(id(element), indent): (element, base styles, (number, fragment))}
+        self.next_number = 0
+
+    def put(self, key, fragment):
+        """ Store a fragment, returns its (number, fragment) entry """
+        if len(self.fragments) >= self.max_entries or len(self.subtrees) >= self.max_entries:
+            self.fragments.clear()
+            self.subtrees.clear()
+        entry = self.fragments[key] = (self.next_number, fragment)
+        self.next_number += 1
+        return entry
+
+
+# Cache used by write() in each thread, see use_fragment_cache(). Per thread,
+# as FragmentCache isn't thread safe: eg. the bug report writer renders pages
+# while the main thread minimizes the next bug through its cache
+_active = threading.local()
+
+
+def active_fragment_cache():
+    return getattr(_active, "cache", None)
+
+
+@contextmanager
+def use_fragment_cache(cache=None):
+    """ Render bodies through a FragmentCache (a new one by default) within the block, in this thread """
+    previous = active_fragment_cache()
+    _active.cache = cache if cache is not None else FragmentCache()
+    try:
+        yield _active.cache
+    finally:
+        _active.cache = previous
+
+
+def _style_string(styles, element):
+    return ";".join(
+        [
+            f"{name}:{value}"
+            for name, value in styles.get(element.get("id", ""), {}).items()
+        ]
+    )
+
+
+def _attributes_string(element):
+    attributes_dict = element.get("attributes", {})
+    return " ".join(
+        f"{name}='{value}'"
+        for name, value in attributes_dict.items() if name in ALLOWED_ATTRIBUTES
+    )
 
-def create(run_subject: RunSubject):
 
-    body = run_subject.html_tree.tree
+def write(run_subject: RunSubject, out, indent=""):
+    """
+    Append the body of a run subject to the list `out`, in one pass over the tree.
+
+    `indent` is added after every newline, as if the body string was indented
+    with util.indent() afterwards.
+    """
+    cache = active_fragment_cache()
+    if cache is not None:
+        return _write_cached(run_subject, out, indent, cache)
+
     styles = run_subject.base_styles.map
+    # Newline + indent strings, per nesting level
+    newlines = {}
+
+    def write_children(tree, current_indent):
+        for element in tree:
+            tag = element["tag"]
+            if tag == "<text>":
+                out.append(element["value"].replace("\n", "\n" + current_indent))
+                continue
+
+            style = _style_string(styles, element)
+            attributes_string = _attributes_string(element)
+            element_id = element.get("id", "")
+            newline = newlines.get(current_indent)
+            if newline is None:
+                newline = newlines[current_indent] = "\n" + current_indent
+            open_tag = f'<{tag} style="{style}" {attributes_string} id="{element_id}">'
+            if "\n" in open_tag:
+                open_tag = open_tag.replace("\n", newline)
 
-    def reduce_children(tree):
-        return reduce(generate_element_string, tree, "")
+            out.append(newline)
+            out.append(open_tag)
+            out.append(newline)
+            out.append("  ")
+            write_children(element["children"], current_indent + "  ")
+            out.append(newline)
+            out.append(f"</{tag}>")
+            out.append(newline)
 
-    def generate_element_string(body_string, element):
+    write_children(run_subject.html_tree.tree, indent)
+    return out
+
+
+# Styles of elements without base styles, shared so their subtrees can be looked up by identity
+_NO_STYLES = {}
+
+
+def _write_cached(run_subject: RunSubject, out, indent, cache: FragmentCache):
+    styles = run_subject.base_styles.map
+    fragments = cache.fragments
+    subtrees = cache.subtrees
+
+    def fragment(element, current_indent):
+        """ The (number, fragment) entry of an element """
         tag = element["tag"]
         if tag == "<text>":
-            return body_string + element["value"]
+            key = (element["value"], current_indent)
+            entry = fragments.get(key)
+            if entry is None:
+                entry = cache.put(key, element["value"].replace("\n", "\n" + current_indent))
+            return entry
+
+        element_id = element.get("id", "")
+        element_styles = styles.get(element_id, _NO_STYLES)
+        subtree_key = (id(element), current_indent)
+        shared = subtrees.get(subtree_key)
+        if shared is not None and shared[0] is element and shared[1] is element_styles:
+            return shared[2]
+        entry = element_fragment(element, element_id, element_styles, current_indent)
+        subtrees[subtree_key] = (element, element_styles, entry)
+        return entry
+
+    def element_fragment(element, element_id, element_styles, current_indent):
+        tag = element["tag"]
+        children = element["children"]
+        if children:
+            child_indent = current_indent + "  "
+            child_entries = [fragment(child, child_indent) for child in children]
+            child_numbers = tuple([number for number, _ in child_entries])
         else:
-            style = ";".join(
-                [
-                    f"{name}:{value}"
-                    for name, value in styles.get(element.get("id", ""), {}).items()
-                ]
-            )
-
-            attributes_dict = element.get("attributes", {})
-            allowed_attributes = ["onclick"]
-            attributes_string = " ".join(
-                f"{name}='{value}'"
-                for name, value in attributes_dict.items() if name in allowed_attributes
-            )
+            child_entries = child_numbers = ()
+        attributes = element.get("attributes")
+        key = (
+            tag, element_id, current_indent, child_numbers,
+            tuple(element_styles.items()),
+            tuple(attributes.items()) if attributes else None,
+        )
+        entry = fragments.get(key)
+        if entry is not None:
+            return entry
 
-            element_id = element.get("id", "")
-            children_string = reduce_children(element["children"])
-            return body_string + formatWithIndent(current_template,
-                tag=tag,
-                style=style,
-                element_id=element_id,
-                attributes_string=attributes_string,
-                children_string=children_string,
-            )
-
-    return reduce_children(body)
+        newline = "\n" + current_indent
+        style = _style_string(styles, element)
+        attributes_string = _attributes_string(element)
+        open_tag = f'<{tag} style="{style}" {attributes_string} id="{element_id}">'
+        return cache.put(key, "".join((
+            newline, open_tag.replace("\n", newline), newline, "  ",
+            "".join([child_fragment for _, child_fragment in child_entries]),
+            newline, f"</{tag}>", newline,
+        )))
+
+    for element in run_subject.html_tree.tree:
+        out.append(fragment(element, indent)[1])
+    return out
+
+
+def create(run_subject: RunSubject):
+    return "".join(write(run_subject, []))
@@ -0,0 +1,38 @@
+// Runs batches of test pages, see selenium_harness/batch_harness.py
+//
+// Every page of a batch is loaded in its own iframe, sized like the window so
+// that it is laid out as it would be on its own, and checkForBug() is run in
+// each once it has loaded.
+
+// Run a batch of pages (strings), calls done() with a result per page:
+// {diffs: [...]} (see checkForBug()), or {error: "..."} if the test threw
+function runBatch(pages, done) {
+  const container = document.body;
+  // The frames of the previous batch are kept until now, as their results were being read
+  container.textContent = "";
+
+  const results = new Array(pages.length);
+  let remaining = pages.length;
+  if (remaining === 0) {
+    done(results);
+    return;
+  }
+
+  pages.forEach((page, i) => {
+    const frame = document.createElement("iframe");
+    frame.style.cssText = "position: absolute; top: 0; left: 0; border: 0; width: 100vw; height: 100vh;";
+    frame.onload = () => {
+      try {
+        results[i] = {diffs: frame.contentWindow.checkForBug()};
+      } catch (e) {
+        results[i] = {error: String(e)};
+      }
+      remaining -= 1;
+      if (remaining === 0) {
+        done(results);
+      }
+    };
+    frame.srcdoc = page;
+    container.appendChild(frame);
+  });
+}
@@ -1,27 +1,71 @@
-import os,json
+import json
+from lqc.config.config import Config
+from lqc.generate.web_page.assets import registry
 from lqc.generate.web_page.util import formatWithIndent
+from lqc.model.constants import StyleChangeFormat
 from lqc.model.run_result import RunResult, RunResultLayoutBug
 from lqc.model.run_subject import RunSubject
 
-EXTERNAL_JS_FILE_PATHS = [
-    os.path.join(os.path.dirname(__file__), 'debugging_tools.js')
-]
+# Asset names of the JS files full (debugging) pages load (see assets.py). Lean pages load none
+EXTERNAL_JS_FILE_NAMES = ["detection.js", "debugging_tools.js"]
 
 
-def create(run_subject: RunSubject, run_result: RunResult):
+def create(run_subject: RunSubject, run_result: RunResult, style_change_format=StyleChangeFormat.STATEMENTS):
+    """ Inline JS of full pages: the style changes, and helpers to print the dimensions of the elements """
 
-    script_string = open(os.path.join(os.path.dirname(__file__), 'minimal.js'), 'r').read()
-    return formatWithIndent(script_string,
-        make_style_changes = make_style_changes(run_subject),
-        get_dimensions = get_dimensions(run_subject, run_result)
+    return detection_settings() + style_changes(run_subject, style_change_format) + "\n\n" + formatWithIndent(registry.text("minimal.js"),
+        get_dimensions = get_dimensions(run_subject, run_result, style_change_format)
     )
 
 
-def make_style_changes(run_subject: RunSubject):
+def create_lean(run_subject: RunSubject, style_change_format=StyleChangeFormat.JSON, inline_detection=True):
+    """ Inline JS of lean pages: the style changes, and the bug detection of detection.js (unless the page loads it) """
+
+    js = detection_settings() + style_changes(run_subject, style_change_format)
+    if inline_detection:
+        js += "\n\n" + registry.text("detection.js")
+    return js
+
+
+def create_harness():
+    """ Inline JS of the persistent harness page: detection.js, and runTest() to run the tests passed to it """
+
+    harness_style_changes = formatWithIndent(registry.text("style_changes.js"),
+        make_style_changes = "applyStyleChanges(pendingStyleChanges);"
+    )
+    return detection_settings() + harness_style_changes + "\n\n" + registry.text("detection.js") + "\n\n" + registry.text("harness.js")
+
+
+def create_batch():
+    """ Inline JS of the batch harness page: runBatch() to run test pages in iframes """
+
+    return registry.text("batch.js")
+
+
+def detection_settings():
+    """ Settings of detection.js, that are part of the page so they are the same when a bug report is opened """
+    conf = Config()
+    return (
+        "// Differences in dimensions up to this many pixels are ignored by checkForBug()\n"
+        f"const DIMENSION_TOLERANCE = {json.dumps(conf.getDimensionTolerance())};\n"
+        "// How checkForBug() lays out the page from scratch\n"
+        f"const RELAYOUT_STRATEGY = {json.dumps(conf.getRelayoutStrategy().value)};\n\n"
+    )
+
+
+def style_changes(run_subject: RunSubject, style_change_format=StyleChangeFormat.STATEMENTS):
+    return formatWithIndent(registry.text("style_changes.js"),
+        make_style_changes = make_style_changes(run_subject, style_change_format)
+    )
+
+
+def make_style_changes(run_subject: RunSubject, style_change_format=StyleChangeFormat.STATEMENTS):
+    if style_change_format == StyleChangeFormat.JSON:
+        return f"applyStyleChanges({run_subject.modified_styles.toJSON()});"
     return run_subject.modified_styles.toJS()
 
     
-def get_dimensions(run_subject: RunSubject, run_result: RunResult):
+def get_dimensions(run_subject: RunSubject, run_result: RunResult, style_change_format=StyleChangeFormat.STATEMENTS):
     """
     Create a string that will show dimensions for elements
 
@@ -29,20 +73,25 @@ def get_dimensions(run_subject: RunSubject, run_result: RunResult):
 
         console.log("#PTN873OUW", PTN873OUW.getBoundingClientRect());
     
-    Note that every ID is already bound as a JS object.
+    Note that every ID is already bound as a JS object. With the JSON
+    format, elements are looked up by ID instead:
+
+        printDimensions("PTN873OUW", ["x", "y", "top", "bottom"]);
 
     """
-    ret_string = ""
+    lines = []
     if run_result and isinstance(run_result, RunResultLayoutBug):
         for el in run_result.element_dimensions:
             if el['id']:
                 elementId = json.dumps(el['id'])
                 differing_dims = json.dumps(el["differing_dims"])
-                ret_string += f'printDimensions({elementId}, {differing_dims});\n'
+                lines.append(f'printDimensions({elementId}, {differing_dims});\n')
     
     else:
-        for elementId in run_subject.getElementIds():
-            ret_string += f'printDimensions({elementId}, ["x", "y", "top", "bottom"]);\n'
+        for elementId in sorted(run_subject.getElementIds()):
+            if style_change_format == StyleChangeFormat.JSON:
+                elementId = json.dumps(elementId)
+            lines.append(f'printDimensions({elementId}, ["x", "y", "top", "bottom"]);\n')
     
-    return ret_string
+    return "".join(lines)
 
@@ -0,0 +1,151 @@
+// Detects layout under invalidation bugs, see checkForBug()
+//
+// Used by every test page: inlined in lean pages, loaded as a file by the
+// debugging pages of bug reports. It must not depend on the generated page,
+// other than makeStyleChanges(), DIMENSION_TOLERANCE and RELAYOUT_STRATEGY.
+
+// Fields of the bounding rect of an element that are compared
+const RECT_FIELDS = ['x', 'y', 'left', 'right', 'top', 'bottom', 'height', 'width'];
+const NUM_RECT_FIELDS = RECT_FIELDS.length;
+
+// The elements of the test: the body and its descendants, in document order.
+// The same markup gives the same elements in the same order, so elements are
+// matched by their index after a from scratch layout
+const testElements = (doc = document) => {
+  return [doc.body].concat(Array.from(doc.body.getElementsByTagName('*')));
+}
+
+// Ways to lay out the page from scratch, with the modified styles as if they
+// had been there from the start (see Config.getRelayoutStrategy()). Each
+// returns the document laid out from scratch, to be measured
+const RELAYOUT_STRATEGIES = {
+  // Re-parse the whole document
+  "innerhtml": () => {
+    document.documentElement.innerHTML = document.documentElement.innerHTML;
+    return document;
+  },
+  // Parse the body in a new document, in an iframe covering the window
+  "iframe": () => {
+    const frame = document.createElement("iframe");
+    frame.style.cssText = "position: absolute; top: 0; left: 0; border: 0; width: 100vw; height: 100vh;";
+    document.documentElement.appendChild(frame);
+    const doc = frame.contentDocument;
+    doc.open();
+    doc.write("<!DOCTYPE html><html><head></head>" + document.body.outerHTML + "</html>");
+    doc.close();
+    return doc;
+  },
+  // Replace the body with a copy, without parsing
+  "clone-body": () => {
+    document.body.replaceWith(document.body.cloneNode(true));
+    return document;
+  },
+  // Remove the layout of the body, and lay it out again
+  "display-toggle": () => {
+    document.body.style.display = "none";
+    document.body.offsetHeight;
+    document.body.style.display = "";
+    if (document.body.getAttribute("style") === "") {
+      document.body.removeAttribute("style");
+    }
+    return document;
+  },
+}
+
+const relayout = () => {
+  const strategy = typeof RELAYOUT_STRATEGY === "string" ? RELAYOUT_STRATEGY : "innerhtml";
+  return RELAYOUT_STRATEGIES[strategy]();
+}
+
+// Measure the bounding rect of the elements, packed as NUM_RECT_FIELDS values per element
+// Output to be consumed by compareDimensions()
+const outputDimensions = (elements) => {
+  const rects = new Float64Array(elements.length * NUM_RECT_FIELDS);
+  for (let i = 0; i < elements.length; i++) {
+    const rect = elements[i].getBoundingClientRect();
+    const offset = i * NUM_RECT_FIELDS;
+    for (let f = 0; f < NUM_RECT_FIELDS; f++) {
+      rects[offset + f] = rect[RECT_FIELDS[f]];
+    }
+  }
+  return rects;
+}
+
+
+// Compare the dimensions of the same elements, measured after modifying the
+// styles and after a from scratch layout. Differences of at most `tolerance`
+// pixels are ignored
+//
+// Return structure
+// [{
+//   id: one
+//   tag: div
+//   id_tag: one<div>
+//   differing_dims: ['x', 'left'],
+//   post_modify_dims: {x: 100, left: 10}
+//   post_reload_dims: {x: 120, left: 15}
+// }, ...]
+function compareDimensions(elements, dimensionsAfterModify, dimensionsAfterReload, tolerance = 0) {
+  const differences = [];
+
+  if (dimensionsAfterModify.length !== dimensionsAfterReload.length) {
+    console.error("The two sets of dimensions don't have the same elements. (This should never happen) Dimensions after modification:", dimensionsAfterModify, " Dimensions after reload:", dimensionsAfterReload);
+  }
+  const numElements = Math.min(dimensionsAfterModify.length, dimensionsAfterReload.length) / NUM_RECT_FIELDS;
+
+  for (let i = 0; i < numElements; i++) {
+    const offset = i * NUM_RECT_FIELDS;
+    let differing_dims = null;
+    for (let f = 0; f < NUM_RECT_FIELDS; f++) {
+      if (Math.abs(dimensionsAfterModify[offset + f] - dimensionsAfterReload[offset + f]) > tolerance) {
+        (differing_dims = differing_dims || []).push(f);
+      }
+    }
+    if (differing_dims === null) {
+      continue;
+    }
+
+    const element = elements[i];
+    const id = element.id;
+    const tag = element.tagName.toLowerCase();
+    const post_modify_dims = {};
+    const post_reload_dims = {};
+    for (const f of differing_dims) {
+      post_modify_dims[RECT_FIELDS[f]] = dimensionsAfterModify[offset + f];
+      post_reload_dims[RECT_FIELDS[f]] = dimensionsAfterReload[offset + f];
+    }
+    differences.push({
+      id: id,
+      tag: tag,
+      id_tag: (id || "UnknownID") + "<" + tag + ">",
+      differing_dims: differing_dims.map(f => RECT_FIELDS[f]),
+      post_modify_dims: post_modify_dims,
+      post_reload_dims: post_reload_dims,
+    });
+  }
+
+  return differences;
+}
+
+
+//
+// Run this function to see the differences between modifying styles vs loading them fresh
+//
+function checkForBug() {
+  // Set by the page, see Config.getDimensionTolerance() and getRelayoutStrategy()
+  const tolerance = typeof DIMENSION_TOLERANCE === "number" ? DIMENSION_TOLERANCE : 0;
+  makeStyleChanges();
+  const dimensionsAfterApplication = outputDimensions(testElements());
+  const freshDocument = relayout();
+  const elements = testElements(freshDocument);
+  const dimensionsAfterFreshLoad = outputDimensions(elements);
+  if (freshDocument !== document) {
+    freshDocument.defaultView.frameElement.remove();
+  }
+  const diffs = compareDimensions(elements, dimensionsAfterApplication, dimensionsAfterFreshLoad, tolerance);
+  // printDifferences() is only loaded on debugging pages
+  if (typeof printDifferences === "function") {
+    printDifferences(diffs);
+  }
+  return diffs;
+}
@@ -0,0 +1,17 @@
+// Runs tests in a persistent harness page, see selenium_harness/persistent_harness.py
+//
+// Instead of loading a page per test, the runner loads the harness page once
+// and calls runTest() with the body and the style changes of every test.
+// The harness page inlines style_changes.js, with makeStyleChanges() applying
+// pendingStyleChanges, and detection.js.
+
+var pendingStyleChanges = {};
+
+// Run one test, returns the differences found by checkForBug()
+function runTest(bodyHtml, styleChanges) {
+  document.body.innerHTML = bodyHtml;
+  // Lay out the page before the style changes, as loading it would
+  document.body.offsetHeight;
+  pendingStyleChanges = styleChanges;
+  return checkForBug();
+}
@@ -1,15 +1,26 @@
+// The document laid out by the last fromScratchLayout(), the page itself
+// unless the relayout strategy lays it out in an iframe
+let layoutDocument = document;
+
 function printDimensions(node, fields) {{
+    // Look the element up again, it may have been replaced by fromScratchLayout()
+    node = layoutDocument.getElementById(typeof node === "string" ? node : node.id);
     let dims = node.getBoundingClientRect();
     console.log("#" + node.id, Object.fromEntries(fields.map((x) => [x, dims[x]])));
 }}
 
-// Make the style changes to the page
-function makeStyleChanges() {{
-    {make_style_changes}
-}}
-
+// Lay out the page from scratch the same way checkForBug() does, see relayout() in detection.js
 function fromScratchLayout() {{
-    document.documentElement.innerHTML = document.documentElement.innerHTML;
+    if (layoutDocument !== document) {{
+        layoutDocument.defaultView.frameElement.remove();
+    }}
+    if (typeof relayout !== "function") {{
+        // detection.js was removed from the page
+        document.documentElement.innerHTML = document.documentElement.innerHTML;
+        layoutDocument = document;
+        return;
+    }}
+    layoutDocument = relayout();
 }}
 
 function simpleRecreate() {{
@@ -0,0 +1,14 @@
+// Apply a {{id: {{style name: value}}}} payload of style changes
+function applyStyleChanges(styleChanges) {{
+    for (const [id, styles] of Object.entries(styleChanges)) {{
+        const element = document.getElementById(id);
+        for (const [name, value] of Object.entries(styles)) {{
+            element.style[name] = value;
+        }}
+    }}
+}}
+
+// Make the style changes to the page
+function makeStyleChanges() {{
+    {make_style_changes}
+}}
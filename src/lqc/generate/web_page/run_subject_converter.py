@@ -1,20 +1,15 @@
-import os
-from shutil import copy2
-from lqc.config.file_config import FileConfig
-from lqc.generate.web_page.create import save_as_web_page
-from lqc.generate.web_page.javascript.create import EXTERNAL_JS_FILE_PATHS
+from lqc.generate.web_page.assets import registry
+from lqc.generate.web_page.create import write_html
+from lqc.generate.web_page.javascript.create import EXTERNAL_JS_FILE_NAMES
+from lqc.generate.workspace import get_workspace
+from lqc.model.constants import PageProfile, StyleChangeFormat
 
 def copyExternalJSFiles(folder):
-    for filepath in EXTERNAL_JS_FILE_PATHS:
-        copy2(filepath, folder)
+    """ Copy the JS files full pages load, eg. into a bug report """
+    registry.write_files(folder, EXTERNAL_JS_FILE_NAMES)
 
-def saveTestSubjectAsWebPage(run_subject):
-    file_config = FileConfig()
-    layout_folder_name = os.path.basename(file_config.layout_file_dir)
-    folder = file_config.getCustomTimestampPath(layout_folder_name)
-    filepath = os.path.join(folder, "test-file.html")
-    copyExternalJSFiles(folder)
-    save_as_web_page(run_subject, filepath)
-    url = "file://" + os.path.abspath(filepath)
-
-    return filepath, url
+def saveTestSubjectAsWebPage(run_subject, page=None):
+    """ Write the test page for run_subject into this process's workspace. `page` is the pre-rendered html_string(), if available """
+    if page is None:
+        page = write_html([], run_subject, style_change_format=StyleChangeFormat.JSON, profile=PageProfile.LEAN)
+    return get_workspace().write_page(page)
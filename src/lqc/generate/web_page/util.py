@@ -1,20 +1,67 @@
 import re
+from functools import lru_cache
+from string import Formatter
 
 # From https://stackoverflow.com/questions/57174866/preserving-indentation-in-a-triple-quoted-fstring
 def indent(indent, inner_str):
     return inner_str.replace('\n', '\n' + indent)
 
+
+class IndentTemplate():
+    """
+    A str.format() template that preserves the indent of multiline values.
+
+    The template is parsed once. A value is indented with the whitespace
+    before its {key} (if the key is the first field on its line). Values can
+    also be writers, called as value(out, indent) to append the already
+    indented value to the list `out`, so large values can be streamed in
+    without building an intermediate string.
+    """
+
+    def __init__(self, template):
+        pattern = r'(\s*){(.*)}'
+        self.key_indents = {}
+        for l in template.split("\n"):
+            match = re.search(pattern, l)
+            if match:
+                self.key_indents[match.group(2)] = match.group(1)
+
+        # [(literal_text, field_name), ...]. Templates don't use format specs or conversions
+        self.segments = []
+        for literal_text, field_name, format_spec, conversion in Formatter().parse(template):
+            if format_spec or conversion:
+                raise ValueError(f"Unsupported format field {{{field_name}!{conversion}:{format_spec}}}")
+            self.segments.append((literal_text, field_name))
+
+    def write(self, out, **kwargs):
+        """ Append the rendered template to the list `out` """
+        for literal_text, field_name in self.segments:
+            if literal_text:
+                out.append(literal_text)
+            if field_name is None:
+                continue
+            value = kwargs[field_name]
+            key_indent = self.key_indents.get(field_name, "")
+            if callable(value):
+                value(out, key_indent)
+                continue
+            if not isinstance(value, str):
+                value = format(value)
+            if key_indent:
+                out.append(indent(key_indent, value))
+            else:
+                out.append(value)
+        return out
+
+    def render(self, **kwargs):
+        return "".join(self.write([], **kwargs))
+
+
+@lru_cache(maxsize=32)
+def compile_template(s):
+    return IndentTemplate(s)
+
+
 def formatWithIndent(s, *args, **kwargs):
     """ Takes a multiline string and preserves the indent when calling format on it """
-    pattern = r'(\s*){(.*)}'
-    key_indents = {}
-    for l in s.split("\n"):
-        match = re.search(pattern, l)
-        if match:
-            key_indents[match.group(2)] = match.group(1)
-
-    for kw, val in kwargs.items():
-        if kw in key_indents:
-            kwargs[kw] = indent(key_indents[kw], val)
-
-    return s.format(**kwargs)
+    return compile_template(s).render(**kwargs)
@@ -0,0 +1,75 @@
+""" Per-worker scratch directory for test pages
+
+Each process writes its test pages into one directory, created once under
+the tmp files directory (by default /dev/shm/lqc, see
+Config.getTmpFilesDirectory), with the JS files its pages load. Every test
+rewrites the same file in place, so a test costs a single file write. The
+directory is removed when the process exits.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+from lqc.config.config import Config
+from lqc.generate.web_page.assets import registry
+
+TEST_FILE_NAME = "test-file.html"
+
+
+class Workspace():
+
+    def __init__(self, root, asset_names=()):
+        """
+        root - directory to create the workspace in
+        asset_names - JS files (see assets.py) the pages need next to them
+        """
+        os.makedirs(root, exist_ok=True)
+        self.pid = os.getpid()
+        self.path = tempfile.mkdtemp(prefix=f"lqc-{self.pid}-", dir=root)
+        self.num_pages = 0
+        self.num_kept = 0
+        self.add_assets(asset_names)
+        atexit.register(self.cleanup)
+
+    def add_assets(self, asset_names):
+        registry.write_files(self.path, asset_names)
+
+    def write_page(self, page, file_name=TEST_FILE_NAME):
+        """
+        Write a test page (a string, or a list of strings) over the previous one.
+        Returns (file path, url). The url changes with every page, so it is never served from a cache
+        """
+        file_path = os.path.join(self.path, file_name)
+        with open(file_path, "w") as f:
+            if isinstance(page, str):
+                f.write(page)
+            else:
+                f.writelines(page)
+        self.num_pages += 1
+        return file_path, f"file://{os.path.abspath(file_path)}?test={self.num_pages}"
+
+    def keep(self, file_path):
+        """ Move a written page out of the way of the next one. The caller is responsible for removing it """
+        self.num_kept += 1
+        kept_path = os.path.join(self.path, f"kept-{self.num_kept}.html")
+        os.replace(file_path, kept_path)
+        return kept_path
+
+    def cleanup(self):
+        # Forked processes inherit the atexit handler, only the creator removes the directory
+        if os.getpid() == self.pid:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+_workspace = None
+
+
+def get_workspace() -> Workspace:
+    """ The workspace of this process, created on first use """
+    global _workspace
+    # A forked process gets its own workspace
+    if _workspace is None or _workspace.pid != os.getpid():
+        _workspace = Workspace(Config().getTmpFilesDirectory())
+    return _workspace
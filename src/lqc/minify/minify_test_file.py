@@ -10,6 +10,15 @@ def elements(tree):
             yield from elements(element["children"])
 
 
+def on_element(element_id, manipulation):
+    """
+    Mark a manipulation that only changes one element (its styles, or its place
+    in the tree), so it can be applied to a copy of that path (see RunSubject.copy_path())
+    """
+    manipulation.element_id = element_id
+    return manipulation
+
+
 def Minify_RemoveEachElement(run_subject):
 
     for element in elements(run_subject.html_tree.tree):
@@ -18,7 +27,7 @@ def Minify_RemoveEachElement(run_subject):
             proposed_run_subject.removeElementById(element['id'])
             return proposed_run_subject
 
-        yield removeElement
+        yield on_element(element['id'], removeElement)
 
 
 def Minify_RemoveAllStylesForEachElement(run_subject):
@@ -31,7 +40,7 @@ def Minify_RemoveAllStylesForEachElement(run_subject):
                 del proposed_run_subject.base_styles.map[elementId]
             return proposed_run_subject
 
-        yield removeStyle
+        yield on_element(elementId, removeStyle)
 
     # Generate a function (for each id) to remove styles by id from modified_styles.map
     for elementId, _ in run_subject.modified_styles.map.items():
@@ -41,7 +50,7 @@ def Minify_RemoveAllStylesForEachElement(run_subject):
                 del proposed_run_subject.modified_styles.map[elementId]
             return proposed_run_subject
 
-        yield removeStyle
+        yield on_element(elementId, removeStyle)
 
 
 def Minify_RemoveEachStyleForEachElement(run_subject):
@@ -55,7 +64,7 @@ def Minify_RemoveEachStyleForEachElement(run_subject):
                     del proposed_run_subject.base_styles.map[elementId][style_name]
                 return proposed_run_subject
 
-            yield removeStyle
+            yield on_element(elementId, removeStyle)
 
     # Generate a function for each style - to remove that style from modified_styles.map
     for elementId, styles in run_subject.modified_styles.map.items():
@@ -66,7 +75,7 @@ def Minify_RemoveEachStyleForEachElement(run_subject):
                     del proposed_run_subject.modified_styles.map[elementId][style_name]
                 return proposed_run_subject
 
-            yield removeStyle
+            yield on_element(elementId, removeStyle)
 
 
 def Minify_MoveStyleChangesToFirstLoad(run_subject):
@@ -92,7 +101,7 @@ def Minify_MoveStyleChangesToFirstLoad(run_subject):
 
                 return proposed_run_subject
             
-            yield moveStyleUpstream
+            yield on_element(elementId, moveStyleUpstream)
 
 
 
@@ -111,7 +120,7 @@ def Minify_SimplifyLengthStyles(run_subject):
                         proposed_run_subject.base_styles.map[elementId][style_name] = "20px"
                     return proposed_run_subject
 
-                yield removeStyle
+                yield on_element(elementId, removeStyle)
 
     # Generate a function for each style that is a length - change to a simple length
     for elementId, styles in run_subject.modified_styles.map.items():
@@ -125,7 +134,7 @@ def Minify_SimplifyLengthStyles(run_subject):
                         proposed_run_subject.modified_styles.map[elementId][style_name] = "20px"
                     return proposed_run_subject
 
-                yield removeStyle
+                yield on_element(elementId, removeStyle)
 
 
 def Enhance_MinHeightWidthPerElement(run_subject):
@@ -146,7 +155,7 @@ def Enhance_MinHeightWidthPerElement(run_subject):
                 }
             return proposed_run_subject
 
-        yield giveMinSize
+        yield on_element(elementId, giveMinSize)
         
 
 def Enhance_BackgroundColorPerElement(run_subject):
@@ -165,7 +174,7 @@ def Enhance_BackgroundColorPerElement(run_subject):
                 proposed_run_subject.base_styles.map[elementId] = {'background-color': background_color}
             return proposed_run_subject
 
-        yield giveMinSize
+        yield on_element(elementId, giveMinSize)
 
 
 def Enhance_ShortenIds(run_subject: RunSubject):
@@ -251,6 +260,10 @@ class MinifyStepFactory():
                     return None
                 self.current_generator = self.GENERATORS[self.current_generator_index](run_subject)
         
+        element_id = getattr(manipulation, "element_id", None)
+        if element_id is not None:
+            # Share the subtrees the manipulation doesn't change with run_subject
+            return manipulation(run_subject.copy_path(element_id))
         return manipulation(run_subject.deepcopy())
 
 
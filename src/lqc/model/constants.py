@@ -4,4 +4,40 @@ from enum import Enum, unique
 @unique
 class BugType(Enum):
     LAYOUT = "Layout Under Invalidation" # Also known as "Under-Invalidation Bugs"
-    PAGE_CRASH = "Page Crash"
\ No newline at end of file
+    PAGE_CRASH = "Page Crash"
+
+
+@unique
+class StyleChangeFormat(Enum):
+    JSON = "json"               # One {id: {style: value}} payload, applied by a loop in the harness. Compact, for test pages
+    STATEMENTS = "statements"   # One `id.style["name"] = "value";` statement per style. Readable, for bug reports
+
+
+@unique
+class PageProfile(Enum):
+    LEAN = "lean"   # Only what checkForBug() needs, inlined in one script tag. For the fuzzing loop
+    SERVED = "served"   # Lean, but detection.js is loaded from /detection.js, so the browser caches it. For the http harness mode
+    FULL = "full"   # Adds the debugging helpers and files (debugging_tools.js). For bug reports
+
+
+@unique
+class BugReportFormat(Enum):
+    DIRECTORY = "directory"     # One directory of files per bug (pages, pickles, data.json)
+    STORE = "store"             # One compressed record per bug, appended to the segments of a BugStore (see lqc/store)
+
+
+@unique
+class HarnessMode(Enum):
+    FILE = "file"   # Each test page is written to a file, and loaded from a file:// url
+    HTTP = "http"   # Each test page is kept in memory, and served by a local HTTP server (see selenium_harness/page_server.py)
+    PERSISTENT = "persistent"   # A harness page is loaded once, and each test is injected into it (see selenium_harness/persistent_harness.py)
+    BATCH = "batch" # Several test pages are run at once, each in an iframe of a harness page (see selenium_harness/batch_harness.py)
+
+
+@unique
+class RelayoutStrategy(Enum):
+    # How checkForBug() lays out the page from scratch, after the style changes (see detection.js)
+    INNERHTML = "innerhtml"             # Re-parse the whole document
+    IFRAME = "iframe"                   # Parse the body in a new document, in an iframe
+    CLONE_BODY = "clone-body"           # Replace the body with a copy
+    DISPLAY_TOGGLE = "display-toggle"   # Set display: none on the body, and back
@@ -3,6 +3,20 @@ from copy import deepcopy
 from lqc.model.element_tree import ElementTree
 from lqc.model.style_map import StyleMap
 
+def _copy_path(nodes, target_id):
+    """ Copy of a list of nodes, with the nodes on the path to target_id copied. Returns (copy, found) """
+    for index, node in enumerate(nodes):
+        if node.get("id") == target_id:
+            children, found = list(node.get("children", [])), True
+        else:
+            children, found = _copy_path(node.get("children", []), target_id)
+        if found:
+            copied = list(nodes)
+            copied[index] = {**node, "children": children}
+            return copied, True
+    return list(nodes), False
+
+
 class RunSubject:
     html_tree: ElementTree
     # Format: html_tree = {
@@ -21,6 +35,11 @@ class RunSubject:
     #     '1293918237': {'background-color': 'blue', ...}
     # }, ...]
 
+    seed: int = None
+    config_hash: str = None
+    # Set when the subject was generated from a seed. The subject can be
+    # re-created with regenerate_run_subject(seed, config_hash)
+
     def __init__(self, html_tree: ElementTree, base_styles: StyleMap, modified_styles: StyleMap):
         self.html_tree = html_tree
         self.base_styles = base_styles
@@ -40,6 +59,24 @@ class RunSubject:
             deepcopy(self.base_styles),
             deepcopy(self.modified_styles)
         )
+
+    def copy_path(self, element_id):
+        """
+        A copy in which one element can be changed: its styles, or its place in the tree.
+
+        Only the elements from the body down to element_id (with the lists of
+        their children) and the style dicts of element_id are copied. Every
+        other subtree and style dict is shared with this subject, and must not
+        be changed in place in either of them.
+        """
+        tree = _copy_path(self.html_tree.tree, element_id)[0]
+        style_maps = []
+        for style_map in (self.base_styles.map, self.modified_styles.map):
+            style_map = dict(style_map)
+            if element_id in style_map:
+                style_map[element_id] = dict(style_map[element_id])
+            style_maps.append(StyleMap(style_map))
+        return RunSubject(ElementTree(tree), *style_maps)
     
     def _find_node(self, nodes, target_id):
         for node in nodes:
@@ -1,3 +1,5 @@
+import json
+
 INCLUDE_VALUE_IN_NAME = ["display"]
 
 
@@ -41,13 +43,25 @@ class StyleMap():
             abeofmwlekrifj.style["margin-left"] = "10em";
             zomelfjeiwle.style["background-color"] = "blue";
         """
-        ret_string = ""
+        lines = []
         for (elementId, styles) in self.map.items():
 
             elementStyles = list(styles.items())
             elementStyles.sort() # Sort alphabetical order by style name (to enforce the same order every time)
 
             for (style_name, style_value) in elementStyles:
-                ret_string += f'{elementId}.style["{style_name}"] = "{style_value}";\n'
+                lines.append(f'{elementId}.style["{style_name}"] = "{style_value}";\n')
+
+        return "".join(lines)
+
+    def toJSON(self):
+        """
+        Create a JSON payload of the style changes, that can be inlined in a <script>
+
+        Example Output:
 
-        return ret_string
+            {"abeofmwlekrifj":{"margin-left":"10em","min-width":"200px"},"zomelfjeiwle":{"background-color":"blue"}}
+        """
+        payload = {elementId: dict(sorted(styles.items())) for elementId, styles in self.map.items()}
+        # Escape "<", so "</script>" or "<!--" in a value can't change how the <script> element is parsed
+        return json.dumps(payload, separators=(",", ":")).replace("<", "\\u003c")
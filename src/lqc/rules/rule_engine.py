@@ -1,27 +1,20 @@
 import os
-import pickle
 import time
 import json
 
 from lqc.rules.tree_merge import run_subject_to_node_tree, merge_trees
+from lqc.store.bug_store import iter_pickles
 
 
 def load_tree_start_pairs(folder_path):
     pairs = []
-    for root, _, files in os.walk(folder_path):
-        for name in files:
-            if not name.endswith("minified_run_subject.pkl"):
-                continue
-            if "run_subject" not in name:
-                continue
-            pkl_path = os.path.join(root, name)
-            try:
-                with open(pkl_path, "rb") as f:
-                    run_subject = pickle.load(f)
-                tree, start_node = run_subject_to_node_tree(run_subject)
-                pairs.append((tree, start_node))
-            except Exception:
-                continue
+    for _, _, load in iter_pickles(folder_path, lambda name: name.endswith("minified_run_subject.pkl")):
+        try:
+            run_subject = load()
+            tree, start_node = run_subject_to_node_tree(run_subject)
+            pairs.append((tree, start_node))
+        except Exception:
+            continue
     return pairs
 
 def extract_tag_tree(node):
@@ -511,23 +504,19 @@ def check_all_pkls(folder_path, rules):
     results = []
     folder_name = os.path.basename(os.path.normpath(folder_path))
 
-    for root, _, files in os.walk(folder_path):
-        for name in files:
-            if not (name.endswith("run_subject_prerun.pkl") or "safe" in name or "run_subject.pkl" in name):
-                continue
-
-            pkl_path = os.path.join(root, name)
-            try:
-                with open(pkl_path, "rb") as f:
-                    run_subject = pickle.load(f)
+    # Pickle files, and the subjects in bug stores
+    is_subject = lambda name: name.endswith("run_subject_prerun.pkl") or "safe" in name or "run_subject.pkl" in name
+    for pkl_path, name, load in iter_pickles(folder_path, is_subject):
+        try:
+            run_subject = load()
 
-                matched = should_skip(run_subject, rules)
-                print(f"[{folder_name}] {name}: {matched}")
-                results.append((pkl_path, matched))
+            matched = should_skip(run_subject, rules)
+            print(f"[{folder_name}] {name}: {matched}")
+            results.append((pkl_path, matched))
 
-            except Exception as e:
-                print(f"[{folder_name}] {name}: ERROR {e}")
-                results.append((pkl_path, f"ERROR: {e}"))
+        except Exception as e:
+            print(f"[{folder_name}] {name}: ERROR {e}")
+            results.append((pkl_path, f"ERROR: {e}"))
 
     true_count = 0
     false_count = 0
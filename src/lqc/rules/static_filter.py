@@ -0,0 +1,20 @@
+""" Static pre-filter for tests that cannot find a layout bug
+
+A test can only find an invalidation bug if one of its modified styles can
+affect layout. If every modified style is paint only (per the "layout_inert"
+field of the style catalog), the test would pass, so the browser run can be
+skipped.
+"""
+
+from lqc.generate.css.style_catalog import get_style_catalog
+from lqc.model.run_subject import RunSubject
+
+
+def is_layout_inert(run_subject: RunSubject):
+    """ Whether none of the modified styles of a subject can affect layout """
+    catalog = get_style_catalog()
+    for styles in run_subject.modified_styles.map.values():
+        for style_name in styles:
+            if not catalog.is_layout_inert(style_name):
+                return False
+    return True
@@ -0,0 +1,177 @@
+""" Append-only store of bug reports
+
+Instead of a directory of files per bug, every report is one compressed
+record (a zlib compressed pickle) appended to a segment file. Segments roll
+over at SEGMENT_SIZE bytes. Each record gets a line in an index file:
+
+    {"id": "...", "segment": "...", "offset": 123, "length": 456, "data": {...}}
+
+where "data" is the report summary (the contents of data.json, without the
+subjects), so reports can be listed and filtered from the index alone, and
+a record is read with a single seek.
+
+Every BugStore that writes to a directory starts a session with its own
+segment and index files, so several runners can share a store without
+locking. Pages are not stored, they are rendered from the subjects when a
+report is exported.
+
+    store = BugStore("./bug_reports/store")
+    for entry in store.entries():
+        record = store.get(entry)
+        record["minified_run_subject"]
+"""
+
+import glob
+import itertools
+import json
+import os
+import pickle
+import zlib
+from datetime import datetime
+from functools import partial
+
+SEGMENT_SIZE = 64 * 1024 * 1024
+INDEX_SUFFIX = ".index.jsonl"
+SEGMENT_SUFFIX = ".seg"
+
+# Subjects of a record, and the file names they have in a bug report directory
+SUBJECT_NAMES = {
+    "minified_run_subject": "minified_run_subject.pkl",
+    "prerun_subject": "run_subject_prerun.pkl",
+}
+
+
+class BugStore():
+
+    def __init__(self, path, segment_size=SEGMENT_SIZE):
+        self.path = path
+        self.segment_size = segment_size
+        self.session = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.ids = itertools.count()
+        self.num_segments = 0
+        self.segment_file = None
+        self.index_file = None
+        # Last record read, as a report's subjects are usually read one after another
+        self._last_read = (None, None)
+
+    # =============================
+    # Writing
+    # =============================
+
+    def new_id(self):
+        """ A new report id, unique across sessions """
+        return f"{self.session}-{next(self.ids)}"
+
+    def append(self, report_id, data, **objects):
+        """
+        Append a report: `data` is its JSON summary, `objects` anything else to
+        pickle with it (eg. the subjects). Returns the index entry
+        """
+        record = zlib.compress(pickle.dumps({"data": data, **objects}))
+        if self.segment_file is None or self.segment_file.tell() + len(record) > self.segment_size:
+            self._next_segment()
+
+        offset = self.segment_file.tell()
+        self.segment_file.write(record)
+        self.segment_file.flush()
+
+        # The index only refers to records that are written
+        entry = {
+            "id": report_id,
+            "segment": os.path.basename(self.segment_file.name),
+            "offset": offset,
+            "length": len(record),
+            "data": data,
+        }
+        self.index_file.write(json.dumps(entry, default=lambda o: o.__dict__) + "\n")
+        self.index_file.flush()
+        return entry
+
+    def _next_segment(self):
+        os.makedirs(self.path, exist_ok=True)
+        if self.segment_file is not None:
+            self.segment_file.close()
+        if self.index_file is None:
+            self.index_file = open(os.path.join(self.path, self.session + INDEX_SUFFIX), "a")
+        self.segment_file = open(os.path.join(self.path, f"{self.session}-{self.num_segments:04d}{SEGMENT_SUFFIX}"), "ab")
+        self.num_segments += 1
+
+    def close(self):
+        for f in (self.segment_file, self.index_file):
+            if f is not None:
+                f.close()
+        self.segment_file = self.index_file = None
+
+    # =============================
+    # Reading
+    # =============================
+
+    def entries(self):
+        """ The index entries of every report in the store, oldest session first """
+        entries = []
+        for index_path in sorted(glob.glob(os.path.join(self.path, "*" + INDEX_SUFFIX))):
+            with open(index_path) as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # A line cut short by a crash
+                        continue
+        return entries
+
+    def get(self, entry):
+        """ The record of an index entry (or report id): {"data": ..., "minified_run_subject": ..., ...} """
+        if isinstance(entry, str):
+            entry = next(e for e in self.entries() if e["id"] == entry)
+        if self._last_read[0] == entry["id"]:
+            return self._last_read[1]
+        with open(os.path.join(self.path, entry["segment"]), "rb") as f:
+            f.seek(entry["offset"])
+            record = pickle.loads(zlib.decompress(f.read(entry["length"])))
+        self._last_read = (entry["id"], record)
+        return record
+
+    def record_path(self, entry, file_name):
+        """ A path-like name for a file of a stored report, eg. for logs """
+        return os.path.join(self.path, entry["id"], file_name)
+
+    def __len__(self):
+        return len(self.entries())
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _load_subject(store, entry, key):
+    return store.get(entry)[key]
+
+
+def iter_pickles(root, name_filter):
+    """
+    Yield (path, name, load) for the run subject pickles under root that
+    name_filter(name) accepts: pickle files, and the subjects of the reports
+    in bug stores (named as in a report directory, eg. minified_run_subject.pkl).
+    load() returns the unpickled object.
+    """
+    for dirpath, _, files in os.walk(root):
+        if any(name.endswith(INDEX_SUFFIX) for name in files):
+            store = BugStore(dirpath)
+            for entry in store.entries():
+                for key, name in SUBJECT_NAMES.items():
+                    if name_filter(name):
+                        yield store.record_path(entry, name), name, partial(_load_subject, store, entry, key)
+        for name in files:
+            if name_filter(name):
+                path = os.path.join(dirpath, name)
+                yield path, name, partial(_load_pickle, path)
+
+
+def iter_report_data(root):
+    """ Yield (path, summary) for the reports of the bug stores under root, as read from data.json files """
+    for dirpath, _, files in os.walk(root):
+        if any(name.endswith(INDEX_SUFFIX) for name in files):
+            store = BugStore(dirpath)
+            for entry in store.entries():
+                yield store.record_path(entry, "data.json"), entry["data"]
@@ -0,0 +1,25 @@
+""" Run subjects shared by the tests """
+
+from lqc.model.element_tree import ElementTree
+from lqc.model.run_subject import RunSubject
+from lqc.model.style_map import StyleMap
+
+
+def sample_subject():
+    """ Elements a (with text, attributes and child b) and c, a few base and modified styles """
+    tree = [
+        {"tag": "div", "id": "a", "attributes": {"onclick": "go()", "title": "x"}, "children": [
+            {"tag": "<text>", "value": "Line one\nLine two", "children": []},
+            {"tag": "div", "id": "b", "children": [
+                {"tag": "<text>", "value": "Deep\ntext", "children": []},
+            ]},
+        ]},
+        {"tag": "div", "id": "c", "children": []},
+    ]
+    return RunSubject(ElementTree(tree), StyleMap({"a": {"width": "5px", "display": "grid"}}), StyleMap({"b": {"height": "1px"}}))
+
+
+def single_element_subject(base_styles=None, modified_styles=None):
+    """ One element a, with the given styles """
+    tree = [{"tag": "div", "id": "a", "children": []}]
+    return RunSubject(ElementTree(tree), StyleMap({"a": base_styles or {}}), StyleMap({"a": modified_styles or {}}))
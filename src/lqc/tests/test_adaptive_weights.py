@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from lqc.config.config import Config, parse_config
+from lqc.generate.adaptive_weights import MAX_FACTOR, MIN_FACTOR, AdaptiveWeights, style_arms
+from lqc.tests.fixtures import single_element_subject
+
+
+class TestAdaptiveWeights(unittest.TestCase):
+
+    def test_style_arms(self):
+        run_subject = single_element_subject(modified_styles={"display": "grid", "width": "5px"})
+        self.assertEqual({"display", "display:grid", "width"}, style_arms(run_subject))
+
+    def test_weights_follow_bugs(self):
+        adaptive_weights = AdaptiveWeights({"width": 20, "height": 20, "margin-top": 0})
+        for _ in range(200):
+            run_subject = single_element_subject(modified_styles={"width": "5px", "height": "5px", "margin-top": "1px"})
+            adaptive_weights.record(run_subject, single_element_subject(modified_styles={"width": "5px"}))
+        weights = adaptive_weights.sample_weights()
+        self.assertGreater(weights["width"], weights["height"])
+        self.assertLessEqual(weights["width"], 20 * MAX_FACTOR)
+        self.assertGreaterEqual(weights["height"], 20 * MIN_FACTOR)
+        self.assertEqual(0, weights["margin-top"])
+
+    def test_write_and_resume(self):
+        Config({"style-weights": {"width": 20}})
+        adaptive_weights = AdaptiveWeights.from_config(Config())
+        adaptive_weights.record(single_element_subject(modified_styles={"width": "5px"}), single_element_subject(modified_styles={"width": "5px"}))
+        adaptive_weights.update(Config())
+        self.assertIsNone(Config().style_sampler)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "learned.json")
+            adaptive_weights.write_config(Config(), path)
+            Config(parse_config(path))
+        resumed = AdaptiveWeights.from_config(Config())
+        self.assertEqual({"width": 20}, resumed.base_weights)
+        self.assertEqual([2, 1], resumed.posteriors["width"])
+
+
+if __name__ == '__main__':
+    unittest.main()
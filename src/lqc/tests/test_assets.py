@@ -0,0 +1,40 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from lqc.generate.web_page.assets import AssetRegistry, registry
+
+
+class TestAssets(unittest.TestCase):
+
+    def test_harness_assets(self):
+        asset = registry.get("debugging_tools.js")
+        self.assertIs(asset, registry.get("debugging_tools.js"))
+        self.assertEqual(asset.text.encode("utf-8"), asset.data)
+        self.assertEqual(hashlib.sha256(asset.data).hexdigest(), asset.sha256)
+        self.assertIn("{make_style_changes}", registry.text("style_changes.js"))
+
+    def test_reload_and_write_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "a.js")
+            with open(path, "w") as f:
+                f.write("one")
+            assets = AssetRegistry(reload=True)
+            assets.register("a.js", path)
+            self.assertEqual("one", assets.text("a.js"))
+
+            with open(path, "w") as f:
+                f.write("two")
+            os.utime(path, (0, 0))
+            self.assertEqual("two", assets.text("a.js"))
+
+            out_dir = os.path.join(tmp_dir, "out")
+            os.mkdir(out_dir)
+            assets.write_files(out_dir, ["a.js"])
+            with open(os.path.join(out_dir, "a.js")) as f:
+                self.assertEqual("two", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
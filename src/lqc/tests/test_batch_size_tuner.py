@@ -0,0 +1,48 @@
+import unittest
+
+from lqc.util.batch_size_tuner import BatchSizeTuner
+from lqc.util.counter import Counter
+
+
+def run_batches(tuner, time_per_test, num_batches):
+    """ Run batches that take time_per_test(batch size) seconds per test """
+    for _ in range(num_batches):
+        tuner.record(tuner.batch_size, tuner.batch_size * time_per_test(tuner.batch_size))
+
+
+class TestBatchSizeTuner(unittest.TestCase):
+
+    def test_converges_to_fastest_batch_size(self):
+        # A fixed cost per batch, and a cost per test that grows with the batch size
+        tuner = BatchSizeTuner(batch_size=2, max_batch_size=64, window=1)
+        run_batches(tuner, lambda size: 1 / size + size / 400, 200)
+        self.assertTrue(12 <= tuner.batch_size <= 30, tuner.batch_size)
+
+    def test_stays_within_bounds(self):
+        tuner = BatchSizeTuner(batch_size=4, max_batch_size=16, window=1)
+        run_batches(tuner, lambda size: 1 / size, 100)
+        self.assertTrue(12 <= tuner.batch_size <= 16, tuner.batch_size)
+
+        tuner = BatchSizeTuner(batch_size=4, max_batch_size=16, window=1)
+        run_batches(tuner, lambda size: size, 100)
+        self.assertTrue(1 <= tuner.batch_size <= 2, tuner.batch_size)
+
+    def test_fixed_batch_size(self):
+        tuner = BatchSizeTuner(batch_size=4, auto_tune=False, window=1)
+        run_batches(tuner, lambda size: 1 / size, 10)
+        self.assertEqual(4, tuner.batch_size)
+
+    def test_short_batches_ignored(self):
+        tuner = BatchSizeTuner(batch_size=4, window=1)
+        tuner.record(2, 10)
+        self.assertEqual(4, tuner.batch_size)
+
+    def test_tests_left(self):
+        self.assertIsNone(Counter().tests_left())
+        counter = Counter(test_limit=3)
+        counter.incTests()
+        self.assertEqual(2, counter.tests_left())
+
+
+if __name__ == '__main__':
+    unittest.main()
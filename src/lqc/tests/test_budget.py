@@ -0,0 +1,89 @@
+import unittest
+
+from lqc.config.config import Config
+from lqc.generate.budget import GenerationBudget, clamp_lengths, estimate_cost, length_extent, trim_to_budget, within_budget
+from lqc.generate.style_log_generator import generate_layout_tree, generate_run_subject, generate_run_subjects
+from lqc.model.element_tree import ElementTree
+from lqc.model.run_subject import RunSubject
+from lqc.model.style_map import StyleMap
+
+
+def tree_depth(tree):
+    return max((1 + tree_depth(e["children"]) for e in tree if e["tag"] != "<text>"), default=0)
+
+
+def text_length(tree):
+    return sum(len(e["value"]) if e["tag"] == "<text>" else text_length(e["children"]) for e in tree)
+
+
+class TestBudget(unittest.TestCase):
+
+    def test_length_extent(self):
+        self.assertEqual(960, length_extent("10in 5px"))
+        self.assertEqual(0, length_extent("auto"))
+        self.assertEqual(0, length_extent("#10px1"))
+
+    def test_clamp_lengths(self):
+        self.assertEqual("1000px -10in 5em", clamp_lengths("2000px -2000in 5em", 1000))
+        self.assertEqual("calc(10px + 40em)", clamp_lengths("calc(10px + 50em)", 640))
+        self.assertEqual("10%", clamp_lengths("10%", 1))
+
+    def test_estimate_cost(self):
+        tree = [{"tag": "div", "id": "a", "children": [{"tag": "div", "id": "b", "children": []}]}]
+        run_subject = RunSubject(ElementTree(tree), StyleMap({"a": {"width": "5000px"}}), StyleMap({"b": {"height": "1px"}}))
+        self.assertAlmostEqual(2 + 0.1 + 1 + 0.1 + 0.0002, estimate_cost(run_subject))
+        self.assertTrue(within_budget(run_subject, GenerationBudget({"max-cost": 4})))
+        self.assertFalse(within_budget(run_subject, GenerationBudget({"max-cost": 3})))
+
+    def test_tree_limits(self):
+        Config({"generation": {"max-elements": 5, "max-depth": 2, "max-text-length": 20}})
+        for _ in range(50):
+            run_subject = generate_run_subject()
+            self.assertLessEqual(len(run_subject.html_tree.getElementIds()), 5)
+            self.assertLessEqual(tree_depth(run_subject.html_tree.tree), 2)
+            self.assertLessEqual(text_length(run_subject.html_tree.tree), 20)
+
+    def test_text_limit(self):
+        Config({"generation": {"max-text-length": 50}})
+        for _ in range(50):
+            self.assertLessEqual(text_length(generate_run_subject().html_tree.tree), 50)
+
+    def test_trim_to_budget(self):
+        tree = [
+            {"tag": "div", "id": "a", "children": [{"tag": "div", "id": "b", "children": []}]},
+            {"tag": "div", "id": "c", "children": [{"tag": "<text>", "value": "text", "children": []}]},
+        ]
+        run_subject = RunSubject(ElementTree(tree), StyleMap({"c": {"width": "1px"}}), StyleMap({"b": {"height": "1px"}}))
+        trim_to_budget(run_subject, GenerationBudget({"max-cost": 1.5}))
+        self.assertEqual({"a"}, run_subject.getElementIds())
+        self.assertEqual({}, run_subject.base_styles.map)
+        self.assertEqual({}, run_subject.modified_styles.map)
+
+    def test_cost_limit(self):
+        # Small enough that most attempts are over budget, so subjects have to be trimmed
+        budget = GenerationBudget({"max-cost": 1.5})
+        Config({"generation": {"max-cost": 1.5}})
+        for _ in range(30):
+            self.assertTrue(within_budget(generate_run_subject(), budget))
+        # Batches are regenerated and trimmed the same way
+        run_subjects = generate_run_subjects(30)
+        self.assertEqual(30, len(run_subjects))
+        for run_subject in run_subjects:
+            self.assertTrue(within_budget(run_subject, budget))
+
+    def test_length_limit(self):
+        Config({"generation": {"max-length-extent": 100}})
+        for _ in range(20):
+            run_subject = generate_run_subject()
+            for style_map in (run_subject.base_styles.map, run_subject.modified_styles.map):
+                for styles in style_map.values():
+                    for value in styles.values():
+                        self.assertLessEqual(length_extent(value), 100)
+
+    def test_unlimited_by_default(self):
+        Config({})
+        self.assertIsInstance(generate_layout_tree(), list)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+
+from lqc.config.config import Config
+from lqc.model.run_result import RunResultLayoutBug
+from lqc.tests.fixtures import sample_subject
+from lqc.store.bug_store import BugStore
+from lqc_selenium.report.bug_report_helper import export_stored_report
+from lqc_selenium.report.bug_report_writer import BugReportWriter
+
+
+class TestBugReportWriter(unittest.TestCase):
+
+    def test_write_reports(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            Config({"paths": {"bug-reports-directory": tmp_dir, "tmp-files-directory": tmp_dir}})
+            run_result = RunResultLayoutBug([{"id": "b", "tag": "div", "id_tag": "b<div>", "differing_dims": ["x"], "post_modify_dims": {"x": 1}, "post_reload_dims": {"x": 2}}])
+            with BugReportWriter(queue_size=1) as writer:
+                urls = [writer.submit([], sample_subject(), run_result, None, sample_subject(), False) for _ in range(3)]
+                # A report that can't be written
+                writer.submit([], sample_subject(), None, None, sample_subject(), False)
+
+            self.assertEqual(3, writer.num_written)
+            self.assertEqual(1, len(writer.failures))
+            for url in urls:
+                bug_folder = os.path.dirname(url[len("file://"):])
+                self.assertTrue(os.path.exists(os.path.join(bug_folder, "minified_bug.html")))
+                self.assertTrue(os.path.exists(os.path.join(bug_folder, "detection.js")))
+                with open(os.path.join(bug_folder, "data.json")) as f:
+                    self.assertEqual(run_result.element_dimensions, json.load(f)["differences"])
+
+    def test_store_reports(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            Config({"paths": {"bug-reports-directory": tmp_dir, "tmp-files-directory": tmp_dir, "bug-report-format": "store"}})
+            run_result = RunResultLayoutBug([])
+            with BugReportWriter(store=BugStore(Config().getBugStoreDirectory())) as writer:
+                writer.submit({"Default Variant": True}, sample_subject(), run_result, None, sample_subject(), False)
+
+            store = BugStore(Config().getBugStoreDirectory())
+            [entry] = store.entries()
+            self.assertEqual({"Default Variant": True}, entry["data"]["variants"])
+            url = export_stored_report(store, entry, os.path.join(tmp_dir, "exported"))
+            self.assertTrue(os.path.exists(url[len("file://"):]))
+            self.assertTrue(os.path.exists(os.path.join(tmp_dir, "exported", "data.json")))
+
+
+if __name__ == '__main__':
+    unittest.main()
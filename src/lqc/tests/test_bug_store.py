@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from lqc.rules.rule_engine import check_all_pkls
+from lqc.store.bug_store import BugStore, iter_pickles, iter_report_data
+from lqc.tests.fixtures import sample_subject
+
+
+class TestBugStore(unittest.TestCase):
+
+    def test_append_and_read(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Small segments, so records are spread over several of them
+            store = BugStore(tmp_dir, segment_size=1)
+            ids = [store.new_id() for _ in range(3)]
+            for i, report_id in enumerate(ids):
+                store.append(report_id, {"index": i}, minified_run_subject=sample_subject(), prerun_subject=sample_subject())
+            store.close()
+            self.assertEqual(3, len({entry["segment"] for entry in store.entries()}))
+
+            # A second session in the same directory
+            other = BugStore(tmp_dir)
+            other.append(other.new_id(), {"index": 3}, minified_run_subject=sample_subject(), prerun_subject=None)
+            other.close()
+
+            reader = BugStore(tmp_dir)
+            entries = reader.entries()
+            self.assertEqual(4, len(entries))
+            record = reader.get(ids[1])
+            self.assertEqual({"index": 1}, record["data"])
+            self.assertEqual(sample_subject().html_tree.tree, record["minified_run_subject"].html_tree.tree)
+
+    def test_consumers_read_store(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = BugStore(os.path.join(tmp_dir, "store"))
+            store.append(store.new_id(), {"styles_used_string": "width"}, minified_run_subject=sample_subject(), prerun_subject=sample_subject())
+            store.close()
+
+            self.assertEqual(["width"], [summary["styles_used_string"] for _, summary in iter_report_data(tmp_dir)])
+            pickles = list(iter_pickles(tmp_dir, lambda name: name == "minified_run_subject.pkl"))
+            self.assertEqual(1, len(pickles))
+            path, name, load = pickles[0]
+            self.assertEqual("minified_run_subject.pkl", os.path.basename(path))
+            self.assertEqual(sample_subject().base_styles.map, load().base_styles.map)
+
+            results, true_count, false_count = check_all_pkls(tmp_dir, [])
+            self.assertEqual((0, 2), (true_count, false_count))
+
+
+if __name__ == '__main__':
+    unittest.main()
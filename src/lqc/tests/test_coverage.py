@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from lqc.config.config import Config
+from lqc.generate.coverage import CoverageMap, coverage_tuples
+from lqc.tests.fixtures import single_element_subject
+
+
+class TestCoverage(unittest.TestCase):
+
+    def test_coverage_tuples(self):
+        run_subject = single_element_subject({"display": "grid", "width": "10px"}, {"height": "5px"})
+        self.assertEqual([
+            ("", "height", "grid"),
+            ("display:grid", "height", "grid"),
+            ("width", "height", "grid"),
+        ], list(coverage_tuples(run_subject)))
+
+    def test_record(self):
+        coverage_map = CoverageMap()
+        run_subject = single_element_subject({"display": "grid"}, {"height": "5px", "position": "absolute"})
+        self.assertEqual(4, coverage_map.record(run_subject))
+        self.assertEqual(0, coverage_map.record(run_subject))
+        self.assertEqual(4, coverage_map.num_covered())
+        # Two tuples per record, counted 1 then 2
+        self.assertEqual([4, 6], coverage_map.tuple_counts["position:absolute"])
+        self.assertEqual([4, 6], coverage_map.tuple_counts["position"])
+        self.assertEqual([4, 6], coverage_map.tuple_counts["height"])
+
+    def test_bias(self):
+        coverage_map = CoverageMap()
+        self.assertEqual(1.0, coverage_map.style_bias("height"))
+        for _ in range(10):
+            coverage_map.record(single_element_subject({}, {"height": "5px"}))
+        coverage_map.record(single_element_subject({}, {"width": "5px"}))
+        self.assertLess(coverage_map.style_bias("height"), 1.0)
+        self.assertGreater(coverage_map.style_bias("width"), 1.0)
+        self.assertEqual(2.0, coverage_map.style_bias("min-width"))
+
+    def test_bias_by_tuples(self):
+        coverage_map = CoverageMap()
+        # height is tested as often as width, but always in the same combination
+        for _ in range(10):
+            coverage_map.record(single_element_subject({}, {"height": "5px"}))
+        for i in range(10):
+            coverage_map.record(single_element_subject({"display": f"d{i}"}, {"width": "5px"}))
+        self.assertLess(coverage_map.style_bias("height"), 1.0)
+        self.assertGreater(coverage_map.style_bias("width"), 1.0)
+
+    def test_config_hash(self):
+        config = Config({})
+        config_hash = config.getConfigHash()
+        coverage_map = CoverageMap()
+        config.setCoverageMap(coverage_map)
+        covered_hash = config.getConfigHash()
+        self.assertNotEqual(config_hash, covered_hash)
+
+        # Generation uses a snapshot, until the map is set again
+        coverage_map.record(single_element_subject({}, {"height": "5px"}))
+        self.assertEqual(0, config.coverage_map.num_tests)
+        self.assertEqual(covered_hash, config.getConfigHash())
+        config.setCoverageMap(coverage_map)
+        self.assertNotEqual(covered_hash, config.getConfigHash())
+
+    def test_save_and_load(self):
+        coverage_map = CoverageMap()
+        coverage_map.record(single_element_subject({"display": "grid"}, {"height": "5px"}))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "coverage.json")
+            self.assertEqual(0, CoverageMap.load(path).num_tests)
+            coverage_map.save(path)
+            loaded = CoverageMap.load(path)
+        self.assertEqual(1, loaded.num_tests)
+        self.assertEqual(coverage_map.tuple_hits, loaded.tuple_hits)
+        self.assertEqual(coverage_map.tuple_counts, loaded.tuple_counts)
+
+    def test_biased_sampler(self):
+        config = Config({"style-weights": {"height": 50}})
+        coverage_map = CoverageMap()
+        coverage_map.record(single_element_subject({}, {"width": "5px"}))
+        config.setCoverageMap(coverage_map)
+        heights = [s for s in config.getStyleSampler().styles if s.name == "height"]
+        self.assertEqual(1.0, heights[0].probability)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import random
+import unittest
+
+from lqc.generate.css.dependencies import GRID_DISPLAYS, requirements_for, resolve_dependencies
+
+
+def make_tree():
+    child = {"tag": "div", "id": "b", "children": []}
+    return [{"tag": "div", "id": "a", "children": [child]}]
+
+
+class TestDependencies(unittest.TestCase):
+
+    def test_requirements_declared(self):
+        [requirement] = requirements_for("grid-row-start")
+        self.assertEqual(("parent", "display"), (requirement.on, requirement.style_name))
+        self.assertEqual([], requirements_for("width"))
+
+    def test_keeps_satisfied_styles(self):
+        base = {"a": {"display": "grid"}, "b": {"grid-row-start": "2"}}
+        modified = {"a": {}, "b": {"grid-column-end": "3"}}
+        resolve_dependencies(make_tree(), base, modified)
+        self.assertEqual({"a": {"display": "grid"}, "b": {"grid-row-start": "2"}}, base)
+        self.assertEqual({"a": {}, "b": {"grid-column-end": "3"}}, modified)
+
+    def test_modified_context_counts(self):
+        base = {"a": {"display": "block"}, "b": {}}
+        modified = {"a": {"display": "flex"}, "b": {"flex-grow": "2"}}
+        resolve_dependencies(make_tree(), base, modified)
+        self.assertEqual({"flex-grow": "2"}, modified["b"])
+
+    def test_drops_when_context_is_explicit(self):
+        base = {"a": {"display": "block", "top": "5px", "position": "static"}, "b": {"grid-row-start": "2"}}
+        modified = {"a": {}, "b": {}}
+        resolve_dependencies(make_tree(), base, modified)
+        self.assertEqual({"a": {"display": "block", "position": "static"}, "b": {}}, base)
+
+    def test_drops_without_parent(self):
+        base = {"a": {"grid-row-start": "2"}, "b": {}}
+        resolve_dependencies(make_tree(), base, {"a": {}, "b": {}})
+        self.assertEqual({}, base["a"])
+
+    def test_sparse_base_styles(self):
+        # Minimized subjects can have no base styles for some elements
+        for seed in range(20):
+            random.seed(seed)
+            base = {"b": {"grid-row-start": "2"}}
+            resolve_dependencies(make_tree(), base, {"b": {}})
+            if "grid-row-start" in base["b"]:
+                self.assertIn(base["a"]["display"], GRID_DISPLAYS)
+            else:
+                # The parent's entry is only created when it is given a style
+                self.assertNotIn("a", base)
+
+    def test_coerce_or_drop(self):
+        for _ in range(20):
+            base = {"a": {}, "b": {}}
+            modified = {"a": {}, "b": {"grid-row-start": "2", "top": "1px"}}
+            resolve_dependencies(make_tree(), base, modified)
+            if "grid-row-start" in modified["b"]:
+                self.assertIn(base["a"]["display"], ["grid", "inline-grid"])
+            else:
+                self.assertNotIn("display", base["a"])
+            if "top" in modified["b"]:
+                self.assertIn(base["b"]["position"], ["relative", "absolute", "fixed", "sticky"])
+
+
+if __name__ == '__main__':
+    unittest.main()
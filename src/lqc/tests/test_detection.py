@@ -0,0 +1,86 @@
+import json
+import shutil
+import subprocess
+import unittest
+
+from lqc.config.config import Config
+from lqc.generate.web_page.assets import registry
+from lqc.generate.web_page.javascript.create import create, create_lean
+from lqc.model.constants import RelayoutStrategy
+from lqc.tests.fixtures import sample_subject
+
+# Runs compareDimensions() of detection.js on fake elements, prints the differences
+COMPARE_SCRIPT = """
+const elements = [{id: "", tagName: "BODY"}, {id: "a", tagName: "DIV"}, {id: "", tagName: "SPAN"}];
+const modify = new Float64Array(elements.length * NUM_RECT_FIELDS);
+const reload = new Float64Array(elements.length * NUM_RECT_FIELDS);
+// a: height (and bottom) differ by 0.25px, the span: x (and left) by 5px
+reload[1 * NUM_RECT_FIELDS + RECT_FIELDS.indexOf("height")] = 0.25;
+reload[1 * NUM_RECT_FIELDS + RECT_FIELDS.indexOf("bottom")] = 0.25;
+reload[2 * NUM_RECT_FIELDS + RECT_FIELDS.indexOf("x")] = 5;
+reload[2 * NUM_RECT_FIELDS + RECT_FIELDS.indexOf("left")] = 5;
+console.log(JSON.stringify([
+    compareDimensions(elements, modify, modify, 0),
+    compareDimensions(elements, modify, reload, 0),
+    compareDimensions(elements, modify, reload, 0.5),
+]));
+"""
+
+# Calls fromScratchLayout() of a full page, with the relayout strategies of detection.js replaced by ones that print their name
+REPLAY_SCRIPT = """
+for (const strategy of Object.keys(RELAYOUT_STRATEGIES)) {
+    RELAYOUT_STRATEGIES[strategy] = () => { console.log(strategy); return document; };
+}
+fromScratchLayout();
+"""
+
+
+class TestDetection(unittest.TestCase):
+
+    def test_settings_in_page(self):
+        Config({"detection": {"tolerance": 0.5, "relayout": "clone-body"}})
+        js = create_lean(sample_subject())
+        self.assertIn("const DIMENSION_TOLERANCE = 0.5;", js)
+        self.assertIn('const RELAYOUT_STRATEGY = "clone-body";', js)
+        Config({})
+        js = create_lean(sample_subject())
+        self.assertIn("const DIMENSION_TOLERANCE = 0;", js)
+        self.assertIn('const RELAYOUT_STRATEGY = "innerhtml";', js)
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_relayout_strategies(self):
+        script = registry.text("detection.js") + "console.log(JSON.stringify(Object.keys(RELAYOUT_STRATEGIES)));"
+        output = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(sorted(strategy.value for strategy in RelayoutStrategy), sorted(json.loads(output)))
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_replay_strategy(self):
+        # Bug reports lay out from scratch with the strategy the bug was found with
+        Config({"detection": {"relayout": "display-toggle"}})
+        script = "const document = {};\n" + registry.text("detection.js") + create(sample_subject(), None) + REPLAY_SCRIPT
+        output = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout
+        self.assertEqual("display-toggle", output.strip())
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_compare_dimensions(self):
+        script = registry.text("detection.js") + COMPARE_SCRIPT
+        output = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout
+        same, exact, tolerant = json.loads(output)
+
+        self.assertEqual([], same)
+        self.assertEqual(["a<div>", "UnknownID<span>"], [diff["id_tag"] for diff in exact])
+        self.assertEqual({
+            "id": "a",
+            "tag": "div",
+            "id_tag": "a<div>",
+            "differing_dims": ["bottom", "height"],
+            "post_modify_dims": {"bottom": 0, "height": 0},
+            "post_reload_dims": {"bottom": 0.25, "height": 0.25},
+        }, exact[0])
+        # Sub-pixel differences are ignored
+        self.assertEqual(["UnknownID<span>"], [diff["id_tag"] for diff in tolerant])
+        self.assertEqual(["x", "left"], tolerant[0]["differing_dims"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+from unittest import mock
+
+from lqc.config.config import Config
+from lqc.generate.export import MANIFEST_FILE_NAME, MAX_SEEDS_PER_TEST, export_tests
+from lqc.generate.style_log_generator import regenerate_run_subject
+from lqc.generate.web_page.assets import registry
+from lqc.generate.web_page.create import html_string
+
+
+class TestExport(unittest.TestCase):
+
+    def test_export_directory(self):
+        Config({})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manifest = export_tests(tmp_dir, 5, base_seed=100, log=None)
+            self.assertEqual(5, len(manifest["tests"]))
+            self.assertFalse(os.path.exists(os.path.join(tmp_dir, "debugging_tools.js")))
+            with open(os.path.join(tmp_dir, MANIFEST_FILE_NAME)) as f:
+                self.assertEqual(manifest, json.load(f))
+
+            # Every page can be re-created from its seed
+            test = manifest["tests"][0]
+            run_subject = regenerate_run_subject(test["seed"], test["config_hash"])
+            with open(os.path.join(tmp_dir, test["file"])) as f:
+                self.assertEqual(html_string(run_subject), f.read())
+
+    def test_export_tar(self):
+        Config({})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "tests.tar.gz")
+            export_tests(path, 3, log=None)
+            with tarfile.open(path) as tar:
+                names = tar.getnames()
+        self.assertEqual(["test-000000.html", "test-000001.html", "test-000002.html", MANIFEST_FILE_NAME], names)
+
+    def test_export_extra_js(self):
+        Config({})
+        logs = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            export_tests(tmp_dir, 1, extra_js_file_names=["detection.js", "helpers.js"], log=logs.append)
+            with open(os.path.join(tmp_dir, "detection.js"), "rb") as f:
+                self.assertEqual(registry.bytes("detection.js"), f.read())
+            self.assertFalse(os.path.exists(os.path.join(tmp_dir, "helpers.js")))
+        self.assertTrue(any("helpers.js" in message for message in logs))
+
+    def test_export_only_inert(self):
+        Config({})
+        logs = []
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch("lqc.generate.export.is_layout_inert", return_value=True) as is_layout_inert:
+            manifest = export_tests(tmp_dir, 2, log=logs.append)
+        self.assertEqual([], manifest["tests"])
+        self.assertEqual(2 * MAX_SEEDS_PER_TEST, is_layout_inert.call_count)
+        self.assertIn("Warning", logs[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
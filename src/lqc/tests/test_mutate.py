@@ -0,0 +1,73 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from lqc.config.config import Config
+from lqc.generate.budget import within_budget
+from lqc.generate.mutate import Mutator, clone_subtree, load_mutator, load_seed_subjects, move_subtree
+from lqc.model.run_subject import RunSubject
+from lqc.tests.fixtures import sample_subject
+
+
+class TestMutate(unittest.TestCase):
+
+    def test_clone_subtree(self):
+        Config({})
+        run_subject = sample_subject()
+        for _ in range(5):
+            self.assertTrue(clone_subtree(run_subject, Config().getStyleSampler()))
+        ids = run_subject.html_tree.getElementIds()
+        self.assertGreater(len(ids), 3)
+        self.assertEqual(ids, run_subject.getElementIds())
+
+    def test_move_subtree(self):
+        Config({})
+        for _ in range(20):
+            run_subject = sample_subject()
+            move_subtree(run_subject, Config().getStyleSampler())
+            self.assertEqual({"a", "b", "c"}, run_subject.html_tree.getElementIds())
+
+    def test_mutate_keeps_original(self):
+        Config({})
+        original = sample_subject()
+        mutator = Mutator([original], rate=1, max_mutations=3)
+        self.assertTrue(mutator.should_mutate())
+        for _ in range(20):
+            mutant = mutator.mutate()
+            self.assertIsInstance(mutant, RunSubject)
+        self.assertEqual({"a", "b", "c"}, original.html_tree.getElementIds())
+        self.assertEqual({"b": {"height": "1px"}}, original.modified_styles.map)
+
+    def test_mutants_within_budget(self):
+        Config({"generation": {"max-elements": 4, "max-depth": 2, "max-text-length": 3, "max-cost": 4}})
+        budget = Config().getGenerationBudget()
+        mutator = Mutator([sample_subject()], rate=1, max_mutations=3)
+        for _ in range(50):
+            mutant = mutator.mutate()
+            self.assertTrue(within_budget(mutant, budget))
+            # Mutants of mutants, as when they are added back to the corpus
+            mutator.add(mutant)
+
+    def test_load_seed_subjects(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bug_dir = os.path.join(tmp_dir, "bug-1")
+            os.makedirs(bug_dir)
+            with open(os.path.join(bug_dir, "minified_run_subject.pkl"), "wb") as f:
+                pickle.dump(sample_subject(), f)
+            with open(os.path.join(bug_dir, "other.pkl"), "wb") as f:
+                pickle.dump(sample_subject(), f)
+            self.assertEqual(1, len(load_seed_subjects(tmp_dir)))
+
+            Config({"mutation": {"seed-directory": tmp_dir, "rate": 0.5}})
+            mutator = load_mutator()
+            self.assertEqual(1, len(mutator.corpus))
+            self.assertEqual(0.5, mutator.rate)
+
+    def test_disabled_by_default(self):
+        Config({})
+        self.assertIsNone(load_mutator())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import urllib.error
+import urllib.request
+
+from lqc.generate.web_page.assets import registry
+from lqc_selenium.selenium_harness.page_server import PageServer
+
+
+class TestPageServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = PageServer(max_pages=2).start()
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_serve_pages(self):
+        url = self.server.add_page("<html>one</html>")
+        self.assertTrue(url.startswith("http://127.0.0.1:"))
+        with urllib.request.urlopen(url) as response:
+            self.assertEqual(b"<html>one</html>", response.read())
+            self.assertEqual("no-store", response.headers["Cache-Control"])
+
+        # Only the last max_pages pages are kept
+        self.server.add_page(b"two")
+        self.server.add_page(b"three")
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            urllib.request.urlopen(url)
+        self.assertEqual(404, context.exception.code)
+
+    def test_serve_assets(self):
+        with urllib.request.urlopen(self.server.url("detection.js")) as response:
+            self.assertEqual(registry.get("detection.js").data, response.read())
+            self.assertIn("max-age", response.headers["Cache-Control"])
+            etag = response.headers["ETag"]
+
+        request = urllib.request.Request(self.server.url("detection.js"), headers={"If-None-Match": etag})
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            urllib.request.urlopen(request)
+        self.assertEqual(304, context.exception.code)
+
+        # Relative to a page
+        with urllib.request.urlopen(self.server.url("/t/detection.js")) as response:
+            self.assertEqual(registry.get("detection.js").data, response.read())
+
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            urllib.request.urlopen(self.server.url("missing.js"))
+        self.assertEqual(404, context.exception.code)
+
+
+if __name__ == '__main__':
+    unittest.main()
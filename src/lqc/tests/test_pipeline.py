@@ -0,0 +1,32 @@
+import unittest
+
+from lqc.config.config import Config
+from lqc.generate.pipeline import PreGenerator
+
+
+class TestPreGenerator(unittest.TestCase):
+
+    def test_get(self):
+        Config({})
+        with PreGenerator(num_workers=1, queue_size=2) as pregenerator:
+            run_subject, page = pregenerator.get()
+            self.assertIsNotNone(run_subject)
+            self.assertIn("function checkForBug()", page)
+
+    def test_workers_exited(self):
+        Config({})
+        pregenerator = PreGenerator(num_workers=1, queue_size=1).start()
+        try:
+            for worker in pregenerator.workers:
+                worker.terminate()
+                worker.join()
+            with self.assertRaises(RuntimeError):
+                # Whatever was queued before the worker exited is still returned
+                for _ in range(2):
+                    pregenerator.get()
+        finally:
+            pregenerator.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
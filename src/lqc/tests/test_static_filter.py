@@ -0,0 +1,46 @@
+import unittest
+
+from lqc.config.config import Config
+from lqc.generate.css.style_catalog import get_style_catalog
+from lqc.rules.static_filter import is_layout_inert
+from lqc.tests.fixtures import single_element_subject
+from lqc.util.counter import Counter
+from lqc_selenium.runner import next_batch
+
+
+class TestStaticFilter(unittest.TestCase):
+
+    def test_catalog_field(self):
+        catalog = get_style_catalog()
+        for style_name in ["color", "background-color", "outline-color", "box-shadow", "opacity"]:
+            self.assertTrue(catalog.is_layout_inert(style_name), style_name)
+        for style_name in ["width", "display", "transform", "filter", "border-top-width", "not-a-style"]:
+            self.assertFalse(catalog.is_layout_inert(style_name), style_name)
+
+    def test_is_layout_inert(self):
+        self.assertTrue(is_layout_inert(single_element_subject(modified_styles={})))
+        self.assertTrue(is_layout_inert(single_element_subject(modified_styles={"color": "red", "background-color": "blue"})))
+        self.assertFalse(is_layout_inert(single_element_subject(modified_styles={"color": "red", "width": "5px"})))
+
+    def test_next_batch_records_prefiltered(self):
+        Config({})
+        inert = single_element_subject(modified_styles={"color": "red"})
+        tested = single_element_subject(modified_styles={"width": "5px"})
+
+        class Mutator():
+            subjects = [inert, tested]
+            def should_mutate(self):
+                return True
+            def mutate(self):
+                return self.subjects.pop(0)
+
+        counter = Counter()
+        recorded = []
+        batch = next_batch(counter, 1, mutator=Mutator(), record=recorded.append)
+        self.assertEqual(batch, [(tested, None)])
+        self.assertEqual(recorded, [inert])
+        self.assertEqual(counter.num_prefiltered, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+from lqc.generate.css.style_catalog import StyleCatalog, load_style_catalog
+
+
+class TestStyleCatalog(unittest.TestCase):
+
+    def test_indexes(self):
+        catalog = StyleCatalog([
+            {"name": "width", "typedom_types": ["Keyword", "Length", "Percentage"], "keywords": ["auto"]},
+            {"name": "display", "typedom_types": ["Keyword"], "keywords": ["block", "grid"]},
+            {"name": "transform"},
+        ])
+        self.assertEqual(3, len(catalog))
+        self.assertEqual(["block", "grid"], catalog.get("display")["keywords"])
+        self.assertIsNone(catalog.get("unknown-style"))
+        self.assertEqual(["width", "display"], [e["name"] for e in catalog.entries_of_type("Keyword")])
+        self.assertEqual(["width"], [e["name"] for e in catalog.entries_of_type("Length")])
+        self.assertEqual([], catalog.entries_of_type("Image"))
+
+    def test_load_rebuilds_missing_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "style_catalog.json")
+            catalog = load_style_catalog(path)
+            self.assertTrue(os.path.exists(path))
+            self.assertEqual(["Keyword"], catalog.get("display")["typedom_types"])
+            self.assertNotIn("field_template", catalog.get("display"))
+            reloaded = load_style_catalog(path)
+            self.assertEqual(catalog.entries, reloaded.entries)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
+import pickle
+import random
 import unittest
 
 from lqc.config.config import Config
-from lqc.generate.style_log_generator import generate_styles
+from lqc.generate.style_log_generator import generate_run_subject, generate_styles, regenerate_run_subject
+from lqc.util.short_ids import ShortIdAllocator
 
 class TestStringMethods(unittest.TestCase):
 
@@ -17,6 +20,41 @@ class TestStringMethods(unittest.TestCase):
         self.assertFalse("margin-bottom" in styles)
         self.assertTrue("margin-left" in styles)
 
+    def test_seeded_generation(self):
+        Config({"style-weights": {"display": 100}})
+        random.seed(1)
+        subject = generate_run_subject(seed=1234)
+        random.seed(2)
+        same_subject = generate_run_subject(seed=1234)
+        other_subject = generate_run_subject(seed=1235)
+        self.assertEqual(pickle.dumps(subject), pickle.dumps(same_subject))
+        self.assertNotEqual(pickle.dumps(subject), pickle.dumps(other_subject))
+        self.assertEqual(pickle.dumps(subject), pickle.dumps(regenerate_run_subject(1234, subject.config_hash)))
+
+    def test_seeded_generation_depends_on_config(self):
+        Config({"style-weights": {"display": 100}})
+        subject = generate_run_subject(seed=1234)
+        Config({"style-weights": {"display": 90}})
+        self.assertNotEqual(pickle.dumps(subject), pickle.dumps(generate_run_subject(seed=1234)))
+        with self.assertRaises(ValueError):
+            regenerate_run_subject(1234, subject.config_hash)
+
+    def test_seeded_generation_restores_random_state(self):
+        Config({})
+        random.seed(1)
+        expected = random.random()
+        random.seed(1)
+        generate_run_subject(seed=1234)
+        self.assertEqual(expected, random.random())
+
+    def test_short_ids(self):
+        ids = ShortIdAllocator(used_ids=["c"])
+        allocated = [ids.next() for _ in range(30)]
+        self.assertEqual(["a", "b", "d", "e"], allocated[:4])
+        self.assertEqual(["z", "aa", "ab", "ac", "ad", "ae"], allocated[-6:])
+        self.assertEqual(len(allocated), len(set(allocated)))
+        self.assertTrue(all(i.isalpha() for i in allocated))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+import unittest
+
+from lqc.config.config import Config
+from lqc.generate.css.style_sampler import StyleSampler
+
+
+class TestStyleSampler(unittest.TestCase):
+
+    def test_drops_unreachable_styles(self):
+        config = Config({"style-weights": {
+            "margin-top": 0,
+            "max-height:none": 0,
+            "max-height:<length>": 0,
+            "max-height:<percentage>": 0,
+        }})
+        style_entries = [
+            {"name": "margin-top", "typedom_types": ["Length"]},
+            {"name": "max-height", "keywords": ["none"], "typedom_types": ["Keyword", "Length", "Percentage"]},
+            {"name": "min-width", "typedom_types": ["Percentage"]},
+        ]
+        sampler = StyleSampler(config, style_entries)
+        self.assertEqual(["min-width"], [s.name for s in sampler.styles])
+
+    def test_sample_styles(self):
+        config = Config({"style-weights": {
+            "margin-top": 100,
+            "max-height": 100,
+            "max-height:none": 100,
+            "max-height:<length>": 0,
+            "max-height:<percentage>": 0,
+        }})
+        style_entries = [
+            {"name": "margin-top", "typedom_types": ["Length"]},
+            {"name": "max-height", "keywords": ["none"], "typedom_types": ["Keyword", "Length", "Percentage"]},
+        ]
+        sampler = StyleSampler(config, style_entries)
+        for _ in range(10):
+            styles = sampler.sample_styles()
+            self.assertEqual(["margin-top", "max-height"], list(styles.keys()))
+            self.assertEqual("none", styles["max-height"])
+
+    def test_sample_style_maps(self):
+        config = Config({"style-weights": {
+            "margin-top": 0,
+            "max-height": 100,
+            "max-height:none": 0,
+            "max-height:<length>": 0,
+            "max-height:<percentage>": 100,
+            "min-width": 50,
+        }})
+        style_entries = [
+            {"name": "margin-top", "typedom_types": ["Length"]},
+            {"name": "max-height", "keywords": ["none"], "typedom_types": ["Keyword", "Length", "Percentage"]},
+            {"name": "min-width", "typedom_types": ["Percentage"]},
+        ]
+        sampler = StyleSampler(config, style_entries)
+        style_maps = sampler.sample_style_maps(200)
+        self.assertEqual(200, len(style_maps))
+        self.assertTrue(all(list(m.keys())[0] == "max-height" for m in style_maps))
+        self.assertTrue(all(m["max-height"].endswith("%") for m in style_maps))
+        num_min_width = len([m for m in style_maps if "min-width" in m])
+        self.assertTrue(50 < num_min_width < 150)
+
+    def test_sampler_built_once_per_config(self):
+        config = Config({})
+        self.assertIs(config.getStyleSampler(), Config().getStyleSampler())
+        self.assertIsNot(config.getStyleSampler(), Config({}).getStyleSampler())
+
+
+if __name__ == '__main__':
+    unittest.main()
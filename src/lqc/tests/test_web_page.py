@@ -0,0 +1,176 @@
+import re
+import threading
+import unittest
+from functools import reduce
+
+from lqc.config.config import Config
+from lqc.generate.style_log_generator import generate_run_subject
+from lqc.generate.web_page.create import batch_html_string, harness_html_string, html_bytes, html_string, html_template
+from lqc.generate.web_page.html_body.create import FragmentCache, active_fragment_cache, create as html_body, use_fragment_cache
+from lqc.generate.web_page.javascript.create import create as js_minimal
+from lqc.generate.web_page.util import formatWithIndent
+from lqc.minify.minify_test_file import MinifyStepFactory
+from lqc.model.constants import PageProfile, StyleChangeFormat
+from lqc.model.element_tree import ElementTree
+from lqc.model.run_subject import RunSubject
+from lqc.model.style_map import StyleMap
+from lqc.tests.fixtures import sample_subject
+
+
+# The renderer before it was made single pass, kept to check the output is unchanged
+
+def reference_format_with_indent(s, **kwargs):
+    key_indents = {}
+    for l in s.split("\n"):
+        match = re.search(r'(\s*){(.*)}', l)
+        if match:
+            key_indents[match.group(2)] = match.group(1)
+    for kw, val in kwargs.items():
+        if kw in key_indents:
+            kwargs[kw] = val.replace('\n', '\n' + key_indents[kw])
+    return s.format(**kwargs)
+
+
+reference_element_template = """
+<{tag} style="{style}" {attributes_string} id="{element_id}">
+  {children_string}
+</{tag}>
+"""
+
+
+def reference_html_body(run_subject):
+    styles = run_subject.base_styles.map
+
+    def generate_element_string(body_string, element):
+        if element["tag"] == "<text>":
+            return body_string + element["value"]
+        style = ";".join([f"{name}:{value}" for name, value in styles.get(element.get("id", ""), {}).items()])
+        attributes_string = " ".join(
+            f"{name}='{value}'" for name, value in element.get("attributes", {}).items() if name in ["onclick"]
+        )
+        return body_string + reference_format_with_indent(reference_element_template,
+            tag=element["tag"],
+            style=style,
+            element_id=element.get("id", ""),
+            attributes_string=attributes_string,
+            children_string=reduce(generate_element_string, element["children"], ""),
+        )
+
+    return reduce(generate_element_string, run_subject.html_tree.tree, "")
+
+
+def reference_html_string(run_subject):
+    return reference_format_with_indent(html_template,
+        js_string=js_minimal(run_subject, None),
+        body_string=reference_html_body(run_subject),
+        extra_js_files_string="",
+    )
+
+
+class TestWebPage(unittest.TestCase):
+
+    def test_format_with_indent(self):
+        template = "<div>\n  {inner}\n</div>{tail}"
+        self.assertEqual("<div>\n  a\n  b\n</div>c\nd", formatWithIndent(template, inner="a\nb", tail="c\nd"))
+
+    def test_body_unchanged(self):
+        run_subject = sample_subject()
+        self.assertEqual(reference_html_body(run_subject), html_body(run_subject))
+
+    def test_page_unchanged(self):
+        Config({})
+        subjects = [sample_subject()] + [generate_run_subject(seed=seed) for seed in range(30)]
+        for run_subject in subjects:
+            self.assertEqual(reference_html_string(run_subject), html_string(run_subject, style_change_format=StyleChangeFormat.STATEMENTS, profile=PageProfile.FULL))
+
+    def test_json_style_changes(self):
+        run_subject = sample_subject()
+        run_subject.modified_styles.map["c"] = {"width": "1px", "content": "'</script>'"}
+        page = html_string(run_subject, profile=PageProfile.FULL)
+        self.assertIn('applyStyleChanges({"b":{"height":"1px"},"c":{"content":"\'\\u003c/script>\'","width":"1px"}});', page)
+        self.assertIn('printDimensions("b", ["x", "y", "top", "bottom"]);', page)
+        self.assertNotIn('b.style["height"]', page)
+
+    def test_fragment_cache(self):
+        Config({})
+        cache = FragmentCache()
+        for seed in range(10):
+            run_subject = generate_run_subject(seed=seed)
+            steps = MinifyStepFactory()
+            for step in range(30):
+                proposed_run_subject = steps.next_minimization_step(run_subject)
+                if proposed_run_subject is None:
+                    break
+                with use_fragment_cache(cache):
+                    cached = html_body(proposed_run_subject)
+                self.assertEqual(html_body(proposed_run_subject), cached)
+                if step % 2 == 0:
+                    run_subject = proposed_run_subject
+
+    def test_fragment_cache_shares_subtrees(self):
+        leaf = {"tag": "div", "id": "c", "children": []}
+        tree = [
+            {"tag": "div", "id": "a", "children": [{"tag": "div", "id": "b", "children": [leaf]}]},
+            {"tag": "div", "id": "d", "children": [{"tag": "div", "id": "e", "children": []}]},
+        ]
+        run_subject = RunSubject(ElementTree(tree), StyleMap({"c": {"width": "1px"}, "e": {"width": "2px"}}), StyleMap({}))
+        with use_fragment_cache() as cache:
+            html_body(run_subject)
+            proposed_run_subject = run_subject.copy_path("c")
+            proposed_run_subject.base_styles.map["c"]["width"] = "3px"
+            # Only the path a > b > c is walked again, the d subtree is shared
+            self.assertIs(tree[1], proposed_run_subject.html_tree.tree[1])
+            num_subtrees = len(cache.subtrees)
+            cached = html_body(proposed_run_subject)
+            self.assertEqual(num_subtrees + 3, len(cache.subtrees))
+        self.assertEqual(html_body(proposed_run_subject), cached)
+        self.assertEqual({"width": "1px"}, run_subject.base_styles.map["c"])
+
+    def test_fragment_cache_per_thread(self):
+        seen = []
+        with use_fragment_cache() as cache:
+            self.assertIs(cache, active_fragment_cache())
+            thread = threading.Thread(target=lambda: seen.append(active_fragment_cache()))
+            thread.start()
+            thread.join()
+        self.assertEqual([None], seen)
+        self.assertIsNone(active_fragment_cache())
+
+    def test_lean_page(self):
+        run_subject = sample_subject()
+        page = html_string(run_subject, extra_js_file_names=["helpers.js"])
+        self.assertIn("function checkForBug()", page)
+        self.assertIn('applyStyleChanges({"b":{"height":"1px"}});', page)
+        self.assertNotIn("printDimensions", page)
+        self.assertNotIn("debugging_tools.js", page)
+        # Only the extra files are loaded
+        self.assertEqual(['<script src="helpers.js"></script>'], re.findall(r'<script src=.*?</script>', page))
+        self.assertIn(html_body(run_subject).replace("\n", "\n    "), page)
+
+    def test_harness_page(self):
+        page = harness_html_string()
+        self.assertIn("function runTest(bodyHtml, styleChanges)", page)
+        self.assertIn("function checkForBug()", page)
+        self.assertIn("applyStyleChanges(pendingStyleChanges);", page)
+        self.assertNotIn("<script src=", page)
+        self.assertRegex(page, r"<body>\s*</body>")
+
+        page = batch_html_string()
+        self.assertIn("function runBatch(pages, done)", page)
+        self.assertNotIn("<script src=", page)
+
+    def test_served_page(self):
+        Config({})
+        run_subject = sample_subject()
+        page = html_string(run_subject, profile=PageProfile.SERVED)
+        self.assertEqual(['<script src="/detection.js"></script>'], re.findall(r'<script src=.*?</script>', page))
+        self.assertNotIn("function checkForBug()", page)
+        self.assertIn('applyStyleChanges({"b":{"height":"1px"}});', page)
+
+    def test_html_bytes(self):
+        run_subject = sample_subject()
+        self.assertEqual(html_string(run_subject).encode("utf-8"), html_bytes(run_subject))
+
+
+if __name__ == '__main__':
+    unittest.main()
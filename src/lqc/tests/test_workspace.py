@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from lqc.config.config import Config
+from lqc.generate import workspace as workspace_module
+from lqc.generate.workspace import TEST_FILE_NAME, Workspace, get_workspace
+
+
+class TestWorkspace(unittest.TestCase):
+
+    def test_write_page_in_place(self):
+        with tempfile.TemporaryDirectory() as root:
+            workspace = Workspace(root, ["detection.js"])
+            self.assertEqual([os.path.basename(workspace.path)], os.listdir(root))
+            self.assertTrue(os.path.exists(os.path.join(workspace.path, "detection.js")))
+
+            path, url = workspace.write_page("one")
+            path_2, url_2 = workspace.write_page(["t", "wo"])
+            self.assertEqual(path, path_2)
+            self.assertEqual(TEST_FILE_NAME, os.path.basename(path))
+            self.assertNotEqual(url, url_2)
+            self.assertTrue(url_2.startswith("file://" + path))
+            with open(path) as f:
+                self.assertEqual("two", f.read())
+
+            kept_path = workspace.keep(path)
+            self.assertFalse(os.path.exists(path))
+            with open(kept_path) as f:
+                self.assertEqual("two", f.read())
+
+            workspace.cleanup()
+            self.assertEqual([], os.listdir(root))
+
+    def test_get_workspace(self):
+        with tempfile.TemporaryDirectory() as root:
+            Config({"paths": {"tmp-files-directory": root}})
+            workspace = get_workspace()
+            self.assertIs(workspace, get_workspace())
+            self.assertEqual(root, os.path.dirname(workspace.path))
+            workspace.cleanup()
+            workspace_module._workspace = None
+
+
+if __name__ == '__main__':
+    unittest.main()
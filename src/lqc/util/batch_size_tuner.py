@@ -0,0 +1,59 @@
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_MAX_BATCH_SIZE = 64
+TUNE_WINDOW = 5     # Batches run at a batch size before it is compared with the previous one
+
+
+class BatchSizeTuner():
+    """
+    Picks the number of tests run per batch, by hill climbing the time per test.
+
+    The time per test is measured over TUNE_WINDOW batches at a batch size,
+    then the batch size takes a step. When the time per test got worse than
+    with the previous batch size, the direction is reversed, so the batch
+    size settles around the fastest one, and follows it if it drifts (eg. as
+    the browser warms up or the tests get larger).
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, max_batch_size=DEFAULT_MAX_BATCH_SIZE, auto_tune=True, window=TUNE_WINDOW):
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_size = min(max(1, batch_size), self.max_batch_size)
+        self.auto_tune = auto_tune
+        self.window = window
+        self.direction = 1
+        self.last_time_per_test = None
+        self._num_batches = 0
+        self._num_tests = 0
+        self._seconds = 0.0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.getBatchSize(), config.getMaxBatchSize(), config.isBatchSizeAutoTuned())
+
+    def record(self, num_tests, seconds):
+        """ Record the time a batch of num_tests tests took """
+        if not self.auto_tune or num_tests == 0:
+            return
+        # Batches cut short (eg. by a test limit) say little about the batch size
+        if num_tests < self.batch_size:
+            return
+        self._num_batches += 1
+        self._num_tests += num_tests
+        self._seconds += seconds
+        if self._num_batches >= self.window:
+            self._step(self._seconds / self._num_tests)
+
+    def _step(self, time_per_test):
+        if self.last_time_per_test is not None and time_per_test > self.last_time_per_test:
+            self.direction = -self.direction
+        self.last_time_per_test = time_per_test
+
+        step = max(1, self.batch_size // 4)
+        batch_size = min(max(1, self.batch_size + self.direction * step), self.max_batch_size)
+        if batch_size == self.batch_size:
+            # At a bound, head back
+            self.direction = -self.direction
+        self.batch_size = batch_size
+
+        self._num_batches = 0
+        self._num_tests = 0
+        self._seconds = 0.0
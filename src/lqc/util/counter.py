@@ -9,6 +9,7 @@ class Counter():
         self.num_cant_reproduce = 0         # Number of tests that initially had a bug that was later unreproducable
         self.num_no_mod_styles_bugs = 0     # Number of tests that showed signs of a bug, but during the minify step, all changes were eliminated
         self.num_crash = 0                  # Number of times the program crashed
+        self.num_prefiltered = 0            # Number of passing tests that were not run, as no modified style could affect layout
 
         # Criteria for when to stop testing
         self.bug_limit = bug_limit          # Stop when the number of bugs found reaches bug_limit
@@ -27,6 +28,10 @@ class Counter():
     def incSuccess(self):
         self.num_successful += 1
 
+    def incPrefiltered(self):
+        self.num_prefiltered += 1
+        self.num_successful += 1
+
     def incError(self):
         self.num_error += 1
         self.feedback_triggered = True
@@ -54,11 +59,19 @@ class Counter():
             return False
         return True
     
+    def tests_left(self):
+        """ Number of tests left to run before the test limit, None if there is no limit """
+        if self.test_limit > 0:
+            return max(0, self.test_limit - self.num_tests)
+        return None
+
     def getStatusString(self):
         interval_triggered = self.num_successful % self.feedback_interval == 0
         if self.feedback_triggered or interval_triggered:
             self.feedback_triggered = False
             ret = f"Passed: {self.num_successful};  Bugs: {self.num_error};"
+            if self.num_prefiltered > 0:
+                ret += f"  Skipped (layout inert): {self.num_prefiltered};"
             if self.num_no_mod_styles_bugs > 0:
                 ret += f"  Bugs With No Modified Styles: {self.num_no_mod_styles_bugs};"
             if self.num_cant_reproduce > 0:
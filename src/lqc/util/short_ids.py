@@ -0,0 +1,32 @@
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+# Element ids are also used as JS globals (eg. `abc.style["width"] = "1px"`).
+# Skip short ids that are already taken by a property of `window`.
+RESERVED_IDS = {"top", "name", "self", "open", "stop", "find", "blur"}
+
+
+class ShortIdAllocator():
+    """
+    Allocates short, letters-only element ids in sequence: a, b, ..., z, aa, ab, ...
+    """
+
+    def __init__(self, used_ids=()):
+        self.next_index = 0
+        self.used_ids = set(used_ids)
+
+    def _id_for_index(self, index):
+        # Bijective base-26, so every letter string is produced exactly once
+        chars = []
+        index += 1
+        while index > 0:
+            index, remainder = divmod(index - 1, 26)
+            chars.append(LETTERS[remainder])
+        return "".join(reversed(chars))
+
+    def next(self):
+        while True:
+            element_id = self._id_for_index(self.next_index)
+            self.next_index += 1
+            if element_id not in RESERVED_IDS and element_id not in self.used_ids:
+                self.used_ids.add(element_id)
+                return element_id
@@ -1,6 +1,6 @@
 
 function test_bug_and_report() {
-  // Function checkForBug() only exists in JS version with debugging tools
+  // Function checkForBug() is provided by detection.js, inlined in lean test pages
   if (typeof(checkForBug) == "function") {
     let dimensionsDiffer = checkForBug();
 
@@ -3,22 +3,30 @@
 
 import pathlib
 import json
-import os
 from urllib.parse import unquote
 from enum import Enum, unique
 from lqc.config.config import Config, parse_config
+from lqc.generate.mutate import load_mutator
+from lqc.generate.seed import new_seed
 from lqc.generate.style_log_generator import generate_run_subject
-from lqc.generate.web_page.create import html_string
+from lqc.generate.web_page.create import html_bytes
+from lqc.generate.web_page.html_body.create import FragmentCache, use_fragment_cache
 
 from grizzly.adapter import Adapter
-from lqc.generate.web_page.javascript.create import EXTERNAL_JS_FILE_PATHS
+from lqc.generate.web_page.assets import registry
+from lqc.generate.web_page.javascript.create import EXTERNAL_JS_FILE_NAMES
 from lqc.minify.minify_test_file import MinifyStepFactory
+from lqc.model.constants import PageProfile, StyleChangeFormat
 from lqc.model.run_result import RunResultLayoutBug
 from lqc.model.run_subject import RunSubject
+from lqc.rules.static_filter import is_layout_inert
 
 __author__ = "Tyson Smith"
 __credits__ = ["Tyson Smith", "Nathan Davis"]
 
+# Most subjects generated in a row to find one that is not layout inert
+MAX_PREFILTER_ATTEMPTS = 10
+
 JS_BOOTSTRAP = """
 window.addEventListener("load", test_bug_and_report);
 """
@@ -51,6 +59,9 @@ def getSignature(run_subject: RunSubject):
     styles_used.sort()
     return ",".join(styles_used)
 
+registry.register("helpers.js", str(pathlib.Path(__file__).parent.joinpath('grizzly_test_helpers.js').resolve()))
+
+
 class LayoutQuickCheckAdapter(Adapter):
     """LayoutQuickCheckAdapter"""
 
@@ -73,6 +84,7 @@ class LayoutQuickCheckAdapter(Adapter):
         # Config file is specified on the command line with -i
         config = parse_config(input_path)
         Config(config)
+        self.fuzz["mutator"] = load_mutator()
 
     def _found(self, args):
         # callback attached to '/found'
@@ -92,6 +104,18 @@ class LayoutQuickCheckAdapter(Adapter):
         else:
             return "function finish_test() { setTimeout(window.close, 10) }\n" + JS_BOOTSTRAP
 
+    def _nextRunSubject(self):
+        """ Generate or mutate a subject, skipping subjects that cannot find a layout bug """
+        mutator = self.fuzz["mutator"]
+        for _ in range(MAX_PREFILTER_ATTEMPTS):
+            if mutator is not None and mutator.should_mutate():
+                run_subject = mutator.mutate()
+            else:
+                run_subject = generate_run_subject(seed=new_seed())
+            if not (Config().isStaticFilterEnabled() and is_layout_inert(run_subject)):
+                break
+        return run_subject
+
     def enterFuzzMode(self):
         """Fuzz mode generates random tests"""
         self.fuzz["mode"] = Mode.FUZZ
@@ -105,19 +129,22 @@ class LayoutQuickCheckAdapter(Adapter):
         self.fuzz["best"] = None
         self.fuzz["mode"] = Mode.REDUCE
         self.fuzz["minifyStepsFactory"] = MinifyStepFactory()
+        # Rendered subtrees shared by the minimization candidates of this test
+        self.fuzz["fragment_cache"] = FragmentCache()
 
     def enterReportMode(self):
         """Report mode crashes the browser to report the bug"""
         self.fuzz["mode"] = Mode.REPORT
 
     def generate(self, testcase, _server_map):
+        page_profile = PageProfile.LEAN
 
         if self.fuzz["mode"] == Mode.FUZZ:
-            # generate a test
-            self.fuzz["run_subject"] = generate_run_subject()
+            # generate a test, or mutate a previously interesting one
+            self.fuzz["run_subject"] = self._nextRunSubject()
             jslib = self._jsDriver(self.fuzz["run_subject"])
-            # html_string will generate a complete web page with html and inline js
-            self.fuzz["test"] = html_string(self.fuzz["run_subject"], extra_js_file_names=self.EXTRA_JS_FILE_NAMES)
+            # html_bytes will generate a complete web page with html and inline js
+            self.fuzz["test"] = html_bytes(self.fuzz["run_subject"], extra_js_file_names=self.EXTRA_JS_FILE_NAMES)
 
         elif self.fuzz["mode"] == Mode.REDUCE:
 
@@ -126,18 +153,21 @@ class LayoutQuickCheckAdapter(Adapter):
             # are we done reduction?
             if self.fuzz["proposed_run_subject"] == None:
                 self.enterReportMode()
-                # html_string will generate a complete web page with html and inline js
-                self.fuzz["test"] = html_string(self.fuzz["run_subject"], extra_js_file_names=self.EXTRA_JS_FILE_NAMES)
+                # html_bytes will generate a complete web page with html and inline js
+                self.fuzz["test"] = html_bytes(self.fuzz["run_subject"], extra_js_file_names=self.EXTRA_JS_FILE_NAMES)
             else:
-                # html_string will generate a complete web page with html and inline js
-                self.fuzz["test"] = html_string(self.fuzz["proposed_run_subject"], extra_js_file_names=self.EXTRA_JS_FILE_NAMES)
+                # html_bytes will generate a complete web page with html and inline js
+                with use_fragment_cache(self.fuzz["fragment_cache"]):
+                    self.fuzz["test"] = html_bytes(self.fuzz["proposed_run_subject"], extra_js_file_names=self.EXTRA_JS_FILE_NAMES)
             jslib = self._jsDriver(self.fuzz["run_subject"])
 
         elif self.fuzz["mode"] == Mode.REPORT:
             # here we should force crash the browser so grizzly detects a result
             # see bug https://bugzilla.mozilla.org/show_bug.cgi?id=1725008
             # sig = getSignature(self.fuzz["run_subject"])
-            self.fuzz["test"] = html_string(self.fuzz["run_subject"], self.fuzz["run_result"], extra_js_file_names=self.EXTRA_JS_FILE_NAMES)
+            # the reported page is a full page, with the debugging tools
+            page_profile = PageProfile.FULL
+            self.fuzz["test"] = html_bytes(self.fuzz["run_subject"], self.fuzz["run_result"], extra_js_file_names=self.EXTRA_JS_FILE_NAMES, style_change_format=StyleChangeFormat.STATEMENTS, profile=page_profile)
             jslib = self._jsDriver(self.fuzz["run_subject"], reporting_bug=True)
             self.fuzz["reported"] = True
 
@@ -147,15 +177,14 @@ class LayoutQuickCheckAdapter(Adapter):
         # add a non required file
         testcase.add_from_bytes(jslib.encode('utf-8'), "bootstrap.js", required=False)
 
-        # add the helper.js file
-        helpersJSPath = pathlib.Path(__file__).parent.joinpath('grizzly_test_helpers.js').resolve()
-        testcase.add_from_file(helpersJSPath, file_name="helpers.js", copy=True)
-        for filepath in EXTERNAL_JS_FILE_PATHS:
-            filename = os.path.basename(filepath)
-            testcase.add_from_file(filepath, file_name=filename, copy=True)
+        # add the helper.js file, and the JS files the full (report) page loads
+        testcase.add_from_bytes(registry.bytes("helpers.js"), "helpers.js")
+        if page_profile == PageProfile.FULL:
+            for filename in EXTERNAL_JS_FILE_NAMES:
+                testcase.add_from_bytes(registry.bytes(filename), filename)
 
         # add to testcase as entry point
-        testcase.add_from_bytes(self.fuzz["test"].encode('utf-8'), testcase.landing_page)
+        testcase.add_from_bytes(self.fuzz["test"], testcase.landing_page)
 
     def on_served(self, _test, _served):
 
@@ -182,6 +211,9 @@ class LayoutQuickCheckAdapter(Adapter):
                 print("Minify step removed all modified styles. False Positive, ignoring.")
                 self.enterFuzzMode()
             if self.fuzz["reported"]:
+                # keep the reduced test around to find variants of the bug
+                if self.fuzz["mutator"] is not None:
+                    self.fuzz["mutator"].add(self.fuzz["run_subject"])
                 # return to fuzzing mode
                 self.enterFuzzMode()
 
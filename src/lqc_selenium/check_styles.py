@@ -10,7 +10,7 @@ styles in the frequency expected.
 import argparse
 
 from lqc.config.config import Config, parse_config
-from lqc.generate.css import style_data
+from lqc.generate.css.style_catalog import get_style_catalog
 from lqc.generate.css.style_generator import StyleGenerator
 
 DEFAULT_CONFIG_FILE = "./config/preset-default.config.json"
@@ -28,13 +28,12 @@ if __name__ == "__main__":
 
     def generate_style(style_name):
         style_value_generator = StyleGenerator()
-        for current_style in style_data["data"]:
-            if current_style["name"] == style_name:
-                gen = style_value_generator.pickGenerator(current_style)
-                if gen:
-                    return gen()
-                else:
-                    return None
+        current_style = get_style_catalog().get(style_name)
+        if current_style:
+            gen = style_value_generator.pickGenerator(current_style)
+            if gen:
+                return gen()
+        return None
 
     for style_name in args.styles:
         print(f"\n{style_name}")
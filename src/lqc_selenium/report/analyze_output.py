@@ -3,6 +3,8 @@ import sys
 import json
 import collections.abc
 
+from lqc.store.bug_store import iter_report_data
+
 DEFAULT_BUG_REPORT_DIR = './bugreportfiles'
 DEFAULT_JSON_FILENAME = 'data.json'
 
@@ -10,8 +12,13 @@ def collect_json_reports(bug_report_dir, json_filename):
     json_filepaths = [os.path.join(bug_report_dir, dir, json_filename) for dir in os.listdir(bug_report_dir)]
     reports = []
     for json_filepath in json_filepaths:
+        # Skip entries that are not report directories, eg. a bug store
+        if not os.path.exists(json_filepath):
+            continue
         with open(json_filepath, 'r') as f:
             reports.append(json.loads(f.read()))
+    # Reports in bug stores are read from their index
+    reports.extend(summary for _, summary in iter_report_data(bug_report_dir))
     return reports
 
 def get_matches(bugs, v_match):
@@ -9,6 +9,19 @@ from lqc.generate.web_page.run_subject_converter import copyExternalJSFiles
 from lqc.model.constants import BugType
 from lqc.model.run_result import RunResult, RunResultLayoutBug
 from lqc.model.run_subject import RunSubject
+from lqc.store.bug_store import BugStore
+
+
+MINIFIED_BUG_FILE_NAME = "minified_bug.html"
+
+
+def new_bug_folder():
+    """ Create the folder for a new bug report """
+    return FileConfig().getCustomTimestampPath("bug_report")
+
+
+def bug_report_url(bug_folder):
+    return "file://" + os.path.abspath(os.path.join(bug_folder, MINIFIED_BUG_FILE_NAME))
 
 
 def save_bug_report(
@@ -19,23 +32,20 @@ def save_bug_report(
     prerun_subject: RunSubject,
     shouldSkip
 ):
-    file_config = FileConfig()
-    bug_folder, _ = file_config.getCustomTimestampBugReport("bug_report")
-
-    # Create a folder to hold all the bug report files
-    os.mkdir(bug_folder)
+    """ Write a bug report, returns its URL. See BugReportWriter to write reports in the background """
+    bug_folder = new_bug_folder()
+    write_bug_report(bug_folder, variants, minified_run_subject, run_result, original_filepath, prerun_subject, shouldSkip)
+    return bug_report_url(bug_folder)
 
-    # Copy the original file
-    bug_filepath = os.path.join(bug_folder, "original_bug.html")
-    shutil.copy(original_filepath, bug_filepath)
-
-    # Copy the minimized bug
-    minified_bug = os.path.join(bug_folder, "minified_bug.html")
-    print(f"Saving minimized bug to {minified_bug}")
-    save_as_web_page(minified_run_subject, minified_bug, run_result=run_result)
-    copyExternalJSFiles(bug_folder)
 
-    # Custom bug helper file - JSON file
+def bug_report_summary(
+    variants,
+    minified_run_subject: RunSubject,
+    run_result: RunResult,
+    shouldSkip,
+    found_at: datetime = None
+):
+    """ The fields of data.json that describe the bug, without the subjects """
     styles_used = list(minified_run_subject.all_style_names())
     styles_used.sort()
     styles_used_string = ",".join(styles_used)
@@ -43,38 +53,97 @@ def save_bug_report(
     modified_styles = list(minified_run_subject.modified_styles.all_style_names())
     bug_type = "Page Crash" if run_result.type == BugType.PAGE_CRASH else "Under Invalidation"
 
-    
-    pickle_addr = f"{bug_folder}/minified_run_subject.pkl"
-    with open(pickle_addr, "wb") as f:
-        pickle.dump(minified_run_subject, f)
-
-    prerun_subject_addr = f"{bug_folder}/run_subject_prerun.pkl"
-    with open(prerun_subject_addr, "wb") as f:
-        pickle.dump(prerun_subject, f)
-    
-    json_data = {
-        "datetime": datetime.now().isoformat(),
+    summary = {
+        "datetime": (found_at or datetime.now()).isoformat(),
         "bug_type": bug_type,
         "styles_used": styles_used,
         "styles_used_string": styles_used_string,
         "base_styles": base_styles,
         "modified_styles": modified_styles,
         "variants": variants,
-        "minified_run_subject": minified_run_subject,
-        "prerun_subject": prerun_subject,
-        "pickle_addr": pickle_addr,
         "shouldSkip": shouldSkip
     }
-    
+
     if isinstance(run_result, RunResultLayoutBug):
-        json_data["differences"] = run_result.element_dimensions
+        summary["differences"] = run_result.element_dimensions
+
+    return summary
+
+
+def write_bug_report(
+    bug_folder,
+    variants,
+    minified_run_subject: RunSubject,
+    run_result: RunResult,
+    original_filepath,
+    prerun_subject: RunSubject,
+    shouldSkip,
+    found_at: datetime = None
+):
+    # Save the original test as a full page (the tested page was lean)
+    bug_filepath = os.path.join(bug_folder, "original_bug.html")
+    if isinstance(prerun_subject, RunSubject):
+        save_as_web_page(prerun_subject, bug_filepath)
+    else:
+        shutil.copy(original_filepath, bug_filepath)
+
+    # Save the minimized bug
+    minified_bug = os.path.join(bug_folder, MINIFIED_BUG_FILE_NAME)
+    save_as_web_page(minified_run_subject, minified_bug, run_result=run_result)
+    copyExternalJSFiles(bug_folder)
+
+    pickle_addr = f"{bug_folder}/minified_run_subject.pkl"
+    with open(pickle_addr, "wb") as f:
+        pickle.dump(minified_run_subject, f)
+
+    prerun_subject_addr = f"{bug_folder}/run_subject_prerun.pkl"
+    with open(prerun_subject_addr, "wb") as f:
+        pickle.dump(prerun_subject, f)
+
+    # Custom bug helper file - JSON file
+    json_data = bug_report_summary(variants, minified_run_subject, run_result, shouldSkip, found_at)
+    json_data["minified_run_subject"] = minified_run_subject
+    json_data["prerun_subject"] = prerun_subject
+    json_data["pickle_addr"] = pickle_addr
 
     json_data_filepath = os.path.join(bug_folder, "data.json")
     with open(json_data_filepath, "w") as f:
         f.write(json.dumps(json_data, indent=4, default=lambda o: o.__dict__))
 
-    # Todo: Copy the necessary javascript files (debugger_tools.js)
 
-    # Return a URL
-    url = "file://" + os.path.abspath(minified_bug)
-    return url
+# =============================
+# Bug Store (see lqc/store)
+# =============================
+
+def store_bug_report(
+    store: BugStore,
+    report_id,
+    variants,
+    minified_run_subject: RunSubject,
+    run_result: RunResult,
+    original_filepath,
+    prerun_subject: RunSubject,
+    shouldSkip,
+    found_at: datetime = None
+):
+    """ Append a bug report to a bug store, as one record. Pages are rendered when it is exported """
+    summary = bug_report_summary(variants, minified_run_subject, run_result, shouldSkip, found_at)
+    return store.append(report_id, summary, minified_run_subject=minified_run_subject, prerun_subject=prerun_subject, run_result=run_result)
+
+
+def export_stored_report(store: BugStore, entry, bug_folder):
+    """ Write a stored report as a bug report directory (pages, pickles, data.json). Returns its URL """
+    record = store.get(entry)
+    summary = record["data"]
+    os.makedirs(bug_folder, exist_ok=True)
+    write_bug_report(
+        bug_folder,
+        summary["variants"],
+        record["minified_run_subject"],
+        record["run_result"],
+        None,
+        record["prerun_subject"],
+        summary["shouldSkip"],
+        datetime.fromisoformat(summary["datetime"]),
+    )
+    return bug_report_url(bug_folder)
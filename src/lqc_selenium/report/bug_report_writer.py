@@ -0,0 +1,97 @@
+""" Writes bug reports in a background thread
+
+Writing a report (rendering two pages, pickling the subjects, dumping
+data.json) takes a while for large subjects. BugReportWriter takes reports
+through a bounded queue and writes them in a thread, so the browser can go
+on to the next test. When the queue is full, submit() waits for the writer
+to catch up. Reports that fail to write are recorded in `failures`.
+
+With a BugStore, reports are appended to the store instead of being written
+as directories.
+"""
+
+import queue
+import threading
+import time
+import traceback
+from datetime import datetime
+from functools import partial
+
+from lqc.store.bug_store import BugStore
+from lqc_selenium.report.bug_report_helper import bug_report_url, new_bug_folder, store_bug_report, write_bug_report
+
+DEFAULT_QUEUE_SIZE = 32
+
+
+class BugReportWriter():
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE, store: BugStore = None):
+        self.queue = queue.Queue(queue_size)
+        self.store = store
+        self.thread = None
+        self.num_written = 0
+        self.failures = []          # [(bug folder or report id, traceback string), ...]
+        self.blocked_seconds = 0    # Time submit() waited on a full queue
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="BugReportWriter", daemon=True)
+        self.thread.start()
+        return self
+
+    def submit(self, variants, minified_run_subject, run_result, original_filepath, prerun_subject, shouldSkip):
+        """
+        Queue a bug report (same arguments as save_bug_report), returns the URL it will be written to.
+        The subjects must not be changed afterwards.
+        """
+        args = (variants, minified_run_subject, run_result, original_filepath, prerun_subject, shouldSkip, datetime.now())
+        if self.store is not None:
+            report_id = self.store.new_id()
+            report = (report_id, partial(store_bug_report, self.store, report_id, *args))
+            url = f"{self.store.path}#{report_id}"
+        else:
+            bug_folder = new_bug_folder()
+            report = (bug_folder, partial(write_bug_report, bug_folder, *args))
+            url = bug_report_url(bug_folder)
+
+        try:
+            self.queue.put_nowait(report)
+        except queue.Full:
+            start = time.perf_counter()
+            self.queue.put(report)
+            self.blocked_seconds += time.perf_counter() - start
+        return url
+
+    def _run(self):
+        while True:
+            report = self.queue.get()
+            try:
+                if report is None:
+                    return
+                location, write = report
+                try:
+                    write()
+                    self.num_written += 1
+                except Exception:
+                    self.failures.append((location, traceback.format_exc()))
+                    print(f"Failed to write bug report {location}")
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """ Wait until every submitted report is written """
+        self.queue.join()
+
+    def close(self):
+        """ Write the remaining reports and stop the thread """
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        if self.store is not None:
+            self.store.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,49 @@
+"""
+Export reports from a bug store (see lqc/store) as bug report directories,
+with their pages rendered from the stored subjects.
+
+Usage
+-----
+python src/lqc_selenium/report/export_bugs.py STORE_DIR OUTPUT_DIR [REPORT_ID ...]
+
+Lists the stored reports if OUTPUT_DIR is not given. Exports every report
+if no REPORT_ID is given. Pages are rendered with the default config.
+"""
+
+import os
+import sys
+
+from lqc.config.config import Config, parse_config
+from lqc.store.bug_store import BugStore
+from lqc_selenium.report.bug_report_helper import export_stored_report
+
+DEFAULT_CONFIG_FILE = "./config/preset-default.config.json"
+
+
+def list_reports(store):
+    for entry in store.entries():
+        data = entry["data"]
+        print(f"{entry['id']}  {data['datetime']}  {data['bug_type']}  {data['styles_used_string']}")
+
+
+def export_reports(store, output_dir, report_ids=()):
+    entries = store.entries()
+    if report_ids:
+        entries = [entry for entry in entries if entry["id"] in report_ids]
+    for entry in entries:
+        url = export_stored_report(store, entry, os.path.join(output_dir, entry["id"]))
+        print(url)
+    return len(entries)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    store = BugStore(sys.argv[1])
+    if len(sys.argv) == 2:
+        list_reports(store)
+    else:
+        Config(parse_config(DEFAULT_CONFIG_FILE))
+        export_reports(store, sys.argv[2], sys.argv[3:])
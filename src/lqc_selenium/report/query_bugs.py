@@ -3,6 +3,8 @@ import sys
 import json
 import collections.abc
 
+from lqc.store.bug_store import iter_report_data
+
 DEFAULT_JSON_FILENAME = 'data.json'
 
 def collect_json_reports(bug_report_dir, json_filename):
@@ -12,6 +14,9 @@ def collect_json_reports(bug_report_dir, json_filename):
         if os.path.exists(json_filepath):
             with open(json_filepath, 'r') as f:
                 reports[json_filepath] = json.loads(f.read())
+    # Reports in bug stores are read from their index
+    for path, summary in iter_report_data(bug_report_dir):
+        reports[path] = summary
     return reports
 
 def get_matching_paths(reports):
@@ -2,18 +2,28 @@
 
 import argparse
 import sys
+import time
 import traceback
 from lqc.config.config import Config, parse_config
-from lqc.generate.html_file_generator import remove_file
+from lqc.generate.adaptive_weights import ADAPT_INTERVAL, AdaptiveWeights
+from lqc.generate.coverage import COVERAGE_UPDATE_INTERVAL, CoverageMap
+from lqc.generate.mutate import load_mutator
+from lqc.generate.pipeline import PreGenerator
+from lqc.generate.seed import new_seed
 from lqc.generate.style_log_generator import generate_run_subject
+from lqc.generate.web_page.html_body.create import use_fragment_cache
 from lqc.minify.minify_test_file import MinifyStepFactory
-from lqc.model.constants import BugType
+from lqc.model.constants import BugReportFormat, BugType, HarnessMode
+from lqc.util.batch_size_tuner import BatchSizeTuner
 from lqc.util.counter import Counter
 from lqc_selenium.report.bug_report_helper import save_bug_report
-from lqc_selenium.selenium_harness.layout_tester import test_combination
+from lqc_selenium.report.bug_report_writer import BugReportWriter
+from lqc_selenium.selenium_harness.layout_tester import test_batch, test_combination
 from lqc_selenium.variants.variant_tester import test_variants
 from lqc_selenium.variants.variants import TargetBrowser, getTargetVariant
 from lqc.rules.rule_engine import should_skip
+from lqc.rules.static_filter import is_layout_inert
+from lqc.store.bug_store import BugStore
 
 
 def minify(target_browser, run_subject):
@@ -29,20 +39,22 @@ def minify(target_browser, run_subject):
         return (run_subject, run_result, shouldSkip) 
 
     stepsFactory = MinifyStepFactory()
-    # Keep applying minimization steps until no more are available
-    while True:
-        # Get the next candidate minimized version of run_subject
-        proposed_run_subject = stepsFactory.next_minimization_step(run_subject)
-        # If there are no more steps, exit the loop
-        if proposed_run_subject is None:
-            # Break out when minimization can't shrink the subject further
-            break
-        
-        # Test the proposed minimized subject in the target browser
-        run_result, *_ = test_combination(target_browser.getDriver(), proposed_run_subject)
-        # If the minimized subject still triggers the bug, accept it as the new subject
-        if run_result.isBug():
-            run_subject = proposed_run_subject
+    # Candidates share the subtrees they don't change with run_subject (see MinifyStepFactory), so only their changed paths are rendered
+    with use_fragment_cache():
+        # Keep applying minimization steps until no more are available
+        while True:
+            # Get the next candidate minimized version of run_subject
+            proposed_run_subject = stepsFactory.next_minimization_step(run_subject)
+            # If there are no more steps, exit the loop
+            if proposed_run_subject is None:
+                # Break out when minimization can't shrink the subject further
+                break
+
+            # Test the proposed minimized subject in the target browser
+            run_result, *_ = test_combination(target_browser.getDriver(), proposed_run_subject)
+            # If the minimized subject still triggers the bug, accept it as the new subject
+            if run_result.isBug():
+                run_subject = proposed_run_subject
 
     # Create final representations of minified files
     run_result, _ = test_combination(target_browser.getDriver(), run_subject)
@@ -50,60 +62,164 @@ def minify(target_browser, run_subject):
     return (run_subject, run_result, shouldSkip)
 
 
-def find_bugs(counter):
+def update_coverage(coverage_map):
+    """ Save the coverage map and re-bias generation with it """
+    conf = Config()
+    coverage_map.save(conf.getCoverageFile())
+    conf.setCoverageMap(coverage_map)
 
-    target_browser = TargetBrowser()
 
-    while counter.should_continue():
+def update_weights(adaptive_weights, weights_file):
+    """ Re-sample the learned style weights and write them out """
+    conf = Config()
+    adaptive_weights.update(conf)
+    adaptive_weights.write_config(conf, weights_file)
+
+
+def next_test(pregenerator=None, mutator=None):
+    """ The next (run_subject, page) to test, page is None if it isn't rendered yet """
+    if mutator is not None and mutator.should_mutate():
+        return mutator.mutate(), None
+    elif pregenerator:
+        return pregenerator.get()
+    else:
+        return generate_run_subject(seed=new_seed()), None
+
+
+def next_batch(counter, batch_size, pregenerator=None, mutator=None, record=None):
+    """
+    The next batch of (run_subject, page) to test. Tests that can't find bugs are left out,
+    and recorded as passing tests with record(run_subject) (see record_test())
+    """
+    tests_left = counter.tests_left()
+    if tests_left is not None:
+        batch_size = min(batch_size, tests_left)
+
+    batch = []
+    while len(batch) < batch_size and counter.should_continue():
+        run_subject, page = next_test(pregenerator, mutator)
+
+        if Config().isStaticFilterEnabled() and is_layout_inert(run_subject):
+            # No modified style can affect layout, so the test would pass
+            counter.incPrefiltered()
+            if record is not None:
+                record(run_subject)
+            else:
+                counter.incTests()
+            if tests_left is not None:
+                batch_size -= 1
+            continue
 
-        # Stage 1 - Generate & Test
-        run_subject = generate_run_subject()
-        (run_result, test_filepath) = test_combination(target_browser.getDriver(), run_subject, keep_file=True)
+        batch.append((run_subject, page))
+    return batch
 
-        if not run_result.isBug():
-            counter.incSuccess()
 
-        else:
-            # Stage 2 - Minifying Bug
-            if run_result.type == BugType.PAGE_CRASH:
-                print("Found a page that crashes. Minifying...")
-            else:
-                print("Found bug. Minifying...")
+def find_bugs(counter, pregenerator=None, coverage_map=None, mutator=None, adaptive_weights=None, weights_file=None, report_writer=None):
+
+    target_browser = TargetBrowser()
 
-            (minified_run_subject, minified_run_result, shouldSkip) = minify(target_browser, run_subject)
-            print(f"Skip rule: {'skipped' if shouldSkip else 'not skipped'}")
+    # Run several tests per page load in the batch harness mode
+    batch_tuner = None
+    if Config().getHarnessMode() == HarnessMode.BATCH:
+        batch_tuner = BatchSizeTuner.from_config(Config())
 
-            # False Positive Detection
-            if not minified_run_result.isBug():
-                print("False positive (could not reproduce)")
-                counter.incNoRepro()
-            elif minified_run_result.type == BugType.LAYOUT and len(minified_run_subject.modified_styles.map) == 0:
-                print("False positive (no modified styles)")
-                counter.incNoMod()
+    def record_prefiltered(run_subject):
+        record_test(counter, run_subject, None, coverage_map, mutator, adaptive_weights, weights_file)
 
-            else:
-                counter.incError()
+    while counter.should_continue():
 
-                # Stage 3 - Test Variants
-                variants = test_variants(minified_run_subject)
+        # Stage 1 - Generate & Test
+        if batch_tuner is not None:
+            batch = next_batch(counter, batch_tuner.batch_size, pregenerator, mutator, record_prefiltered)
+            if not batch:
+                continue
+            start = time.perf_counter()
+            run_results = test_batch(target_browser.getDriver(), [run_subject for run_subject, _ in batch], [page for _, page in batch])
+            batch_tuner.record(len(batch), time.perf_counter() - start)
+        else:
+            batch = next_batch(counter, 1, pregenerator, mutator, record_prefiltered)
+            if not batch:
+                continue
+            run_subject, page = batch[0]
+            (run_result, _) = test_combination(target_browser.getDriver(), run_subject, page=page)
+            run_results = [run_result]
+
+        for (run_subject, _), run_result in zip(batch, run_results):
+            # Eg. the bug limit was reached by an earlier test of the batch
+            if not counter.should_continue():
+                break
+            check_result(counter, target_browser, run_subject, run_result, coverage_map, mutator, adaptive_weights, weights_file, report_writer)
+
+
+def check_result(counter, target_browser, run_subject, run_result, coverage_map=None, mutator=None, adaptive_weights=None, weights_file=None, report_writer=None):
+    """ Minify and report the bug a test found, if any, and record the test """
+
+    bug_subject = None
+    if not run_result.isBug():
+        counter.incSuccess()
+
+    else:
+        # Stage 2 - Minifying Bug
+        if run_result.type == BugType.PAGE_CRASH:
+            print("Found a page that crashes. Minifying...")
+        else:
+            print("Found bug. Minifying...")
 
-                url = save_bug_report(
-                    variants,
-                    minified_run_subject,
-                    minified_run_result,
-                    test_filepath,
-                    run_subject,
-                    shouldSkip
-                )
-                print(f"Bug report saved: {url}")
+        (minified_run_subject, minified_run_result, shouldSkip) = minify(target_browser, run_subject)
+        print(f"Skip rule: {'skipped' if shouldSkip else 'not skipped'}")
 
-        counter.incTests()
-        output = counter.getStatusString()
-        if output:
-            print(output)
+        # False Positive Detection
+        if not minified_run_result.isBug():
+            print("False positive (could not reproduce)")
+            counter.incNoRepro()
+        elif minified_run_result.type == BugType.LAYOUT and len(minified_run_subject.modified_styles.map) == 0:
+            print("False positive (no modified styles)")
+            counter.incNoMod()
 
-        # Clean Up
-        remove_file(test_filepath)
+        else:
+            counter.incError()
+
+            # Stage 3 - Test Variants
+            variants = test_variants(minified_run_subject)
+
+            # Write the report in the background if possible
+            save = report_writer.submit if report_writer is not None else save_bug_report
+            url = save(
+                variants,
+                minified_run_subject,
+                minified_run_result,
+                None,
+                run_subject,
+                shouldSkip
+            )
+            print(f"Bug report saved: {url}")
+            bug_subject = minified_run_subject
+            if mutator is not None:
+                mutator.add(minified_run_subject)
+
+    record_test(counter, run_subject, bug_subject, coverage_map, mutator, adaptive_weights, weights_file)
+
+
+def record_test(counter, run_subject, bug_subject=None, coverage_map=None, mutator=None, adaptive_weights=None, weights_file=None):
+    """ Count a test, record it in the coverage map and learned weights, and print the status. bug_subject - the minified bug it found, if any """
+    counter.incTests()
+    if coverage_map is not None:
+        new_tuples = coverage_map.record(run_subject)
+        if mutator is not None and new_tuples > 0:
+            mutator.add(run_subject)
+        if counter.num_tests % COVERAGE_UPDATE_INTERVAL == 0:
+            update_coverage(coverage_map)
+
+    if adaptive_weights is not None:
+        adaptive_weights.record(run_subject, bug_subject)
+        if counter.num_tests % ADAPT_INTERVAL == 0:
+            update_weights(adaptive_weights, weights_file)
+
+    output = counter.getStatusString()
+    if output:
+        if coverage_map is not None:
+            output += f"  Coverage: {coverage_map.num_covered()};"
+        print(output)
 
 
 DEFAULT_CONFIG_FILE = "./config/preset-default.config.json"
@@ -116,6 +232,9 @@ if __name__ == "__main__":
     parser.add_argument("-t", "--test-limit", help="quit after running this many tests", type=int, default=0)
     parser.add_argument("-l", "--crash-limit", help="quit after crashing this many times", type=int, default=1)
     parser.add_argument("-c", "--config-file", help="path to config file to use", type=str, default=DEFAULT_CONFIG_FILE)
+    parser.add_argument("-j", "--generator-processes", help="generate tests ahead of time in this many background processes (0 generates each test inline)", type=int, default=0)
+    parser.add_argument("--generator-queue-size", help="number of pre-generated tests to keep ready", type=int, default=16)
+    parser.add_argument("--learn-weights", metavar="OUTPUT_CONFIG", help="adapt the style weights to the bugs found, and periodically write the learned config to this file", type=str, default=None)
     args = parser.parse_args()
 
     # Initialize Config
@@ -127,19 +246,59 @@ if __name__ == "__main__":
     target_variant = getTargetVariant()
     print(f"Using target variant \"{target_variant}\"")
 
+    if Config().getHarnessMode() != HarnessMode.FILE:
+        print(f"Using harness mode \"{Config().getHarnessMode().value}\"")
+
     counter = Counter(bug_limit=args.bug_limit, test_limit=args.test_limit, crash_limit=args.crash_limit)
 
-    while counter.should_continue():
-        try:
-            find_bugs(counter)
-        except Exception:
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            exc = {
-                "etype": exc_type,
-                "value": exc_value,
-                "traceback": exc_traceback,
-            }
-            counter.incCrash(exc=exc)
+    coverage_map = None
+    if Config().getCoverageFile():
+        coverage_map = CoverageMap.load(Config().getCoverageFile())
+        Config().setCoverageMap(coverage_map)
+        print(f"Using coverage file {Config().getCoverageFile()} ({coverage_map.num_covered()} combinations covered)")
+
+    adaptive_weights = None
+    if args.learn_weights:
+        adaptive_weights = AdaptiveWeights.from_config(Config())
+        print(f"Learning style weights, writing them to {args.learn_weights}")
+
+    mutator = load_mutator()
+    if mutator is not None:
+        print(f"Mutating {mutator.rate:.0%} of tests ({len(mutator.corpus)} seed subjects)")
+
+    pregenerator = None
+    if args.generator_processes > 0:
+        print(f"Generating tests in {args.generator_processes} background processes")
+        pregenerator = PreGenerator(num_workers=args.generator_processes, queue_size=args.generator_queue_size, weights_file=args.learn_weights).start()
+
+    bug_store = None
+    if Config().getBugReportFormat() == BugReportFormat.STORE:
+        bug_store = BugStore(Config().getBugStoreDirectory())
+        print(f"Storing bug reports in {bug_store.path}")
+    report_writer = BugReportWriter(store=bug_store).start()
+
+    try:
+        while counter.should_continue():
+            try:
+                find_bugs(counter, pregenerator, coverage_map, mutator, adaptive_weights, args.learn_weights, report_writer)
+            except Exception:
+                exc_type, exc_value, exc_traceback = sys.exc_info()
+                exc = {
+                    "etype": exc_type,
+                    "value": exc_value,
+                    "traceback": exc_traceback,
+                }
+                counter.incCrash(exc=exc)
+    finally:
+        if pregenerator:
+            pregenerator.close()
+        report_writer.close()
+        for bug_folder, error in report_writer.failures:
+            print(f"Failed to write bug report {bug_folder}:\n{error}")
+        if coverage_map is not None:
+            update_coverage(coverage_map)
+        if adaptive_weights is not None:
+            adaptive_weights.write_config(Config(), args.learn_weights)
 
     if counter.num_crash > 0:
         print(f"Number of crashes: {counter.num_crash}\nCrash Errors:\n")
@@ -0,0 +1,93 @@
+""" Batch harness page
+
+Runs several test pages with one WebDriver call: a webdriver loads the batch
+harness page (see batch.js) once, and each batch of pages is passed to
+runBatch(), which loads every page in its own iframe, runs checkForBug() in
+each, and returns all the results together. The navigation and WebDriver
+round-trips are paid once per batch instead of once per test.
+
+A batch that crashes the page has no results, the caller is expected to run
+its tests one by one (see layout_tester.test_batch).
+"""
+
+import weakref
+
+from lqc.generate.web_page.create import batch_html_string, html_string
+from lqc.generate.workspace import get_workspace
+from lqc.model.run_result import RunResultCrash, RunResultLayoutBug, RunResultPass
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+BATCH_FILE_NAME = "batch.html"
+
+# Calls back null instead of running the batch if the page isn't the batch harness page (eg. after a navigation)
+RUN_BATCH_SCRIPT = """
+const done = arguments[arguments.length - 1];
+if (typeof runBatch !== 'function') {
+    done(null);
+    return;
+}
+runBatch(arguments[0], done);
+"""
+
+
+def _run_result(result):
+    if "error" in result:
+        print("Outcome: ERROR")
+        print(f"Error running test in batch: {result['error']}")
+        return RunResultCrash()
+    if result["diffs"] and len(result["diffs"]) > 0:
+        return RunResultLayoutBug(result["diffs"])
+    return RunResultPass()
+
+
+class BatchHarness():
+
+    def __init__(self, webdriver):
+        self.webdriver = webdriver
+        self.batch_url = None
+        self.loaded = False
+
+    def load(self):
+        if self.batch_url is None:
+            _, self.batch_url = get_workspace().write_page(batch_html_string(), file_name=BATCH_FILE_NAME)
+        self.webdriver.get(self.batch_url)
+        self.loaded = True
+
+    def run(self, run_subjects, pages=None):
+        """
+        Run a batch of subjects. pages - their rendered pages, or None for those not rendered yet.
+        Returns a RunResult per subject, or None if the batch crashed
+        """
+        if pages is None:
+            pages = [None] * len(run_subjects)
+        pages = [page if page is not None else html_string(run_subject) for run_subject, page in zip(run_subjects, pages)]
+
+        try:
+            if not self.loaded:
+                self.load()
+            results = self.webdriver.execute_async_script(RUN_BATCH_SCRIPT, pages)
+            if results is None:
+                # The webdriver was navigated away from the batch harness page
+                self.load()
+                results = self.webdriver.execute_async_script(RUN_BATCH_SCRIPT, pages)
+            return [_run_result(result) for result in results]
+
+        except TimeoutException:
+            self.loaded = False
+            print(f"Batch of {len(run_subjects)} tests timed out")
+            return None
+        except WebDriverException as e:
+            self.loaded = False
+            print(f"Batch of {len(run_subjects)} tests crashed: {e}")
+            return None
+
+
+_harnesses = weakref.WeakKeyDictionary()
+
+
+def get_batch_harness(webdriver) -> BatchHarness:
+    """ The batch harness of a webdriver, a new webdriver gets a new harness """
+    harness = _harnesses.get(webdriver)
+    if harness is None:
+        harness = _harnesses[webdriver] = BatchHarness(webdriver)
+    return harness
@@ -1,7 +1,13 @@
-from lqc.generate.html_file_generator import remove_file
+from lqc.config.config import Config
+from lqc.generate.web_page.create import html_bytes
 from lqc.generate.web_page.run_subject_converter import saveTestSubjectAsWebPage
+from lqc.generate.workspace import get_workspace
+from lqc.model.constants import HarnessMode, PageProfile
 from lqc.model.run_result import RunResult, RunResultCrash, RunResultLayoutBug, RunResultPass
 from lqc.model.run_subject import RunSubject
+from lqc_selenium.selenium_harness.batch_harness import get_batch_harness
+from lqc_selenium.selenium_harness.page_server import get_page_server
+from lqc_selenium.selenium_harness.persistent_harness import get_harness
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
@@ -9,18 +15,40 @@ from selenium.webdriver.support import expected_conditions as EC
 import time
 
 
-# Returns (differencesIsNone, differencesList, fileName)
-# @param keep_file - keep the intermediate file, the caller is responsible for cleanup
-def test_combination(webdriver, run_subject: RunSubject, slow=False, keep_file=False):
-    test_filepath, test_url = saveTestSubjectAsWebPage(run_subject)
+# Returns (run_result, fileName)
+# @param keep_file - keep the intermediate file, the caller is responsible for cleanup.
+#                    Otherwise the file is overwritten by the next test (see lqc.generate.workspace)
+# @param page - the test page, if it was already rendered (see lqc.generate.pipeline).
+#                In the persistent harness mode, only the body is rendered ahead of time
+def test_combination(webdriver, run_subject: RunSubject, slow=False, keep_file=False, page=None):
+    harness_mode = Config().getHarnessMode()
+    if harness_mode == HarnessMode.PERSISTENT and not keep_file and not slow:
+        # Inject the test into the harness page, the page is only the body in this mode
+        return get_harness(webdriver).run(run_subject, body=page), None
+
+    if harness_mode == HarnessMode.HTTP and not keep_file:
+        # Serve the page from memory
+        test_filepath, test_url = None, get_page_server().add_page(page if page is not None else html_bytes(run_subject, profile=PageProfile.SERVED))
+    else:
+        test_filepath, test_url = saveTestSubjectAsWebPage(run_subject, page=page)
 
     run_result = run_test_using_js_diff_detect(test_url, webdriver, slow=slow)
     
     if not keep_file:
-        remove_file(test_filepath)
         return run_result, None
     else:
-        return run_result, test_filepath
+        return run_result, get_workspace().keep(test_filepath)
+
+
+# Returns a run_result per subject
+# @param pages - the test pages of the subjects, if they were already rendered
+def test_batch(webdriver, run_subjects, pages=None):
+    run_results = get_batch_harness(webdriver).run(run_subjects, pages)
+    if run_results is None:
+        # Find the test that crashed the batch by running the tests one by one
+        pages = pages or [None] * len(run_subjects)
+        run_results = [test_combination(webdriver, run_subject, page=page)[0] for run_subject, page in zip(run_subjects, pages)]
+    return run_results
 
 
 def run_test_using_js_diff_detect(test_url, webdriver, slow=False) -> RunResult:
@@ -0,0 +1,123 @@
+""" Local HTTP server for test pages
+
+Test pages are held in memory and served from http://127.0.0.1:<port>/t/<id>,
+instead of being written to files. The server speaks HTTP/1.1, so the
+browser keeps its connection open between tests, and serves the JS files
+(see assets.py) with caching headers. Test pages in this mode load
+detection.js from /detection.js (see PageProfile.SERVED) instead of inlining
+it, so the browser only loads and compiles it once.
+
+Only the last MAX_PAGES pages are kept.
+"""
+
+import atexit
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lqc.generate.web_page.assets import registry
+
+MAX_PAGES = 8
+PAGE_PATH = "/t/"
+ASSET_MAX_AGE = 24 * 60 * 60
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server.page_server
+        path = self.path.split("?", 1)[0]
+        page = server.get_page(path[len(PAGE_PATH):]) if path.startswith(PAGE_PATH) else None
+        if page is not None:
+            data = page
+            headers = {"Content-Type": "text/html; charset=utf-8", "Cache-Control": "no-store"}
+        else:
+            # Assets are found from any directory, eg. /detection.js or /t/detection.js (relative to a page)
+            data, headers = self._asset(path.rsplit("/", 1)[-1])
+
+        if data is None:
+            self.send_error(404)
+            return
+        if "ETag" in headers and self.headers.get("If-None-Match") == headers["ETag"]:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _asset(self, name):
+        if name not in registry.paths:
+            return None, {}
+        asset = registry.get(name)
+        return asset.data, {
+            "Content-Type": "text/javascript; charset=utf-8",
+            "Cache-Control": f"max-age={ASSET_MAX_AGE}",
+            "ETag": f'"{asset.sha256}"',
+        }
+
+    def log_message(self, format, *args):
+        # Don't log every request
+        pass
+
+
+class PageServer():
+
+    def __init__(self, host="127.0.0.1", port=0, max_pages=MAX_PAGES):
+        self.max_pages = max_pages
+        self.pages = OrderedDict()
+        self.next_id = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.page_server = self
+        self.host, self.port = self.httpd.server_address[:2]
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="PageServer", daemon=True)
+        self.thread.start()
+        return self
+
+    def url(self, path):
+        return f"http://{self.host}:{self.port}/{path.lstrip('/')}"
+
+    def add_page(self, page):
+        """ Serve a page (str or bytes), returns its url """
+        if isinstance(page, str):
+            page = page.encode("utf-8")
+        with self.lock:
+            page_id = str(self.next_id)
+            self.next_id += 1
+            self.pages[page_id] = page
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        return self.url(PAGE_PATH + page_id)
+
+    def get_page(self, page_id):
+        with self.lock:
+            return self.pages.get(page_id)
+
+    def close(self):
+        if self.thread is not None:
+            self.httpd.shutdown()
+            self.thread = None
+        self.httpd.server_close()
+
+
+_page_server = None
+
+
+def get_page_server() -> PageServer:
+    """ The page server of this process, started on first use """
+    global _page_server
+    if _page_server is None:
+        _page_server = PageServer().start()
+        atexit.register(_page_server.close)
+    return _page_server
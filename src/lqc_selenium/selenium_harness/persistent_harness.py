@@ -0,0 +1,92 @@
+""" Persistent harness page
+
+Instead of loading a page per test, a webdriver loads the harness page (see
+harness.js) once, and each test is run with a single execute_script() call
+that passes the test's body and style changes to runTest(). This saves the
+navigation, the parsing of the scripts and the WebDriver round-trips of
+waiting for the page to load.
+
+The harness page is reloaded every Config().getHarnessReloadInterval()
+tests, so state leaking from test to test can't build up, and after a test
+crashes or times out.
+"""
+
+import weakref
+
+from lqc.config.config import Config
+from lqc.generate.web_page.create import harness_html_string
+from lqc.generate.web_page.html_body.create import create as html_body
+from lqc.generate.workspace import get_workspace
+from lqc.model.run_result import RunResult, RunResultCrash, RunResultLayoutBug, RunResultPass
+from lqc.model.run_subject import RunSubject
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+HARNESS_FILE_NAME = "harness.html"
+
+# Returns null instead of running the test if the page isn't the harness page (eg. after a navigation)
+RUN_TEST_SCRIPT = "return typeof runTest === 'function' ? runTest(arguments[0], arguments[1]) : null"
+
+
+class PersistentHarness():
+
+    def __init__(self, webdriver, reload_interval=None):
+        self.webdriver = webdriver
+        self.reload_interval = reload_interval or Config().getHarnessReloadInterval()
+        self.harness_url = None
+        self.num_tests = 0  # Tests run since the harness page was loaded
+        self.loaded = False
+
+    def load(self):
+        if self.harness_url is None:
+            _, self.harness_url = get_workspace().write_page(harness_html_string(), file_name=HARNESS_FILE_NAME)
+        self.webdriver.get(self.harness_url)
+        self.num_tests = 0
+        self.loaded = True
+
+    def run(self, run_subject: RunSubject, body=None) -> RunResult:
+        """ Run a test in the harness page. body - the rendered body of the subject, if it was already rendered """
+        if body is None:
+            body = html_body(run_subject)
+
+        try:
+            if not self.loaded or self.num_tests >= self.reload_interval:
+                self.load()
+            self.num_tests += 1
+            results = self.webdriver.execute_script(RUN_TEST_SCRIPT, body, run_subject.modified_styles.map)
+            if results is None:
+                # The webdriver was navigated away from the harness page
+                self.load()
+                self.num_tests += 1
+                results = self.webdriver.execute_script(RUN_TEST_SCRIPT, body, run_subject.modified_styles.map)
+
+            if results and len(results) > 0:
+                return RunResultLayoutBug(results)
+            else:
+                return RunResultPass()
+
+        except TimeoutException:
+            self.loaded = False
+            print("Outcome: TIMEOUT")
+            print("Failed to run test in the harness page due to timeout")
+            return None
+        except WebDriverException as e:
+            self.loaded = False
+            print("Outcome: CRASH")
+            print(f"WebDriverException: {e}")
+            return RunResultCrash()
+        except Exception as e:
+            self.loaded = False
+            print("Outcome: ERROR")
+            print(f"Unhandled exception: {e}")
+            raise
+
+
+_harnesses = weakref.WeakKeyDictionary()
+
+
+def get_harness(webdriver) -> PersistentHarness:
+    """ The harness of a webdriver, a new webdriver gets a new harness """
+    harness = _harnesses.get(webdriver)
+    if harness is None:
+        harness = _harnesses[webdriver] = PersistentHarness(webdriver)
+    return harness
@@ -0,0 +1,151 @@
+"""
+Benchmarks the relayout strategies of checkForBug() (see detection.js) in the
+target browser, to pick the cheapest one that still catches the bugs.
+
+Every subject of a corpus of known bugs (the minified subjects of the bug
+reports and bug stores under CORPUS_DIR), and of some generated subjects, is
+tested with each strategy. For each strategy, it reports:
+
+- the time checkForBug() takes per test, as measured in the page
+- the number of known bugs it detects
+- the number of generated subjects it reports a bug for
+- how often its verdict agrees with the innerhtml strategy (the reference)
+
+Pages are loaded one per test (as in the "file" harness mode), whatever the
+config says, so every test runs with the strategy being measured.
+
+Usage
+-----
+python src/tooling/scripts/bench_relayout.py ./bug_reports -c ./config/preset-default.config.json --generated 200
+
+Arguments
+---------
+CORPUS_DIR
+    Directory searched for known bugs (minified_run_subject.pkl files, and bug stores).
+
+-c, --config-file
+    Config file, for the target browser and generation. Defaults to ./config/preset-default.config.json.
+
+--generated
+    Number of generated subjects to test besides the known bugs (default 100).
+
+--limit
+    Most known bugs to load (default 0, all of them).
+
+--strategies
+    Strategies to compare (default all of them).
+"""
+
+import argparse
+import os
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from lqc.config.config import Config, parse_config
+from lqc.generate.style_log_generator import generate_run_subject
+from lqc.generate.web_page.run_subject_converter import saveTestSubjectAsWebPage
+from lqc.model.constants import RelayoutStrategy
+from lqc.store.bug_store import iter_pickles
+from lqc_selenium.variants.variants import TargetBrowser
+from selenium.common.exceptions import WebDriverException
+
+DEFAULT_CONFIG_FILE = "./config/preset-default.config.json"
+
+# Times checkForBug() in the page, returns [milliseconds, differences]
+CHECK_SCRIPT = "const start = performance.now(); const diffs = checkForBug(); return [performance.now() - start, diffs];"
+
+
+def load_corpus(root, limit=0):
+    """ The minified subjects of the known bugs under root """
+    subjects = []
+    for _, _, load in iter_pickles(root, lambda name: name == "minified_run_subject.pkl"):
+        subjects.append(load())
+        if limit and len(subjects) >= limit:
+            break
+    return subjects
+
+
+def check(webdriver, run_subject):
+    """ Returns (milliseconds, found a bug), or (None, None) if the page crashed """
+    _, test_url = saveTestSubjectAsWebPage(run_subject)
+    try:
+        webdriver.get(test_url)
+        milliseconds, diffs = webdriver.execute_script(CHECK_SCRIPT)
+    except WebDriverException as e:
+        print(f"WebDriverException: {e}")
+        return None, None
+    return milliseconds, bool(diffs)
+
+
+def use_strategy(config_dict, strategy):
+    """ Configure the pages rendered from now on to use a relayout strategy """
+    Config({
+        **config_dict,
+        "detection": {**config_dict.get("detection", {}), "relayout": strategy.value},
+        "harness": {"mode": "file"},
+    })
+
+
+def bench_strategy(webdriver, known_bugs, generated):
+    """ Returns (total milliseconds, verdicts on known_bugs, verdicts on generated, crashes) """
+    total_milliseconds = 0
+    crashes = 0
+    verdicts = []
+    for run_subject in known_bugs + generated:
+        milliseconds, found_bug = check(webdriver, run_subject)
+        if milliseconds is None:
+            crashes += 1
+        else:
+            total_milliseconds += milliseconds
+        verdicts.append(found_bug)
+    return total_milliseconds, verdicts[:len(known_bugs)], verdicts[len(known_bugs):], crashes
+
+
+def agreement(verdicts, reference):
+    if not verdicts:
+        return 1.0
+    return sum(verdict == expected for verdict, expected in zip(verdicts, reference)) / len(verdicts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark the relayout strategies of checkForBug()")
+    parser.add_argument("corpus_dir", metavar="CORPUS_DIR")
+    parser.add_argument("-c", "--config-file", type=str, default=DEFAULT_CONFIG_FILE)
+    parser.add_argument("--generated", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--strategies", nargs="+", choices=[strategy.value for strategy in RelayoutStrategy], default=[strategy.value for strategy in RelayoutStrategy])
+    args = parser.parse_args()
+
+    config_dict = parse_config(args.config_file)
+    Config(config_dict)
+    known_bugs = load_corpus(args.corpus_dir, args.limit)
+    generated = [generate_run_subject(seed=seed) for seed in range(args.generated)]
+    print(f"Testing {len(known_bugs)} known bugs and {len(generated)} generated subjects")
+
+    strategies = [RelayoutStrategy(value) for value in args.strategies]
+    # The reference goes first
+    if RelayoutStrategy.INNERHTML in strategies:
+        strategies.remove(RelayoutStrategy.INNERHTML)
+    strategies.insert(0, RelayoutStrategy.INNERHTML)
+
+    webdriver = TargetBrowser().getDriver()
+    num_tests = len(known_bugs) + len(generated)
+    reference = None
+    print(f"{'strategy':>15} {'ms/test':>8} {'known bugs':>11} {'generated':>10} {'agreement':>10} {'crashes':>8}")
+    for strategy in strategies:
+        use_strategy(config_dict, strategy)
+        total_milliseconds, known_verdicts, generated_verdicts, crashes = bench_strategy(webdriver, known_bugs, generated)
+        verdicts = known_verdicts + generated_verdicts
+        if reference is None:
+            reference = verdicts
+        milliseconds = total_milliseconds / max(1, num_tests - crashes)
+        detected = f"{sum(bool(verdict) for verdict in known_verdicts)}/{len(known_verdicts)}"
+        flagged = f"{sum(bool(verdict) for verdict in generated_verdicts)}/{len(generated_verdicts)}"
+        print(f"{strategy.value:>15} {milliseconds:>8.2f} {detected:>11} {flagged:>10} {agreement(verdicts, reference):>9.0%} {crashes:>8}")
+
+
+if __name__ == "__main__":
+    main()
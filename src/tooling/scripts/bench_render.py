@@ -0,0 +1,188 @@
+"""
+Benchmarks rendering test pages, against the previous (reduce + formatWithIndent) renderer.
+
+Subjects of growing size are generated, and each is rendered with both
+renderers. The outputs are checked to be identical.
+
+With --minify, the bodies of a subject's minimization candidates are rendered
+instead, with and without the fragment cache used while minimizing.
+
+Usage
+-----
+python src/tooling/scripts/bench_render.py --sizes 10 100 1000 --repeat 5
+
+Arguments
+---------
+--sizes
+    Approximate number of elements of the subjects to render.
+
+--repeat
+    Number of times each subject is rendered. The fastest time is reported.
+
+--minify
+    Number of minimization candidates to render per subject.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from functools import reduce
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from lqc.config.config import Config
+from lqc.generate.style_log_generator import generate_layout_tree, generate_style_log
+from lqc.generate.web_page.create import html_string, html_template
+from lqc.generate.web_page.html_body.create import create as html_body, use_fragment_cache
+from lqc.generate.web_page.javascript.create import create as js_minimal
+from lqc.minify.minify_test_file import MinifyStepFactory
+from lqc.model.constants import PageProfile, StyleChangeFormat
+from lqc.model.element_tree import ElementTree
+from lqc.model.run_subject import RunSubject
+from lqc.model.style_map import StyleMap
+
+
+# The previous renderer (reduce + formatWithIndent), to compare with
+
+def reference_format_with_indent(s, **kwargs):
+    key_indents = {}
+    for l in s.split("\n"):
+        match = re.search(r'(\s*){(.*)}', l)
+        if match:
+            key_indents[match.group(2)] = match.group(1)
+    for kw, val in kwargs.items():
+        if kw in key_indents:
+            kwargs[kw] = val.replace('\n', '\n' + key_indents[kw])
+    return s.format(**kwargs)
+
+
+reference_element_template = """
+<{tag} style="{style}" {attributes_string} id="{element_id}">
+  {children_string}
+</{tag}>
+"""
+
+
+def reference_html_body(run_subject):
+    styles = run_subject.base_styles.map
+
+    def generate_element_string(body_string, element):
+        if element["tag"] == "<text>":
+            return body_string + element["value"]
+        style = ";".join([f"{name}:{value}" for name, value in styles.get(element.get("id", ""), {}).items()])
+        attributes_string = " ".join(
+            f"{name}='{value}'" for name, value in element.get("attributes", {}).items() if name in ["onclick"]
+        )
+        return body_string + reference_format_with_indent(reference_element_template,
+            tag=element["tag"],
+            style=style,
+            element_id=element.get("id", ""),
+            attributes_string=attributes_string,
+            children_string=reduce(generate_element_string, element["children"], ""),
+        )
+
+    return reduce(generate_element_string, run_subject.html_tree.tree, "")
+
+
+def reference_html_string(run_subject):
+    return reference_format_with_indent(html_template,
+        js_string=js_minimal(run_subject, None),
+        body_string=reference_html_body(run_subject),
+        extra_js_files_string="",
+    )
+
+
+
+def make_subject(num_elements, seed):
+    """ Generate a subject with at least num_elements elements, by joining generated trees """
+    random.seed(seed)
+    body = []
+    num_trees = 0
+    while len(ElementTree(body).getElementIds()) < num_elements:
+        tree = ElementTree(generate_layout_tree())
+        # Keep ids unique across the joined trees
+        for element_id in tree.getElementIds():
+            tree.renameId(element_id, f"{element_id}{num_trees}")
+        body.extend(tree.tree)
+        num_trees += 1
+    return RunSubject(ElementTree(body), StyleMap(generate_style_log(body)), StyleMap(generate_style_log(body)))
+
+
+def best_time(render, run_subject, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(run_subject)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def render_statements(run_subject):
+    # The previous renderer only rendered full pages
+    return html_string(run_subject, style_change_format=StyleChangeFormat.STATEMENTS, profile=PageProfile.FULL)
+
+
+def minimization_candidates(run_subject, count):
+    """ The first count minimization candidates of a subject, accepting every other one """
+    candidates = []
+    steps = MinifyStepFactory()
+    while len(candidates) < count:
+        proposed_run_subject = steps.next_minimization_step(run_subject)
+        if proposed_run_subject is None:
+            break
+        candidates.append(proposed_run_subject)
+        if len(candidates) % 2 == 0:
+            run_subject = proposed_run_subject
+    return candidates
+
+
+def render_candidates(candidates):
+    return [html_body(candidate) for candidate in candidates]
+
+
+def render_candidates_cached(candidates):
+    with use_fragment_cache():
+        return [html_body(candidate) for candidate in candidates]
+
+
+def bench_minify(sizes, count, repeat):
+    print(f"{'elements':>10} {'candidates':>10} {'uncached (ms)':>14} {'cached (ms)':>12} {'speedup':>8}")
+    for size in sizes:
+        run_subject = make_subject(size, seed=size)
+        candidates = minimization_candidates(run_subject, count)
+        assert render_candidates(candidates) == render_candidates_cached(candidates), "Renderers disagree"
+        uncached = best_time(render_candidates, candidates, repeat)
+        cached = best_time(render_candidates_cached, candidates, repeat)
+        num_elements = len(run_subject.html_tree.getElementIds())
+        print(f"{num_elements:>10} {len(candidates):>10} {uncached * 1000:>14.2f} {cached * 1000:>12.2f} {uncached / cached:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark test page rendering")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--minify", type=int, default=0)
+    args = parser.parse_args()
+
+    Config({})
+    if args.minify:
+        bench_minify(args.sizes, args.minify, args.repeat)
+        return
+
+    print(f"{'elements':>10} {'previous (ms)':>14} {'current (ms)':>13} {'speedup':>8}")
+    for size in args.sizes:
+        run_subject = make_subject(size, seed=size)
+        assert render_statements(run_subject) == reference_html_string(run_subject), "Renderers disagree"
+        previous = best_time(reference_html_string, run_subject, args.repeat)
+        current = best_time(render_statements, run_subject, args.repeat)
+        num_elements = len(run_subject.html_tree.getElementIds())
+        print(f"{num_elements:>10} {previous * 1000:>14.2f} {current * 1000:>13.2f} {previous / current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
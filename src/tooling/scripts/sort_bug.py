@@ -15,7 +15,7 @@ python src/tooling/scripts/sort_bug.py --pickles-dir <dir> --pickle-name <name>
 Arguments
 ---------
 --pickles-dir
-    Root directory scanned recursively for input pickles.
+    Root directory scanned recursively for input pickles, including the subjects in bug stores (see lqc/store).
 --pickle-name
     Exact filename to process (for example, run_subject.pkl).
 --safe-dir
@@ -47,6 +47,7 @@ if SRC_DIR not in sys.path:
 from lqc.rules.tree_merge import run_subject_to_node_tree, merge_trees, walk_tree_verbose
 from lqc.rules.rule_engine import check_all_pkls, create_rule, extract_tag_tree, get_base_styles, get_modified_styles
 from lqc.generate.web_page.create import save_as_web_page
+from lqc.store.bug_store import iter_pickles
 
 
 def now_stamp():
@@ -75,14 +76,13 @@ def check_all_pkls_quiet(folder_path, rules):
 
 
 def minified_pkls(roots, pickle_name):
-    paths = []
+    """ Yield (path, load) for the pickles named pickle_name, including the subjects in bug stores """
+    pickles = []
     for root in roots:
-        for dirpath, dirnames, filenames in os.walk(root):
-            for name in filenames:
-                if name == pickle_name:
-                    paths.append(os.path.join(dirpath, name))
-    random.shuffle(paths)
-    for p in paths:
+        for path, _, load in iter_pickles(root, lambda name: name == pickle_name):
+            pickles.append((path, load))
+    random.shuffle(pickles)
+    for p in pickles:
         yield p
 
 
@@ -236,14 +236,13 @@ def run_sort(pickles_dir, pickle_name, safe_dir, output_dir_name):
     added_existing_count = 0
     promoted_count = 0
     unknown_count = 0
-    for i, p in enumerate(gen, start=1):
+    for i, (p, load) in enumerate(gen, start=1):
         processed_count += 1
         known_dir = os.path.join(output_dir_path, "known-bugs")
 
         print(f"\n[{i}] processing {os.path.relpath(p, pickles_dir)}")
 
-        with open(p, "rb") as f:
-            run_subject = pickle.load(f)
+        run_subject = load()
 
         tree, startnode = run_subject_to_node_tree(run_subject)
         added_to_known = False
@@ -1,13 +1,32 @@
 from flask import Flask, request, abort
 from flask.helpers import send_from_directory
 import os
+import sys
 import json
+import tempfile
+import threading
 import argparse
 
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from lqc.config.config import Config, parse_config
+from lqc.store.bug_store import BugStore
+from lqc_selenium.report.bug_report_helper import export_stored_report
+
 BUG_REPORT_DIR = '../../bug_reports'
 STATIC_FILES_DIR = '../ui/build'
 JSON_FILENAME = 'data.json'
 DEMO_FILENAME = 'minified_bug.html'
+DEFAULT_CONFIG_FILE = '../../config/preset-default.config.json'
+
+# Reports in the bug store (see lqc/store) have ids "store/<report id>".
+# They have no files, their pages are rendered in STORE_EXPORT_DIR the first time they are requested
+STORE_PREFIX = 'store/'
+STORE_DIR = os.path.join(BUG_REPORT_DIR, 'store')
+STORE_EXPORT_DIR = os.path.join(tempfile.gettempdir(), 'lqc_web_store')
+export_lock = threading.Lock()
 # MINIMIZED_FILENAME = 'minimized_bug.html'
 
 app = Flask(__name__, static_folder=os.path.join(STATIC_FILES_DIR, "static"))
@@ -26,19 +45,40 @@ def indexFile(p = "index.html"):
 # https://stackoverflow.com/questions/20646822/how-to-serve-static-files-in-flask
 @app.route('/api/bug_file/<path:path>')
 def bugFile(path):
-    return send_from_directory(BUG_REPORT_DIR, path)
+    return send_from_directory(*bugFileLocation(path))
 
 # Download the bug files
 @app.route('/api/download/bug_file/<path:path>')
 def bugFileDownload(path):
-    return send_from_directory(BUG_REPORT_DIR, path, as_attachment=True)
+    return send_from_directory(*bugFileLocation(path), as_attachment=True)
+
+def bugFileLocation(path):
+    """
+    The (directory, path) of a bug file. The files of stored reports are
+    rendered on first request
+    """
+    if not path.startswith(STORE_PREFIX):
+        return BUG_REPORT_DIR, path
+    report_id = path[len(STORE_PREFIX):].split('/')[0]
+    bug_folder = os.path.join(STORE_EXPORT_DIR, report_id)
+    with export_lock:
+        if not os.path.exists(os.path.join(bug_folder, JSON_FILENAME)):
+            entry = storedEntries().get(report_id)
+            if entry is None:
+                abort(404)
+            export_stored_report(BugStore(STORE_DIR), entry, bug_folder)
+    return STORE_EXPORT_DIR, path[len(STORE_PREFIX):]
+
+def storedEntries():
+    """ The index entries of the reports in the bug store, by report id """
+    return {entry['id']: entry for entry in BugStore(STORE_DIR).entries()}
 
 @app.route('/api/bugs')
 def allBugs():
     """
     Open the folder with all the bugs
-    Get one bug report per sub-folder
-    Send back data.json
+    Get one bug report per sub-folder, and one per report in the bug store
+    Send back data.json (the index summary for stored reports)
     """
     reports = []
     bug_dirs = os.listdir(BUG_REPORT_DIR)
@@ -48,8 +88,12 @@ def allBugs():
         if bug:
             reports.append(bug)
         if len(reports) >= 100: # Quit Early (for testing only)
-            return json.dumps(reports)
-    return json.dumps(reports)
+            break
+    for report_id, entry in storedEntries().items():
+        reports.append(prepareBug(dict(entry['data']), STORE_PREFIX + report_id))
+    # Sort by date with most recent at the top
+    reports.sort(key=lambda bug: bug.get('datetime', ''), reverse=True)
+    return json.dumps(reports[:100])
 
 @app.route('/api/bug/<path:path>')
 def oneBug(path):
@@ -66,32 +110,44 @@ def bugJson(bug_dir):
     """
     Get the json from a bug report and prepare it for the UI
     """
+    if bug_dir.startswith(STORE_PREFIX):
+        entry = storedEntries().get(bug_dir[len(STORE_PREFIX):])
+        return prepareBug(dict(entry['data']), bug_dir) if entry else None
+
     json_filepath = os.path.join(BUG_REPORT_DIR, bug_dir, JSON_FILENAME) 
 
     if not os.path.exists(json_filepath):
         return None
 
     with open(json_filepath, 'r') as f:
-        bug = json.loads(f.read())
-        server = request.base_url.split("/api")[0]
-
-        # Add urls to demo pages
-        bug['demo_urls'] = {
-            "dirty": f"{server}/api/bug_file/{bug_dir}/{DEMO_FILENAME}?state=dirty",
-            "reloaded": f"{server}/api/bug_file/{bug_dir}/{DEMO_FILENAME}?state=reloaded",
-        }
-        bug['download_urls'] = {
-            "full": f"{server}/api/download/bug_file/{bug_dir}/{DEMO_FILENAME}",
-            # "minimized": f"{server}/api/download/bug_file/{bug_dir}/{MINIMIZED_FILENAME}",
-        }
-        bug['id'] = bug_dir
-        return bug
+        return prepareBug(json.loads(f.read()), bug_dir)
+
+def prepareBug(bug, bug_dir):
+    """
+    Add the urls of a bug's pages, bug_dir is its id
+    """
+    server = request.base_url.split("/api")[0]
+
+    # Add urls to demo pages
+    bug['demo_urls'] = {
+        "dirty": f"{server}/api/bug_file/{bug_dir}/{DEMO_FILENAME}?state=dirty",
+        "reloaded": f"{server}/api/bug_file/{bug_dir}/{DEMO_FILENAME}?state=reloaded",
+    }
+    bug['download_urls'] = {
+        "full": f"{server}/api/download/bug_file/{bug_dir}/{DEMO_FILENAME}",
+        # "minimized": f"{server}/api/download/bug_file/{bug_dir}/{MINIMIZED_FILENAME}",
+    }
+    bug['id'] = bug_dir
+    return bug
 
 if __name__ == '__main__':
 
     parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter, description="Run the UI server")
     parser.add_argument("-p", "--port", help="Run the server on a different port", type=int, default=5000)
     parser.add_argument("--public", help="Run the server on a different port", action="store_true")
+    parser.add_argument("-c", "--config-file", help="config file the pages of stored bug reports are rendered with", type=str, default=DEFAULT_CONFIG_FILE)
     args = parser.parse_args()
 
+    Config(parse_config(args.config_file))
+
     app.run(port=args.port, host=("0.0.0.0" if args.public else "localhost"))